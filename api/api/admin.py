@@ -1,14 +1,23 @@
 from django.http import HttpResponse, HttpResponseRedirect
 import openpyxl
 from django import forms
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.forms import ValidationError
-from .models import Token, Event, SumulaImortal, SumulaClassificatoria, PlayerScore, Player, Staff, Results
+from .scheduler import is_compact_rounds
+from .models import Token, Event, SumulaImortal, SumulaClassificatoria, PlayerScore, Player, Staff, Results, ImportReport, Job, ScoreChange
 from guardian.admin import GuardedModelAdmin
 from django.db.models import Count
 from django.urls import path
 
 
+MAX_TOKENS_PER_BATCH = 1000
+
+
+class CreateTokensForm(forms.Form):
+    quantity = forms.IntegerField(
+        label='Quantidade', min_value=1, max_value=MAX_TOKENS_PER_BATCH, initial=10)
+
+
 @admin.register(Token)
 class TokenAdmin(GuardedModelAdmin):
     def event(self, obj):
@@ -24,15 +33,32 @@ class TokenAdmin(GuardedModelAdmin):
         custom_urls = [
             path('create-10-tokens/', self.admin_site.admin_view(
                 self.create_10_tokens), name='create-10-tokens'),
+            path('create-tokens/', self.admin_site.admin_view(
+                self.create_tokens), name='create-tokens'),
         ]
         return custom_urls + urls
 
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {**(extra_context or {}),
+                         'create_tokens_form': CreateTokensForm()}
+        return super().changelist_view(request, extra_context=extra_context)
+
     def create_10_tokens(self, request):
-        for i in range(10):
-            Token.objects.create()
+        Token.mint(10)
         self.message_user(request, "10 tokens foram criados com sucesso.")
         return HttpResponseRedirect("../")
 
+    def create_tokens(self, request):
+        form = CreateTokensForm(request.POST or None)
+        if request.method != 'POST' or not form.is_valid():
+            self.message_user(
+                request, f"Informe uma quantidade de tokens entre 1 e {MAX_TOKENS_PER_BATCH}.", level=messages.ERROR)
+            return HttpResponseRedirect("../")
+        quantity = form.cleaned_data['quantity']
+        Token.mint(quantity)
+        self.message_user(request, f"{quantity} tokens foram criados com sucesso.")
+        return HttpResponseRedirect("../")
+
     def export_as_excel(self, request, queryset):
         # Cria um workbook e uma worksheet
         workbook = openpyxl.Workbook()
@@ -153,6 +179,8 @@ class SumulaAdmin(GuardedModelAdmin):
     def rounds_count(self, obj):
         if obj.rounds is None:
             return 0
+        if is_compact_rounds(obj.rounds):
+            return len(obj.rounds['rounds'])
         return len(obj.rounds)
 
     # def pairs_count(self, obj):
@@ -238,6 +266,25 @@ class PlayerScoreAdmin(GuardedModelAdmin):
               'sumula_imortal', 'points', 'player']
 
 
+@admin.register(ScoreChange)
+class ScoreChangeAdmin(admin.ModelAdmin):
+    """Registro somente leitura: as alterações não podem ser criadas, editadas ou removidas pelo admin."""
+    list_display = ['id', 'event', 'player', 'sumula_classificatoria', 'sumula_imortal',
+                    'old_points', 'new_points', 'actor', 'created_at']
+    search_fields = ['event__name', 'player__full_name', 'actor__email']
+    readonly_fields = ['id', 'event', 'player', 'player_score', 'sumula_classificatoria', 'sumula_imortal',
+                       'old_points', 'new_points', 'actor', 'created_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 @ admin.register(Player)
 class PlayerAdmin(GuardedModelAdmin):
     list_display = ['id', 'user', 'full_name', 'social_name',
@@ -283,3 +330,26 @@ class ResultsAdmin(GuardedModelAdmin):
                      'imortals__full_name', 'ambassor__full_name', 'paladin__full_name']
     fields = ['event', 'top4', 'imortals', 'ambassor', 'paladin']
     filter_horizontal = ['top4', 'imortals']
+
+
+@admin.register(ImportReport)
+class ImportReportAdmin(GuardedModelAdmin):
+    def rows_count(self, obj):
+        return len(obj.rows or [])
+    rows_count.short_description = 'Linhas'
+
+    list_display = ['id', 'event', 'kind', 'rows_count', 'created_at']
+    list_filter = ['kind']
+    search_fields = ['event__name']
+    readonly_fields = ['id', 'created_at']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'event',
+                    'created_by', 'progress', 'created_at', 'finished_at']
+    list_filter = ['kind', 'status']
+    search_fields = ['event__name', 'created_by__email']
+    exclude = ['input_file', 'output_file']
+    readonly_fields = ['id', 'kind', 'status', 'event', 'created_by', 'payload', 'progress', 'result',
+                       'error', 'output_name', 'output_content_type', 'created_at', 'started_at', 'finished_at']
@@ -0,0 +1,49 @@
+import string
+from django.forms import ValidationError
+
+MIN_PLAYERS = 6
+MAX_PLAYERS = 8
+LETTERS = string.ascii_uppercase  # Alfabeto para nomear as chaves
+
+
+def bracket_name(index: int) -> str:
+    """Retorna o nome da chave de acordo com a sua posição.
+    Ex: Chave A, Chave B, ..., Chave Z, Chave AA, Chave BB, ...
+    """
+    letter = LETTERS[index % len(LETTERS)]
+    return f"Chave {letter * (index // len(LETTERS) + 1)}"
+
+
+def partition_sizes(n: int, min_players: int = MIN_PLAYERS, max_players: int = MAX_PLAYERS) -> list[int]:
+    """Calcula o tamanho de cada chave para n jogadores em O(número de chaves).
+    Usa o menor número possível de chaves, ceil(n / max_players), e distribui os jogadores
+    de forma que os tamanhos das chaves difiram em no máximo um jogador.
+    - ValidationError: Se não for possível dividir n jogadores em chaves de min_players a max_players.
+    """
+    if min_players < 1 or min_players > max_players:
+        raise ValidationError("Limites de jogadores por chave inválidos!")
+    if n < min_players:
+        raise ValidationError(
+            f"O evento precisa de pelo menos {min_players} jogadores presentes para iniciar.")
+    n_brackets = -(-n // max_players)
+    if n_brackets * min_players > n:
+        raise ValidationError(
+            f"Não é possível dividir {n} jogadores em chaves de {min_players} a {max_players} jogadores.")
+    size, bigger = divmod(n, n_brackets)
+    return [size + 1] * bigger + [size] * (n_brackets - bigger)
+
+
+def plan_brackets(players: list, min_players: int = MIN_PLAYERS, max_players: int = MAX_PLAYERS) -> list[dict]:
+    """Monta em memória o plano das chaves classificatórias.
+    Retorna uma lista de dicionários com o nome da chave e a lista de jogadores,
+    onde a posição do jogador na lista (começando em 1) é o seu número na chave.
+    """
+    plan = []
+    start = 0
+    for index, size in enumerate(partition_sizes(len(players), min_players, max_players)):
+        plan.append({
+            'name': bracket_name(index),
+            'players': players[start:start + size],
+        })
+        start += size
+    return plan
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import threading
+import uuid
+from collections import Counter
+from typing import Any, Callable
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.http import quote_etag
+
+RESPONSE_CACHE_TIMEOUT = getattr(settings, 'EVENT_RESPONSE_CACHE_TIMEOUT', 60 * 60)
+# Backends compartilhados entre os workers do servidor, com operações atômicas e sem escritas no banco de dados
+SHARED_CACHE_BACKENDS = [
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+]
+# Contadores de acertos e falhas do cache de respostas, mantidos na memória de cada processo
+_cache_stats = Counter()
+_cache_stats_lock = threading.Lock()
+
+
+def is_shared_cache() -> bool:
+    """Verifica se o cache de respostas pode ser utilizado.
+    Com um backend local (ex: LocMemCache), cada worker teria o seu próprio contador de geração: uma escrita
+    feita em um worker não invalidaria as respostas em cache dos demais. Com o DatabaseCache, cada acerto custaria
+    consultas ao banco de dados, que é justamente o que o cache deve evitar. Por isso, o cache de respostas só é
+    utilizado com Redis ou Memcached, ou se EVENT_RESPONSE_CACHE_ALLOW_LOCAL estiver habilitado (desenvolvimento e
+    testes, com um processo). Nos demais casos, os ETags são derivados do conteúdo das respostas."""
+    if settings.CACHES['default']['BACKEND'] in SHARED_CACHE_BACKENDS:
+        return True
+    return getattr(settings, 'EVENT_RESPONSE_CACHE_ALLOW_LOCAL', False)
+
+
+def generation_key(event_id: int) -> str:
+    return f'api:event:{event_id}:generation'
+
+
+def new_generation() -> str:
+    return uuid.uuid4().hex
+
+
+def get_event_generation(event_id: int) -> str:
+    """Retorna a geração do evento.
+    Caso a geração não exista (ou tenha sido removida do cache), ela é iniciada com um valor aleatório,
+    evitando que respostas antigas sejam reaproveitadas."""
+    key = generation_key(event_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, new_generation(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_event_generation(event_id: int) -> None:
+    """Troca a geração do evento por um novo valor aleatório, invalidando todas as respostas em cache do evento.
+    O novo valor é gravado com set em vez de incr, pois o incr não é atômico em todos os backends
+    (ex: DatabaseCache): duas trocas simultâneas nunca resultam na mesma geração."""
+    cache.set(generation_key(event_id), new_generation(), timeout=None)
+
+
+def invalidate_event_cache(event_id: int) -> None:
+    """Invalida as respostas em cache de um evento.
+    A geração é trocada imediatamente e novamente após o commit da transação,
+    para que leituras feitas antes do commit não fiquem em cache."""
+    if event_id is None or not is_shared_cache():
+        return
+    bump_event_generation(event_id)
+    transaction.on_commit(lambda: bump_event_generation(event_id))
+
+
+def response_cache_key(event_id: int, endpoint: str, query_params) -> str:
+    params = urlencode(sorted(query_params.lists()), doseq=True)
+    params_hash = hashlib.md5(params.encode()).hexdigest()
+    return f'api:event:{event_id}:{get_event_generation(event_id)}:{endpoint}:{params_hash}'
+
+
+def event_etag(event_id: int, endpoint: str) -> str | None:
+    """Retorna o ETag de um endpoint do evento, derivado da geração do evento.
+    Qualquer alteração nos dados do evento troca a geração e, portanto, muda o ETag.
+    Retorna None caso o cache não seja compartilhado entre os processos (ver is_shared_cache)."""
+    if not is_shared_cache():
+        return None
+    return quote_etag(f'{endpoint}-{event_id}-{get_event_generation(event_id)}')
+
+
+def content_etag(endpoint: str, data: Any) -> str:
+    """Retorna o ETag de um endpoint do evento derivado do conteúdo da resposta.
+    Utilizado quando a geração do evento não é compartilhada entre os processos."""
+    content = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return quote_etag(f'{endpoint}-{hashlib.md5(content.encode()).hexdigest()}')
+
+
+def increment_counter(name: str) -> None:
+    with _cache_stats_lock:
+        _cache_stats[name] += 1
+
+
+def get_cache_stats() -> dict[str, int]:
+    """Retorna os contadores de acertos e falhas do cache de respostas do processo atual.
+    Os contadores não são gravados no cache, evitando uma escrita a cada requisição."""
+    with _cache_stats_lock:
+        return {'hits': _cache_stats['hits'], 'misses': _cache_stats['misses']}
+
+
+def reset_cache_stats() -> None:
+    with _cache_stats_lock:
+        _cache_stats.clear()
+
+
+def cached_event_data(event_id: int, endpoint: str, query_params, build: Callable[[], Any]) -> Any:
+    """Retorna os dados de uma resposta do evento a partir do cache ou os gera com build e os salva em cache.
+    As chaves incluem o id do evento, o endpoint, os parâmetros da requisição e a geração do evento.
+    Caso o cache não seja compartilhado entre os processos (ver is_shared_cache), os dados são sempre gerados."""
+    if not is_shared_cache():
+        return build()
+    key = response_cache_key(event_id, endpoint, query_params)
+    data = cache.get(key)
+    if data is not None:
+        increment_counter('hits')
+        return data
+    increment_counter('misses')
+    data = build()
+    cache.set(key, data, timeout=RESPONSE_CACHE_TIMEOUT)
+    return data
+
@@ -0,0 +1,73 @@
+import codecs
+import csv
+import tempfile
+from typing import IO, Iterable, Iterator
+import xlsxwriter
+from django.db.models import QuerySet
+
+EXPORT_CHUNK_SIZE = 2000
+# Bytes enviados por vez ao transmitir um arquivo
+STREAM_BLOCK_SIZE = 64 * 1024
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+EXPORT_CONTENT_TYPES = {'xlsx': XLSX_CONTENT_TYPE, 'csv': CSV_CONTENT_TYPE}
+
+# Colunas da exportação de jogadores e os campos correspondentes de Player
+PLAYER_EXPORT_COLUMNS = {
+    'full_name': 'Nome Completo',
+    'registration_email': 'Email',
+    'social_name': 'Nome Social',
+}
+PLAYERS_SHEET_NAME = 'Jogadores Classificados'
+
+
+class Echo:
+    """Objeto com a interface de escrita de um arquivo que apenas retorna o valor escrito,
+    permitindo que o csv.writer gere as linhas sem acumulá-las em memória."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def player_export_rows(players: QuerySet, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[tuple]:
+    """Retorna as linhas da exportação de jogadores a partir de um cursor do banco de dados,
+    lendo chunk_size jogadores por vez."""
+    return players.order_by('id').values_list(
+        *PLAYER_EXPORT_COLUMNS).iterator(chunk_size=chunk_size)
+
+
+def stream_csv(header: Iterable[str], rows: Iterable[tuple], batch_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Gera um CSV em UTF-8 (com BOM, para ser aberto corretamente no Excel) em blocos de batch_size linhas.
+    O cabeçalho é enviado antes da primeira linha ser lida do banco de dados."""
+    writer = csv.writer(Echo())
+    yield codecs.BOM_UTF8 + writer.writerow(header).encode('utf-8')
+    batch = []
+    for row in rows:
+        batch.append(writer.writerow(['' if value is None else value for value in row]))
+        if len(batch) >= batch_size:
+            yield ''.join(batch).encode('utf-8')
+            batch = []
+    if batch:
+        yield ''.join(batch).encode('utf-8')
+
+
+def write_xlsx(output: IO[bytes], header: Iterable[str], rows: Iterable[tuple], sheet_name: str) -> None:
+    """Escreve uma planilha XLSX no arquivo output com o modo constant_memory do xlsxwriter,
+    que grava cada linha em disco assim que a próxima começa, mantendo o uso de memória constante."""
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    worksheet = workbook.add_worksheet(sheet_name)
+    worksheet.write_row(0, 0, list(header))
+    for index, row in enumerate(rows, start=1):
+        worksheet.write_row(index, 0, row)
+    workbook.close()
+
+
+def stream_xlsx(header: Iterable[str], rows: Iterable[tuple], sheet_name: str) -> Iterator[bytes]:
+    """Gera uma planilha XLSX em um arquivo temporário e a transmite em blocos.
+    O formato XLSX é um arquivo zip que só é concluído ao final da escrita, então o envio
+    começa após a última linha, mas o arquivo nunca fica inteiro em memória."""
+    with tempfile.TemporaryFile() as output:
+        write_xlsx(output, header, rows, sheet_name)
+        output.seek(0)
+        while block := output.read(STREAM_BLOCK_SIZE):
+            yield block
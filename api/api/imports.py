@@ -0,0 +1,197 @@
+import codecs
+import csv
+import io
+import chardet
+import pandas as pd
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from .cache import invalidate_event_cache
+from .models import Event, ImportReport, Player, Staff
+
+REQUIRED_COLUMNS = ['nome completo', 'e-mail']
+IMPORT_CHUNK_SIZE = 1000
+# Bytes lidos do início do CSV para detectar a codificação e o delimitador
+CSV_SAMPLE_SIZE = 64 * 1024
+CSV_DELIMITERS = ';,\t|'
+FALLBACK_ENCODING = 'cp1252'
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Diagnósticos por linha do relatório de importação
+INVALID_EMAIL = 'E-mail inválido'
+MISSING_NAME = 'Nome ausente'
+DUPLICATE_IN_FILE = 'E-mail repetido no arquivo (apenas a última linha foi importada)'
+ALREADY_REGISTERED = 'Já cadastrado no evento (dados atualizados)'
+REJECTED = [INVALID_EMAIL, MISSING_NAME]
+
+# Colunas do relatório de importação, compatíveis com uma nova importação
+REPORT_COLUMNS = {'line': 'Linha', 'full_name': 'Nome Completo',
+                  'registration_email': 'E-mail', 'error': 'Erro'}
+
+
+def detect_encoding(sample: bytes) -> str:
+    """Detecta a codificação de um CSV a partir de uma amostra do início do arquivo.
+    Verifica primeiro o BOM, depois se a amostra é UTF-8 válido e, por último, usa o chardet na amostra."""
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        # final=False tolera um caractere multibyte cortado no fim da amostra
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    encoding = chardet.detect(sample)['encoding']
+    if not encoding or encoding.lower() == 'ascii':
+        return FALLBACK_ENCODING
+    return encoding
+
+
+def detect_delimiter(text: str) -> str:
+    """Detecta o delimitador de um CSV a partir das primeiras linhas do arquivo."""
+    lines = text.splitlines()
+    if len(lines) > 1 and len(text) >= CSV_SAMPLE_SIZE // 2:
+        lines = lines[:-1]  # A última linha da amostra pode estar incompleta
+    try:
+        return csv.Sniffer().sniff('\n'.join(lines), delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        return ';' if ';' in (lines[0] if lines else '') else ','
+
+
+def read_csv(file) -> pd.DataFrame:
+    """Lê um CSV com o pandas sem copiar o arquivo inteiro para a memória.
+    A codificação e o delimitador são detectados em uma amostra do início do arquivo e o pandas
+    lê o arquivo por um TextIOWrapper, que decodifica o arquivo de forma incremental."""
+    raw = getattr(file, 'file', file)
+    raw.seek(0)
+    sample = raw.read(CSV_SAMPLE_SIZE)
+    raw.seek(0)
+    encoding = detect_encoding(sample)
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    delimiter = detect_delimiter(decoder.decode(sample).lstrip('\ufeff'))
+    text = io.TextIOWrapper(raw, encoding=encoding, errors='replace', newline='')
+    try:
+        return pd.read_csv(text, header=0, delimiter=delimiter)
+    finally:
+        # Evita que o arquivo enviado seja fechado junto com o TextIOWrapper
+        text.detach()
+
+
+def read_sheet(file, extension: str) -> pd.DataFrame | None:
+    """Lê uma planilha CSV ou Excel. Retorna None caso a extensão não seja suportada."""
+    if extension == 'csv':
+        return read_csv(file)
+    if extension in ['xlsx', 'xls']:
+        return pd.read_excel(file)
+    return None
+
+
+def is_valid_email(email: str) -> bool:
+    try:
+        validate_email(email)
+    except ValidationError:
+        return False
+    return True
+
+
+def normalize_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Normaliza os nomes e emails de uma planilha com operações vetorizadas do pandas.
+    Os nomes têm cada palavra capitalizada e os emails são convertidos para minúsculas.
+    Retorna um DataFrame com as colunas line (linha na planilha), full_name, registration_email,
+    raw_name, raw_email e error (diagnóstico da linha, ou None caso a linha seja válida).
+    - ValueError: Se alguma coluna obrigatória estiver ausente.
+    """
+    df.columns = df.columns.str.strip().str.lower()
+    missing_columns = [
+        col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(
+            f"ERRO - Colunas ausentes no arquivo: {', '.join(missing_columns)}")
+    raw_names = df['nome completo'].reset_index(drop=True)
+    raw_emails = df['e-mail'].reset_index(drop=True)
+    # Células vazias ou numéricas não são textos válidos
+    names = raw_names.where(raw_names.map(type) == str, '')
+    emails = raw_emails.where(raw_emails.map(type) == str, '')
+    emails = emails.str.strip().str.lower()
+    names = names.str.strip().str.lower().str.replace(
+        r'(^|\s)(\S)', lambda match: match.group(1) + match.group(2).upper(), regex=True)
+    rows = pd.DataFrame({
+        'line': range(2, len(df) + 2),  # A linha 1 da planilha é o cabeçalho
+        'full_name': names,
+        'registration_email': emails,
+        'raw_name': raw_names.where(raw_names.notna(), ''),
+        'raw_email': raw_emails.where(raw_emails.notna(), ''),
+        'error': None,
+    })
+    rows.loc[names == '', 'error'] = MISSING_NAME
+    rows.loc[~emails.map(is_valid_email), 'error'] = INVALID_EMAIL
+    return rows
+
+
+def import_rows(df: pd.DataFrame, event: Event, model: type[Player] | type[Staff], kind: str,
+                defaults: dict, chunk_size: int = IMPORT_CHUNK_SIZE) -> tuple[int, int, ImportReport | None]:
+    """Importa as linhas de uma planilha para o evento como objetos de model.
+    Os emails repetidos entre as linhas válidas do arquivo são deduplicados (a última linha válida prevalece) e os objetos são
+    inseridos ou atualizados em lotes com bulk_create(update_conflicts=True), em uma única transação.
+    Caso alguma linha seja rejeitada, as linhas rejeitadas, ignoradas ou já cadastradas são salvas
+    em um relatório de importação, para que apenas as linhas corrigidas sejam reenviadas.
+    Retorna o número de linhas rejeitadas, o número total de linhas do arquivo e o relatório
+    (None caso nenhuma linha tenha sido rejeitada).
+    """
+    rows = normalize_rows(df)
+    valid = rows['error'].isna()
+    # Apenas as linhas válidas são comparadas: uma última ocorrência rejeitada não descarta as anteriores
+    duplicated = rows.loc[valid, 'registration_email'].duplicated(keep='last').reindex(rows.index, fill_value=False)
+    rows.loc[duplicated, 'error'] = DUPLICATE_IN_FILE
+    to_import = rows[rows['error'].isna()]
+    with transaction.atomic():
+        registered = set(model.objects.filter(
+            event=event, registration_email__in=list(to_import['registration_email'])
+        ).values_list('registration_email', flat=True))
+        rows.loc[rows['error'].isna() & rows['registration_email'].isin(
+            registered), 'error'] = ALREADY_REGISTERED
+        for start in range(0, len(to_import), chunk_size):
+            chunk = to_import.iloc[start:start + chunk_size]
+            model.objects.bulk_create(
+                [model(event=event, full_name=full_name, registration_email=email, **defaults)
+                 for full_name, email in zip(chunk['full_name'], chunk['registration_email'])],
+                update_conflicts=True,
+                unique_fields=['registration_email', 'event'],
+                update_fields=['full_name', *defaults])
+        errors_count = int(rows['error'].isin(REJECTED).sum())
+        report = create_report(rows, event, kind) if errors_count else None
+        invalidate_event_cache(event.id)
+    return errors_count, len(rows), report
+
+
+def create_report(rows: pd.DataFrame, event: Event, kind: str) -> ImportReport | None:
+    """Salva as linhas com diagnóstico em um relatório de importação."""
+    diagnostics = rows[rows['error'].notna()]
+    if diagnostics.empty:
+        return None
+    return ImportReport.objects.create(event=event, kind=kind, rows=[
+        {'line': int(line), 'full_name': str(name), 'registration_email': str(email), 'error': error}
+        for line, name, email, error in zip(
+            diagnostics['line'], diagnostics['raw_name'], diagnostics['raw_email'], diagnostics['error'])
+    ])
+
+
+def import_players(df: pd.DataFrame, event: Event, chunk_size: int = IMPORT_CHUNK_SIZE) -> tuple[int, int, ImportReport | None]:
+    """Importa os jogadores de uma planilha para o evento, marcando-os como presentes."""
+    return import_rows(df, event, Player, ImportReport.PLAYERS, {'is_present': True}, chunk_size)
+
+
+def import_staff(df: pd.DataFrame, event: Event, chunk_size: int = IMPORT_CHUNK_SIZE) -> tuple[int, int, ImportReport | None]:
+    """Importa os monitores de uma planilha para o evento."""
+    return import_rows(df, event, Staff, ImportReport.STAFF, {}, chunk_size)
+
+
+def report_dataframe(report: ImportReport) -> pd.DataFrame:
+    """Retorna as linhas do relatório de importação como DataFrame, com as colunas em português."""
+    return pd.DataFrame(report.rows, columns=list(REPORT_COLUMNS)).rename(columns=REPORT_COLUMNS)
@@ -0,0 +1,195 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from threading import Lock
+from typing import Callable
+from uuid import UUID
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.forms import ValidationError
+from django.utils import timezone
+from .models import Event, Job
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+# Modos de execução das tarefas (settings.JOBS_MODE)
+EAGER = 'eager'
+THREAD = 'thread'
+WORKER = 'worker'
+
+STALE_JOB_ERROR_MESSAGE = 'A tarefa foi interrompida e não pôde ser concluída. Tente novamente.'
+
+JOB_HANDLERS: dict[str, Callable[[Job], dict | None]] = {}
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = Lock()
+
+
+class JobError(Exception):
+    """Erro esperado de uma tarefa. A mensagem é salva em Job.error e result, caso fornecido, em Job.result."""
+
+    def __init__(self, message: str, result: dict | None = None):
+        super().__init__(message)
+        self.result = result
+
+
+def job_handler(kind: str):
+    """Registra a função como responsável pela execução das tarefas do tipo kind.
+    A função recebe a tarefa e retorna o resultado, salvo em Job.result."""
+    def decorator(func: Callable[[Job], dict | None]):
+        JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def get_handler(kind: str) -> Callable[[Job], dict | None]:
+    from . import tasks  # noqa: F401 - registra os handlers das tarefas
+    return JOB_HANDLERS[kind]
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.JOBS_MAX_WORKERS, thread_name_prefix='jobs')
+    return _executor
+
+
+def enqueue_job(kind: str, event: Event | None = None, user: User | None = None,
+                payload: dict | None = None, input_file: File | None = None) -> Job:
+    """Cria uma tarefa pendente e agenda sua execução de acordo com settings.JOBS_MODE.
+    O arquivo input_file, caso fornecido, é salvo no armazenamento (settings.STORAGES['default']) e lido pela tarefa
+    como um arquivo, sem ser carregado na memória; no modo worker, o armazenamento deve ser compartilhado com o worker.
+    - thread: executa a tarefa em um pool de threads do processo após o commit da transação
+    - worker: apenas salva a tarefa, que será executada pelo comando run_jobs
+    - eager: executa a tarefa imediatamente, antes de retorná-la
+    """
+    job = Job.objects.create(
+        kind=kind, event=event, created_by=user if user and user.is_authenticated else None,
+        payload=payload or {}, input_file=input_file)
+    schedule_job(job)
+    return job
+
+
+def schedule_job(job: Job) -> None:
+    """Agenda a execução de uma tarefa pendente de acordo com settings.JOBS_MODE."""
+    mode = settings.JOBS_MODE
+    if mode == EAGER:
+        run_job(job.id)
+        job.refresh_from_db()
+    elif mode == THREAD:
+        transaction.on_commit(lambda: get_executor().submit(run_job_in_thread, job.id))
+
+
+def stale_jobs_filter() -> Q:
+    """Filtro das tarefas abandonadas: em execução sem sinal de vida há mais de settings.JOBS_STALE_TIMEOUT
+    segundos (o processo que as executava foi encerrado) e, no modo thread, pendentes há mais desse tempo
+    (o pool de threads que as executaria foi perdido, pois não há um worker buscando tarefas no banco)."""
+    limit = timezone.now() - timedelta(seconds=settings.JOBS_STALE_TIMEOUT)
+    stale = Q(status=Job.RUNNING, heartbeat_at__lt=limit)
+    if settings.JOBS_MODE == THREAD:
+        stale |= Q(status=Job.PENDING, created_at__lt=limit)
+    return stale
+
+
+def recover_stale_jobs(**filters) -> int:
+    """Recupera as tarefas abandonadas (ver stale_jobs_filter), opcionalmente filtradas por filters.
+    Uma tarefa que ainda não atingiu settings.JOBS_MAX_ATTEMPTS execuções volta a ficar pendente e é agendada
+    novamente; as demais são marcadas com erro. Retorna o número de tarefas recuperadas."""
+    with transaction.atomic():
+        jobs = list(Job.objects.select_for_update(skip_locked=True).filter(
+            stale_jobs_filter(), **filters))
+        for job in jobs:
+            if job.attempts >= settings.JOBS_MAX_ATTEMPTS:
+                logger.warning('Tarefa %s abandonada após %s tentativa(s)', job.id, job.attempts)
+                job.status = Job.FAILED
+                job.error = STALE_JOB_ERROR_MESSAGE
+                job.finished_at = timezone.now()
+                job.delete_input_file()
+                job.save(update_fields=['status', 'error', 'finished_at', 'input_file'])
+            elif job.status == Job.RUNNING:
+                logger.warning('Tarefa %s abandonada, reenfileirando', job.id)
+                job.status = Job.PENDING
+                job.started_at = None
+                job.heartbeat_at = None
+                job.save(update_fields=['status', 'started_at', 'heartbeat_at'])
+    for job in jobs:
+        if job.status == Job.PENDING:
+            schedule_job(job)
+    return len(jobs)
+
+
+def claim_job(job_id: UUID | None = None) -> Job | None:
+    """Marca como em execução a tarefa pendente mais antiga (ou a tarefa job_id) e a retorna.
+    As tarefas bloqueadas por outro processo são ignoradas, então cada tarefa é executada uma única vez.
+    Retorna None caso não exista tarefa pendente."""
+    with transaction.atomic():
+        jobs = Job.objects.select_for_update(skip_locked=True).filter(
+            status=Job.PENDING).order_by('created_at')
+        if job_id is not None:
+            jobs = jobs.filter(id=job_id)
+        job = jobs.first()
+        if job is None:
+            return None
+        job.status = Job.RUNNING
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.attempts += 1
+        job.save(update_fields=['status', 'started_at', 'heartbeat_at', 'attempts'])
+    return job
+
+
+def execute_job(job: Job) -> Job:
+    """Executa uma tarefa já marcada como em execução e salva o seu resultado ou erro."""
+    try:
+        result = get_handler(job.kind)(job)
+    except JobError as e:
+        job.status = Job.FAILED
+        job.error = str(e)
+        job.result = e.result
+    except ValidationError as e:
+        job.status = Job.FAILED
+        job.error = '; '.join(e.messages)
+    except Exception as e:
+        logger.exception('Erro ao executar a tarefa %s', job.id)
+        job.status = Job.FAILED
+        job.error = str(e)
+    else:
+        job.status = Job.SUCCEEDED
+        job.result = result
+        job.progress = 100
+    job.finished_at = timezone.now()
+    # O arquivo enviado não é mais necessário após a execução
+    job.delete_input_file()
+    job.save(update_fields=['status', 'error', 'result', 'progress', 'finished_at', 'input_file',
+                            'output_file', 'output_name', 'output_content_type'])
+    return job
+
+
+def run_job(job_id: UUID | None = None) -> Job | None:
+    """Obtém uma tarefa pendente e a executa. Retorna a tarefa executada ou None."""
+    job = claim_job(job_id)
+    if job is None:
+        return None
+    return execute_job(job)
+
+
+def run_job_in_thread(job_id: UUID | None = None) -> Job | None:
+    """Executa uma tarefa fora do ciclo de uma requisição, fechando a conexão da thread ao final."""
+    close_old_connections()
+    try:
+        return run_job(job_id)
+    finally:
+        connection.close()
+
+
+def execute_job_in_thread(job: Job) -> Job:
+    """Executa uma tarefa já marcada como em execução em uma thread, fechando a conexão da thread ao final."""
+    close_old_connections()
+    try:
+        return execute_job(job)
+    finally:
+        connection.close()
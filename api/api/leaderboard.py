@@ -0,0 +1,98 @@
+import base64
+import json
+from dataclasses import dataclass
+from django.db.models import Exists, F, IntegerField, OuterRef, Q, QuerySet, Subquery, Sum, Window
+from django.db.models.functions import Coalesce, DenseRank
+from .models import Event, Player, PlayerScore
+
+LEADERBOARD_PAGE_SIZE = 50
+# Categorias da classificação: jogadores classificados (não imortais) e imortais
+LEADERBOARD_CATEGORIES = {'classificatoria': False, 'imortal': True}
+TIE_BREAK_SCORE = 'score'
+TIE_BREAK_HEAD_TO_HEAD = 'head_to_head'
+# Critérios de desempate, em ordem: campos comparados em ordem decrescente para calcular a posição.
+# Jogadores com os mesmos valores em todos os campos têm a mesma posição e são ordenados pelo id.
+LEADERBOARD_TIE_BREAKS = {
+    TIE_BREAK_SCORE: ['total_score'],
+    TIE_BREAK_HEAD_TO_HEAD: ['total_score', 'head_to_head'],
+}
+LEADERBOARD_PLAYER_FIELDS = ['id', 'total_score', 'full_name', 'social_name']
+
+
+@dataclass(frozen=True)
+class LeaderboardCursor:
+    """Posição do último jogador de uma página: a sua posição, os valores dos critérios de desempate e o id."""
+    rank: int
+    values: tuple[int, ...]
+    id: int
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(json.dumps([self.rank, *self.values, self.id]).encode()).decode()
+
+    @classmethod
+    def decode(cls, cursor: str, tie_break: str) -> 'LeaderboardCursor':
+        """ Lê o cursor retornado pela página anterior.
+        - ValueError: Se o cursor não for válido para o critério de desempate.
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except ValueError:
+            raise ValueError('Cursor inválido!')
+        if (not isinstance(values, list) or len(values) != len(LEADERBOARD_TIE_BREAKS[tie_break]) + 2
+                or not all(type(value) is int for value in values)):
+            raise ValueError('Cursor inválido!')
+        return cls(rank=values[0], values=tuple(values[1:-1]), id=values[-1])
+
+
+def head_to_head_points() -> Coalesce:
+    """Pontos do jogador nas sumulas em que enfrentou outro jogador da mesma categoria com a mesma pontuação total."""
+    rivals = PlayerScore.objects.filter(
+        event=OuterRef(OuterRef('event')),
+        player__is_imortal=OuterRef(OuterRef('is_imortal')),
+        player__total_score=OuterRef(OuterRef('total_score')),
+    ).exclude(player=OuterRef(OuterRef('pk'))).filter(
+        Q(sumula_classificatoria__isnull=False, sumula_classificatoria=OuterRef('sumula_classificatoria'))
+        | Q(sumula_imortal__isnull=False, sumula_imortal=OuterRef('sumula_imortal')))
+    points = PlayerScore.objects.filter(player=OuterRef('pk')).filter(Exists(rivals)).values('player').annotate(
+        points_sum=Sum('points')).values('points_sum')
+    return Coalesce(Subquery(points, output_field=IntegerField()), 0)
+
+
+def after_cursor(keys: list[str], cursor: LeaderboardCursor) -> Q:
+    """Filtro da paginação por chave: jogadores depois do cursor na ordem (chaves decrescentes, id crescente)."""
+    condition = Q(id__gt=cursor.id)
+    for key, value in reversed(list(zip(keys, cursor.values))):
+        condition = Q(**{f'{key}__lt': value}) | (Q(**{key: value}) & condition)
+    return condition
+
+
+def leaderboard_queryset(event: Event, is_imortal: bool, tie_break: str) -> QuerySet:
+    players = Player.objects.filter(event=event, is_imortal=is_imortal)
+    if tie_break == TIE_BREAK_HEAD_TO_HEAD:
+        players = players.annotate(head_to_head=head_to_head_points())
+    return players
+
+
+def leaderboard_page(event: Event, is_imortal: bool, tie_break: str = TIE_BREAK_SCORE,
+                     limit: int = LEADERBOARD_PAGE_SIZE, cursor: LeaderboardCursor | None = None) -> tuple[list[dict], str | None]:
+    """Retorna uma página da classificação de uma categoria do evento e o cursor da próxima página (ou None).
+    A posição é calculada por DenseRank sobre os critérios de desempate (jogadores empatados têm a mesma posição).
+    A página é lida pelo índice player_leaderboard_idx a partir do cursor, sem percorrer as páginas anteriores:
+    o DenseRank é calculado apenas sobre a página e deslocado pela posição do último jogador da página anterior."""
+    keys = LEADERBOARD_TIE_BREAKS[tie_break]
+    players = leaderboard_queryset(event, is_imortal, tie_break)
+    if cursor is not None:
+        players = players.filter(after_cursor(keys, cursor))
+    order = [F(key).desc() for key in keys]
+    rows = list(players.annotate(rank=Window(DenseRank(), order_by=order)).order_by(*order, 'id').values(
+        'rank', *dict.fromkeys([*LEADERBOARD_PLAYER_FIELDS, *keys]))[:limit + 1])
+    if cursor is not None and rows:
+        # O primeiro jogador da página continua o empate do cursor ou ocupa a posição seguinte
+        shift = cursor.rank - 1 if tuple(rows[0][key] for key in keys) == cursor.values else cursor.rank
+        for row in rows:
+            row['rank'] += shift
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, LeaderboardCursor(rank=last['rank'], values=tuple(last[key] for key in keys), id=last['id']).encode()
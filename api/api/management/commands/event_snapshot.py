@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.forms import ValidationError
+from api.models import Event
+from api.snapshots import read_snapshot, restore_event, write_snapshot
+from users.models import User
+
+
+class Command(BaseCommand):
+    """Este comando exporta um evento para um snapshot compactado ou restaura um snapshot como um novo evento."""
+    help = 'Exporta (export <event_id> <arquivo>) ou restaura (restore <arquivo>) um snapshot completo de um evento.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['export', 'restore'], help='Ação a ser executada')
+        parser.add_argument('args', nargs='+', help='export: <event_id> <arquivo> | restore: <arquivo>')
+        parser.add_argument('--name', help='Nome do evento restaurado (padrão: nome do evento original)')
+        parser.add_argument('--admin-email', help='Email do usuário que será administrador do evento restaurado')
+
+    def handle(self, *args, **options):
+        if options['action'] == 'export':
+            self.export(*args)
+        else:
+            self.restore(*args, name=options['name'], admin_email=options['admin_email'])
+
+    def export(self, event_id=None, path=None, *args):
+        if event_id is None or path is None or args:
+            raise CommandError('Uso: event_snapshot export <event_id> <arquivo>')
+        event = Event.objects.filter(id=event_id).first()
+        if not event:
+            raise CommandError(f'Evento {event_id} não encontrado!')
+        with open(path, 'wb') as output:
+            write_snapshot(event, output)
+        self.stdout.write(f'Snapshot do evento {event.id} salvo em {path}.')
+
+    def restore(self, path=None, *args, name=None, admin_email=None):
+        if path is None or args:
+            raise CommandError('Uso: event_snapshot restore <arquivo>')
+        admin = None
+        if admin_email:
+            admin = User.objects.filter(email=admin_email).first()
+            if not admin:
+                raise CommandError(f'Usuário {admin_email} não encontrado!')
+        try:
+            with open(path, 'rb') as file:
+                event = restore_event(read_snapshot(file), name=name, admin=admin)
+        except OSError as e:
+            raise CommandError(str(e))
+        except ValidationError as e:
+            raise CommandError('; '.join(e.messages))
+        self.stdout.write(
+            f'Evento {event.id} ({event.name}) restaurado com o código de acesso {event.join_token}.')
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from api.models import Token
+
+
+class Command(BaseCommand):
+    """Este comando cria tokens de criação de eventos em lote."""
+    help = 'Cria N tokens com uma única verificação de colisões e uma única inserção.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quantity', type=int, help='Número de tokens a serem criados')
+
+    def handle(self, *args, **options):
+        quantity = options['quantity']
+        if quantity < 1:
+            raise CommandError('A quantidade de tokens deve ser maior que zero!')
+        tokens = Token.mint(quantity)
+        for token in tokens:
+            self.stdout.write(token.token_code)
+        self.stderr.write(f'{len(tokens)} token(s) criado(s).')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from api.models import Event, recompute_total_scores
+
+
+class Command(BaseCommand):
+    """Este comando recalcula a pontuação total de todos os jogadores de um evento."""
+    help = 'Recalcula a pontuação total de todos os jogadores de um evento em uma única instrução.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_id', type=int, help='Id do evento')
+
+    def handle(self, *args, **options):
+        event_id = options['event_id']
+        if not Event.objects.filter(id=event_id).exists():
+            raise CommandError(f'Evento {event_id} não encontrado!')
+        updated = recompute_total_scores(event_id)
+        self.stdout.write(
+            f'Pontuação total recalculada: {updated} jogador(es) atualizado(s) no evento {event_id}.')
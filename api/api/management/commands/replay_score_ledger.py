@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from api.models import Event, replay_score_ledger
+from api.scoreboard import refresh_results
+
+
+class Command(BaseCommand):
+    """Este comando reconstrói as pontuações de um evento a partir do registro de alterações das sumulas."""
+    help = 'Restaura as pontuações de um evento a partir do registro de alterações e recalcula a pontuação total dos jogadores.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_id', type=int, help='Id do evento')
+
+    def handle(self, *args, **options):
+        event_id = options['event_id']
+        event = Event.objects.filter(id=event_id).first()
+        if event is None:
+            raise CommandError(f'Evento {event_id} não encontrado!')
+        restored, updated = replay_score_ledger(event_id)
+        refresh_results(event)
+        self.stdout.write(
+            f'Registro reaplicado: {restored} pontuação(ões) restaurada(s) e {updated} jogador(es) atualizado(s) no evento {event_id}.')
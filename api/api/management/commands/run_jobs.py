@@ -0,0 +1,50 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from django.core.management.base import BaseCommand
+from api.jobs import claim_job, execute_job_in_thread, recover_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    """Este comando executa as tarefas em segundo plano enfileiradas no banco de dados."""
+    help = 'Executa as tarefas em segundo plano pendentes (importações, geração de sumulas e exportações).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Executa as tarefas pendentes e encerra')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Número de tarefas executadas em paralelo')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Intervalo em segundos entre as buscas por novas tarefas')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            recover_stale_jobs()
+            executed = 0
+            while (job := run_job()) is not None:
+                executed += 1
+                self.stdout.write(f'Tarefa {job.id} ({job.kind}): {job.status}')
+            self.stdout.write(f'{executed} tarefa(s) executada(s).')
+            return
+        workers = max(options['workers'], 1)
+        self.stdout.write(f'Aguardando tarefas com {workers} worker(s)...')
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='jobs') as executor:
+            try:
+                self.run_forever(executor, workers, options['interval'])
+            except KeyboardInterrupt:
+                self.stdout.write('Encerrando o worker de tarefas.')
+
+    def run_forever(self, executor: ThreadPoolExecutor, workers: int, interval: float) -> None:
+        """Mantém até workers tarefas em execução: uma nova tarefa é iniciada assim que outra termina,
+        sem aguardar as demais tarefas em execução."""
+        running = set()
+        while True:
+            recover_stale_jobs()
+            while len(running) < workers and (job := claim_job()) is not None:
+                running.add(executor.submit(execute_job_in_thread, job))
+            if not running:
+                time.sleep(interval)
+                continue
+            done, running = wait(running, timeout=interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = future.result()
+                self.stdout.write(f'Tarefa {job.id} ({job.kind}): {job.status}')
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+ROUNDS_VERSION = 2
+BATCH_SIZE = 500
+
+
+def compact_pair(pair):
+    ids = [(pair.get(key) or {}).get('id') for key in ['player1', 'player2']]
+    if ids[0] is None:
+        ids.reverse()
+    return ids
+
+
+def compact_rounds(apps, schema_editor):
+    """Converte as rodadas com jogadores serializados para o formato compacto com ids de PlayerScore."""
+    for model_name in ['SumulaClassificatoria', 'SumulaImortal']:
+        model = apps.get_model('api', model_name)
+        sumulas = []
+        for sumula in model.objects.only('id', 'rounds').iterator(chunk_size=BATCH_SIZE):
+            if not isinstance(sumula.rounds, list):
+                continue
+            sumula.rounds = {
+                'version': ROUNDS_VERSION,
+                'rounds': [[compact_pair(pair) for pair in round_pairs] for round_pairs in sumula.rounds],
+            }
+            sumulas.append(sumula)
+        model.objects.bulk_update(sumulas, ['rounds'], batch_size=BATCH_SIZE)
+
+
+def expand_rounds(apps, schema_editor):
+    """Converte as rodadas do formato compacto de volta para jogadores serializados."""
+    PlayerScore = apps.get_model('api', 'PlayerScore')
+    for model_name, field in [('SumulaClassificatoria', 'sumula_classificatoria'), ('SumulaImortal', 'sumula_imortal')]:
+        model = apps.get_model('api', model_name)
+        sumulas = []
+        for sumula in model.objects.only('id', 'rounds').iterator(chunk_size=BATCH_SIZE):
+            if not isinstance(sumula.rounds, dict) or sumula.rounds.get('version') != ROUNDS_VERSION:
+                continue
+            scores = {
+                score.id: {
+                    'id': score.id,
+                    'rounds_number': score.rounds_number,
+                    'player': {'id': score.player.id, 'full_name': score.player.full_name, 'social_name': score.player.social_name},
+                }
+                for score in PlayerScore.objects.filter(**{field: sumula.id}).select_related('player')
+            }
+            sumula.rounds = [[{'player1': scores.get(player1), 'player2': scores.get(player2)}
+                              for player1, player2 in round_pairs] for round_pairs in sumula.rounds['rounds']]
+            sumulas.append(sumula)
+        model.objects.bulk_update(sumulas, ['rounds'], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0038_event_is_sumulas_generated'),
+    ]
+
+    operations = [
+        migrations.RunPython(compact_rounds, expand_rounds),
+    ]
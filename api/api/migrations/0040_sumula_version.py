@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 03:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0039_compact_sumula_rounds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sumulaclassificatoria',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='sumulaimortal',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-18 03:30
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0040_sumula_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportReport',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('players', 'Jogadores'), ('staff', 'Monitores')], max_length=16)),
+                ('rows', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_reports', to='api.event')),
+            ],
+            options={
+                'verbose_name': 'Import Report',
+                'verbose_name_plural': 'Import Reports',
+            },
+        ),
+    ]
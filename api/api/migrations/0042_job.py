@@ -0,0 +1,43 @@
+# Generated by Django 5.1.1 on 2026-10-18 03:35
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0041_importreport'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('import_players', 'Importação de jogadores'), ('import_staff', 'Importação de monitores'), ('generate_sumulas', 'Geração de sumulas'), ('export_players', 'Exportação de jogadores')], max_length=32)),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('running', 'Em execução'), ('succeeded', 'Concluída'), ('failed', 'Com erro')], db_index=True, default='pending', max_length=16)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('input_file', models.BinaryField(blank=True, null=True)),
+                ('progress', models.PositiveSmallIntegerField(default=0)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('output_file', models.BinaryField(blank=True, null=True)),
+                ('output_name', models.CharField(blank=True, default='', max_length=255)),
+                ('output_content_type', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to=settings.AUTH_USER_MODEL)),
+                ('event', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='api.event')),
+            ],
+            options={
+                'verbose_name': 'Job',
+                'verbose_name_plural': 'Jobs',
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
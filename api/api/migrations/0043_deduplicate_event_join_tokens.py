@@ -0,0 +1,43 @@
+import random
+import secrets
+import string
+from django.db import migrations
+
+TOKEN_LENGTH = 9
+
+
+def generate_code():
+    letters = ''.join(secrets.choice(string.ascii_uppercase) for i in range(TOKEN_LENGTH - 2))
+    numbers = ''.join(secrets.choice(string.digits) for i in range(2))
+    return ''.join(random.sample(letters + numbers, TOKEN_LENGTH))
+
+
+def deduplicate_join_tokens(apps, schema_editor):
+    """Gera novos códigos de acesso para os eventos sem código ou com um código repetido.
+    O evento mais antigo com cada código mantém o seu código."""
+    Event = apps.get_model('api', 'Event')
+    seen = set()
+    events = []
+    for event in Event.objects.only('id', 'join_token').order_by('id').iterator():
+        if event.join_token and event.join_token not in seen:
+            seen.add(event.join_token)
+        else:
+            events.append(event)
+    for event in events:
+        code = generate_code()
+        while code in seen:
+            code = generate_code()
+        seen.add(code)
+        event.join_token = code
+    Event.objects.bulk_update(events, ['join_token'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0042_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_join_tokens, migrations.RunPython.noop),
+    ]
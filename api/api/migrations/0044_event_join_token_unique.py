@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+# Separada da correção dos códigos repetidos (0043) para que o ALTER TABLE não seja executado
+# na mesma transação das atualizações dos eventos ("pending trigger events" no Postgres)
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0043_deduplicate_event_join_tokens'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='join_token',
+            field=models.CharField(blank=True, default='', max_length=9, unique=True),
+        ),
+    ]
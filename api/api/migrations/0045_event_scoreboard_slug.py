@@ -0,0 +1,27 @@
+import secrets
+from django.db import migrations, models
+
+
+def generate_scoreboard_slugs(apps, schema_editor):
+    """Gera o identificador público do placar dos eventos existentes."""
+    Event = apps.get_model('api', 'Event')
+    events = list(Event.objects.only('id'))
+    for event in events:
+        event.scoreboard_slug = secrets.token_urlsafe(24)
+    Event.objects.bulk_update(events, ['scoreboard_slug'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0044_event_join_token_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='scoreboard_slug',
+            field=models.CharField(editable=False, max_length=32, null=True),
+        ),
+        migrations.RunPython(generate_scoreboard_slugs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+import api.models
+
+
+# Separada da geração dos identificadores (0045) para que o ALTER TABLE não seja executado
+# na mesma transação das atualizações dos eventos ("pending trigger events" no Postgres)
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0045_event_scoreboard_slug'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='scoreboard_slug',
+            field=models.CharField(default=api.models.generate_scoreboard_slug, editable=False, max_length=32, unique=True),
+        ),
+        migrations.AddField(
+            model_name='results',
+            name='scoreboard',
+            field=models.JSONField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='results',
+            name='scoreboard_updated_at',
+            field=models.DateTimeField(blank=True, default=None, null=True),
+        ),
+    ]
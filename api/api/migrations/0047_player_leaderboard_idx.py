@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-18 04:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0046_event_scoreboard_slug_unique_results_scoreboard'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['event', 'is_imortal', '-total_score', 'id'], name='player_leaderboard_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.1 on 2026-10-18 04:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0047_player_leaderboard_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('old_points', models.PositiveSmallIntegerField(default=0)),
+                ('new_points', models.PositiveSmallIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='score_changes', to=settings.AUTH_USER_MODEL)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_changes', to='api.event')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_changes', to='api.player')),
+                ('player_score', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='changes', to='api.playerscore')),
+                ('sumula_classificatoria', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='score_changes', to='api.sumulaclassificatoria')),
+                ('sumula_imortal', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='score_changes', to='api.sumulaimortal')),
+            ],
+            options={
+                'verbose_name': 'Score Change',
+                'verbose_name_plural': 'Score Changes',
+                'indexes': [models.Index(fields=['event', 'player_score', '-id'], name='scorechange_replay_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.core.files.base import ContentFile
+from django.db import migrations, models
+
+import api.models
+
+
+def move_input_files_to_storage(apps, schema_editor):
+    """Salva no armazenamento os arquivos das tarefas ainda não concluídas."""
+    Job = apps.get_model('api', 'Job')
+    jobs = Job.objects.filter(status__in=['pending', 'running'], input_data__isnull=False)
+    for job in jobs.iterator(chunk_size=100):
+        name = job.payload.get('file_name') or f"arquivo.{job.payload.get('extension', 'csv')}"
+        job.input_file.save(name, ContentFile(bytes(job.input_data)), save=False)
+        job.save(update_fields=['input_file'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0049_job_heartbeat'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='job',
+            old_name='input_file',
+            new_name='input_data',
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='input_file',
+            field=models.FileField(blank=True, max_length=255, upload_to=api.models.job_file_path),
+        ),
+        migrations.RunPython(move_input_files_to_storage, migrations.RunPython.noop),
+    ]
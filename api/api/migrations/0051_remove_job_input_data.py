@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+# Separada da cópia dos arquivos para o armazenamento (0050) para que o ALTER TABLE não seja executado
+# na mesma transação das atualizações das tarefas ("pending trigger events" no Postgres)
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0050_job_input_file_storage'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='job',
+            name='input_data',
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.core.files.base import ContentFile
+from django.db import migrations, models
+
+import api.models
+
+
+def move_output_files_to_storage(apps, schema_editor):
+    """Salva no armazenamento os arquivos gerados pelas tarefas concluídas."""
+    Job = apps.get_model('api', 'Job')
+    jobs = Job.objects.filter(status='succeeded', output_data__isnull=False)
+    for job in jobs.iterator(chunk_size=100):
+        job.output_file.save(job.output_name or 'arquivo', ContentFile(bytes(job.output_data)), save=False)
+        job.save(update_fields=['output_file'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0051_remove_job_input_data'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='job',
+            old_name='output_file',
+            new_name='output_data',
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='output_file',
+            field=models.FileField(blank=True, max_length=255, upload_to=api.models.job_file_path),
+        ),
+        migrations.RunPython(move_output_files_to_storage, migrations.RunPython.noop),
+    ]
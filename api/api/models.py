@@ -1,15 +1,49 @@
 import random
 from django.db.models import UniqueConstraint
 from django.db import IntegrityError, models
-from django.db import transaction
+from django.db import connection, transaction
+from django.utils import timezone
 from django.forms import ValidationError
 from django.dispatch import receiver
-from django.db.models.signals import post_save, pre_delete
-from django.db.models import Sum
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.db.models import F, Q, Value
 from users.models import User
+from api.cache import invalidate_event_cache
 import string
 import secrets
+import uuid
 TOKEN_LENGTH = 9
+MINT_MAX_ATTEMPTS = 3
+SCOREBOARD_SLUG_LENGTH = 32
+
+
+def generate_code() -> str:
+    """Gera um código aleatório de TOKEN_LENGTH caracteres, com TOKEN_LENGTH - 2 letras maiúsculas e 2 dígitos."""
+    letters = ''.join(secrets.choice(string.ascii_uppercase)
+                      for i in range(TOKEN_LENGTH - 2))
+    numbers = ''.join(secrets.choice(string.digits) for i in range(2))
+    return ''.join(random.sample(letters + numbers, len(letters + numbers)))
+
+
+def generate_unique_codes(model: type[models.Model], field: str, n: int) -> list[str]:
+    """Gera n códigos distintos que ainda não existem no campo field do model.
+    As colisões são verificadas com uma única consulta field__in por rodada e apenas os códigos
+    que colidiram são gerados novamente."""
+    codes: set[str] = set()
+    while len(codes) < n:
+        candidates = set()
+        while len(candidates) < n - len(codes):
+            code = generate_code()
+            if code not in codes:
+                candidates.add(code)
+        taken = set(model.objects.filter(**{f'{field}__in': candidates}).values_list(field, flat=True))
+        codes |= candidates - taken
+    return list(codes)
+
+
+def generate_scoreboard_slug() -> str:
+    """Gera o identificador público e não adivinhável do placar de um evento."""
+    return secrets.token_urlsafe(24)
 
 
 class Token (models.Model):
@@ -44,16 +78,20 @@ class Token (models.Model):
 
     def generate_token(self) -> str:
         """Gera um token aleatório de TOKEN_LENGTH caracteres."""
-        alphabet = string.ascii_uppercase
-        while True:
-            letters = ''.join(secrets.choice(alphabet)
-                              for i in range(TOKEN_LENGTH - 2))
-            numbers = ''.join(secrets.choice(string.digits)
-                              for i in range(2))
-            self.token_code = ''.join(random.sample(
-                letters + numbers, len(letters + numbers)))
-            if not Token.objects.filter(token_code=self.token_code).exists():
-                break
+        self.token_code = generate_unique_codes(Token, 'token_code', 1)[0]
+
+    @classmethod
+    def mint(cls, n: int) -> list['Token']:
+        """Cria n tokens com uma consulta de colisões por rodada e um único bulk_create.
+        Caso outro processo insira um dos códigos ao mesmo tempo, os códigos são gerados novamente."""
+        for attempt in range(MINT_MAX_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    return cls.objects.bulk_create(
+                        [cls(token_code=code) for code in generate_unique_codes(cls, 'token_code', n)])
+            except IntegrityError:
+                if attempt == MINT_MAX_ATTEMPTS - 1:
+                    raise
 
     def save(self, *args, **kwargs) -> None:
         """Sobrescreve o método save para gerar um token caso não exista."""
@@ -67,6 +105,7 @@ class Event (models.Model):
      fields:
     - token: ForeignKey para Token
     - join_token: CharField com o código de join do evento
+    - scoreboard_slug: CharField com o identificador público do placar do evento
     - name: CharField com o nome do evento
     - active: BooleanField que indica se o evento está ativo ou não
     - admin_email: EmailField
@@ -76,7 +115,9 @@ class Event (models.Model):
     token = models.OneToOneField(
         Token, on_delete=models.CASCADE, related_name='event')
     join_token = models.CharField(
-        default='', max_length=TOKEN_LENGTH, blank=True)
+        default='', max_length=TOKEN_LENGTH, unique=True, blank=True)
+    scoreboard_slug = models.CharField(
+        default=generate_scoreboard_slug, max_length=SCOREBOARD_SLUG_LENGTH, unique=True, editable=False)
     name = models.CharField(default='', max_length=64, blank=False, null=True)
     active = models.BooleanField(default=True)
     admin_email = models.EmailField(default='', blank=True, null=True)
@@ -110,16 +151,7 @@ class Event (models.Model):
 
     def generate_token(self) -> str:
         """Gera um token aleatório de TOKEN_LENGTH caracteres."""
-        alphabet = string.ascii_uppercase
-        while True:
-            letters = ''.join(secrets.choice(alphabet)
-                              for i in range(TOKEN_LENGTH - 2))
-            numbers = ''.join(secrets.choice(string.digits)
-                              for i in range(2))
-            self.join_token = ''.join(random.sample(
-                letters + numbers, len(letters + numbers)))
-            if not Event.objects.filter(join_token=self.join_token).exists():
-                break
+        self.join_token = generate_unique_codes(Event, 'join_token', 1)[0]
 
     def is_active(self) -> bool:
         """Retorna se o evento está ativo ou não."""
@@ -182,6 +214,7 @@ class Sumula (models.Model):
     description = models.TextField(
         default='', blank=True, null=True, max_length=256)
     rounds = models.JSONField(default=dict, blank=True, null=True)
+    version = models.PositiveIntegerField(default=1)
 
     class Meta:
         abstract = True
@@ -275,23 +308,10 @@ class Player(models.Model):
             UniqueConstraint(fields=['user', 'event'],
                              name='unique_user_event_player')
         ]
-
-    # Atualiza a pontuação total após salvar uma instância de PlayerScore
-    @receiver(post_save, sender='api.PlayerScore')
-    def update_player_total_score_on_save(sender, instance, **kwargs):
-        if instance.player and instance.player.event == instance.event:
-            instance.player.total_score = PlayerScore.objects.filter(
-                player=instance.player, event=instance.event).aggregate(Sum('points'))['points__sum'] or 0
-            instance.player.save()
-
-    # Atualiza a pontuação total após deletar uma instância de PlayerScore
-    @receiver(pre_delete, sender='api.PlayerScore')
-    def update_player_total_score_on_delete(sender, instance, **kwargs):
-        if instance.player and instance.player.event == instance.event:
-            instance.player.total_score -= instance.points
-            if instance.player.total_score < 0:
-                instance.player.total_score = 0
-            instance.player.save()
+        indexes = [
+            # Classificação por evento e categoria, na mesma ordem de leaderboard_page
+            models.Index(fields=['event', 'is_imortal', '-total_score', 'id'], name='player_leaderboard_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.full_name
@@ -327,6 +347,15 @@ class PlayerScore(models.Model):
     def __str__(self):
         return f'{self.player} - {self.points}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Guarda a pontuação e o jogador carregados do banco para calcular a variação ao salvar ou deletar."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_points = instance.__dict__.get('points')
+        instance._loaded_player_id = instance.__dict__.get('player_id')
+        instance._loaded_event_id = instance.__dict__.get('event_id')
+        return instance
+
     def save(self, *args, **kwargs):
         if self.player is None or self.event is None:
             raise IntegrityError("Player e Evento são campos obrigatórios!")
@@ -371,6 +400,174 @@ class PlayerScore(models.Model):
     #         super(PlayerScore, self).delete(*args, **kwargs)
 
 
+def apply_total_score_delta(player_id: int | None, event_id: int | None, delta: int) -> None:
+    """Soma delta à pontuação total do jogador de forma atômica, com uma única instrução UPDATE.
+    Apenas jogadores do evento da pontuação são alterados. Caso a subtração deixe a pontuação total
+    negativa (total divergente da soma das pontuações), o total do jogador é recalculado a partir das pontuações."""
+    if not player_id or not delta:
+        return
+    players = Player.objects.filter(id=player_id, event_id=event_id)
+    if delta < 0:
+        players = players.filter(total_score__gte=-delta)
+    if players.update(total_score=F('total_score') + delta):
+        schedule_results_refresh(event_id)
+    elif delta < 0:
+        recompute_total_scores(event_id, [player_id])
+
+
+def recompute_total_scores(event_id: int, player_ids: list[int] | None = None) -> int:
+    """Recalcula a pontuação total dos jogadores do evento a partir das suas pontuações,
+    em uma única instrução UPDATE ... FROM (SELECT ... SUM(points)).
+    Caso player_ids seja fornecido, apenas esses jogadores são recalculados.
+    Deve ser usado após escritas em lote (bulk_create, bulk_update, update), que não disparam sinais.
+    Retorna o número de jogadores cuja pontuação total foi alterada.
+    """
+    player_filter = 'AND p.id = ANY(%s)' if player_ids is not None else ''
+    sql = f"""
+        UPDATE {Player._meta.db_table} AS player
+        SET total_score = totals.total_score
+        FROM (
+            SELECT p.id AS player_id, COALESCE(SUM(s.points), 0) AS total_score
+            FROM {Player._meta.db_table} AS p
+            LEFT JOIN {PlayerScore._meta.db_table} AS s
+                ON s.player_id = p.id AND s.event_id = p.event_id
+            WHERE p.event_id = %s {player_filter}
+            GROUP BY p.id
+        ) AS totals
+        WHERE player.id = totals.player_id AND player.total_score <> totals.total_score
+    """
+    params = [event_id] if player_ids is None else [event_id, list(player_ids)]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        updated = cursor.rowcount
+    if updated:
+        invalidate_event_cache(event_id)
+        schedule_results_refresh(event_id)
+    return updated
+
+
+@receiver(post_save, sender=PlayerScore)
+def update_player_total_score_on_save(sender, instance, created, raw=False, **kwargs):
+    """Atualiza a pontuação total do jogador com a variação de pontos da instância de PlayerScore.
+    A pontuação só é contabilizada se o jogador for do mesmo evento da pontuação."""
+    if raw:
+        return
+    if not created and not hasattr(instance, '_loaded_points'):
+        # Instância não carregada do banco: não é possível calcular a variação
+        recompute_total_scores(instance.event_id, [instance.player_id])
+    elif created or (instance._loaded_player_id, instance._loaded_event_id) == (instance.player_id, instance.event_id):
+        old_points = 0 if created else instance._loaded_points
+        apply_total_score_delta(instance.player_id, instance.event_id, instance.points - old_points)
+    else:
+        apply_total_score_delta(instance._loaded_player_id, instance._loaded_event_id, -instance._loaded_points)
+        apply_total_score_delta(instance.player_id, instance.event_id, instance.points)
+    refresh_cached_player_total_score(instance)
+    instance._loaded_points = instance.points
+    instance._loaded_player_id = instance.player_id
+    instance._loaded_event_id = instance.event_id
+
+
+@receiver(post_delete, sender=PlayerScore)
+def update_player_total_score_on_delete(sender, instance, **kwargs):
+    """Subtrai da pontuação total do jogador os pontos da instância de PlayerScore deletada."""
+    apply_total_score_delta(getattr(instance, '_loaded_player_id', instance.player_id),
+                            getattr(instance, '_loaded_event_id', instance.event_id),
+                            -getattr(instance, '_loaded_points', instance.points))
+    refresh_cached_player_total_score(instance)
+
+
+def refresh_cached_player_total_score(instance: PlayerScore) -> None:
+    """Atualiza a pontuação total do jogador já carregado na instância, caso exista."""
+    if PlayerScore.player.is_cached(instance) and instance.player is not None:
+        instance.player.refresh_from_db(fields=['total_score'])
+
+
+class ScoreChange(models.Model):
+    """ Registro, somente de inclusão, das alterações de pontuação feitas no encerramento das sumulas.
+    Cada encerramento registra, em um único bulk_create, uma linha por pontuação da sumula.
+    A última linha de cada pontuação guarda os seus pontos válidos e é usada por replay_score_ledger.
+    fields:
+    - event: ForeignKey para Event
+    - player: ForeignKey para Player
+    - player_score: ForeignKey para PlayerScore (nulo caso a pontuação tenha sido deletada)
+    - sumula_classificatoria: ForeignKey para SumulaClassificatoria
+    - sumula_imortal: ForeignKey para SumulaImortal
+    - old_points: PositiveSmallIntegerField com a pontuação antes do encerramento
+    - new_points: PositiveSmallIntegerField com a pontuação salva no encerramento
+    - actor: ForeignKey para User que encerrou a sumula
+    - created_at: DateTimeField
+    """
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name='score_changes')
+    player = models.ForeignKey(
+        Player, on_delete=models.CASCADE, related_name='score_changes')
+    player_score = models.ForeignKey(
+        PlayerScore, on_delete=models.SET_NULL, related_name='changes', null=True, blank=True)
+    sumula_classificatoria = models.ForeignKey(
+        SumulaClassificatoria, on_delete=models.SET_NULL, related_name='score_changes', null=True, blank=True)
+    sumula_imortal = models.ForeignKey(
+        SumulaImortal, on_delete=models.SET_NULL, related_name='score_changes', null=True, blank=True)
+    old_points = models.PositiveSmallIntegerField(default=0)
+    new_points = models.PositiveSmallIntegerField(default=0)
+    actor = models.ForeignKey(
+        User, on_delete=models.SET_NULL, related_name='score_changes', null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = ("Score Change")
+        verbose_name_plural = ("Score Changes")
+        indexes = [
+            # Última alteração de cada pontuação do evento, lida por replay_score_ledger
+            models.Index(fields=['event', 'player_score', '-id'], name='scorechange_replay_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.player} - {self.old_points} -> {self.new_points}'
+
+    @classmethod
+    def record(cls, scores: list[PlayerScore], actor: User | None) -> list['ScoreChange']:
+        """Registra as pontuações salvas no encerramento de uma sumula com um único bulk_create.
+        A pontuação anterior é a carregada do banco antes da alteração."""
+        return cls.objects.bulk_create([cls(
+            event_id=score.event_id,
+            player_id=score.player_id,
+            player_score_id=score.id,
+            sumula_classificatoria_id=score.sumula_classificatoria_id,
+            sumula_imortal_id=score.sumula_imortal_id,
+            old_points=getattr(score, '_loaded_points', score.points),
+            new_points=score.points,
+            actor=actor,
+        ) for score in scores])
+
+
+def replay_score_ledger(event_id: int) -> tuple[int, int]:
+    """Reconstrói as pontuações do evento a partir do registro de alterações (ScoreChange).
+    Cada pontuação registrada volta a ter os pontos da sua última alteração (maior id), em uma única
+    instrução UPDATE ... FROM (SELECT DISTINCT ON ...), e a pontuação total dos jogadores é recalculada
+    em uma única agregação. Pontuações sem registro (de sumulas ainda não encerradas) não são alteradas.
+    Retorna o número de pontuações restauradas e o número de jogadores cuja pontuação total foi alterada.
+    """
+    sql = f"""
+        UPDATE {PlayerScore._meta.db_table} AS score
+        SET points = latest.new_points
+        FROM (
+            SELECT DISTINCT ON (player_score_id) player_score_id, new_points
+            FROM {ScoreChange._meta.db_table}
+            WHERE event_id = %s AND player_score_id IS NOT NULL
+            ORDER BY player_score_id, id DESC
+        ) AS latest
+        WHERE score.id = latest.player_score_id AND score.points <> latest.new_points
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [event_id])
+            restored = cursor.rowcount
+        updated = recompute_total_scores(event_id)
+    if restored:
+        invalidate_event_cache(event_id)
+    return restored, updated
+
+
 class Results(models.Model):
     """ Modelo para salvar resultados de um evento.
     fields:
@@ -379,6 +576,8 @@ class Results(models.Model):
     - top4: ManyToManyField para Player
     - paladin: ForeignKey para Player
     - ambassor: ForeignKey para Player
+    - scoreboard: JSONField com o placar público pré-calculado (apenas o que foi publicado)
+    - scoreboard_updated_at: DateTimeField com a data da última geração do placar
 
     """
 
@@ -392,16 +591,217 @@ class Results(models.Model):
                                    related_name='results_paladin', null=True, blank=True, default=None)
     ambassor = models.OneToOneField(Player, on_delete=models.CASCADE,
                                     related_name='results_ambassor', null=True, blank=True, default=None)
+    scoreboard = models.JSONField(null=True, blank=True, default=None)
+    scoreboard_updated_at = models.DateTimeField(null=True, blank=True, default=None)
 
     class Meta:
         verbose_name = ("Results")
         verbose_name_plural = ("Results")
 
     def calculate_imortals(self):
-        """Calcula os imortais do evento."""
-        self.imortals.clear()
-        players = Player.objects.filter(
-            event=self.event, is_imortal=True).order_by('-total_score')[:3]
-        for player in players:
-            self.imortals.add(player)
-        self.save()
+        """Calcula os top3 imortais do evento com uma única consulta ordenada.
+        O set() altera apenas as linhas que mudaram, então nenhuma escrita é feita se os imortais não mudaram."""
+        player_ids = list(Player.objects.filter(event_id=self.event_id, is_imortal=True).order_by(
+            '-total_score', 'id').values_list('id', flat=True)[:3])
+        self.imortals.set(player_ids)
+
+
+def refresh_imortals(event: Event) -> None:
+    """Recalcula os imortais do evento caso os resultados dos imortais já tenham sido publicados.
+    Deve ser chamado após a publicação e após alterações nas pontuações ou nos jogadores imortais."""
+    if not event.is_imortal_results_published:
+        return
+    results = Results.objects.filter(event=event).first()
+    if results is not None:
+        results.calculate_imortals()
+
+
+def schedule_results_refresh(event_id: int | None) -> None:
+    """Agenda para após o commit da transação o recálculo dos imortais e do placar público do evento
+    (scoreboard.refresh_results), caso algum resultado do evento já tenha sido publicado.
+    Chamado sempre que as pontuações totais ou os jogadores do evento mudam, independente de onde a alteração
+    foi feita (views, admin, importações ou comandos). O recálculo é agendado uma única vez por transação."""
+    if event_id is None:
+        return
+    pending = transaction.get_connection().run_on_commit
+    if any(getattr(func, 'results_event_id', None) == event_id and not func.executed for _, func, _ in pending):
+        return
+
+    def refresh():
+        from api.scoreboard import refresh_results
+        refresh.executed = True
+        event = Event.objects.filter(
+            Q(is_imortal_results_published=True) | Q(is_final_results_published=True), id=event_id).first()
+        if event is not None:
+            with transaction.atomic():
+                refresh_results(event)
+
+    refresh.results_event_id = event_id
+    refresh.executed = False
+    transaction.on_commit(refresh, robust=True)
+
+
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+def schedule_results_refresh_on_player_change(sender, instance, raw=False, **kwargs):
+    """Recalcula os resultados publicados ao criar, editar (ex: is_imortal) ou deletar um jogador."""
+    if not raw:
+        schedule_results_refresh(instance.event_id)
+
+
+class ImportReport(models.Model):
+    """ Modelo para salvar o relatório de erros por linha de uma importação de planilha.
+    fields:
+    - id: UUIDField, identificador do relatório
+    - event: ForeignKey para Event
+    - kind: CharField com o tipo da importação (jogadores ou monitores)
+    - rows: JSONField com as linhas e seus diagnósticos
+    - created_at: DateTimeField
+    """
+    PLAYERS = 'players'
+    STAFF = 'staff'
+    KIND_CHOICES = [(PLAYERS, 'Jogadores'), (STAFF, 'Monitores')]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name='import_reports')
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    rows = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = ("Import Report")
+        verbose_name_plural = ("Import Reports")
+
+    def __str__(self):
+        return f'{self.event} - {self.kind} - {self.created_at}'
+
+
+def invalidate_event_cache_on_change(sender, instance, **kwargs):
+    """Invalida o cache de respostas do evento ao salvar ou deletar um objeto do evento."""
+    if kwargs.get('action', 'post').startswith('pre'):
+        return
+    invalidate_event_cache(instance.event_id)
+
+
+for model in [Player, PlayerScore, Staff, SumulaClassificatoria, SumulaImortal]:
+    post_save.connect(invalidate_event_cache_on_change, sender=model)
+    post_delete.connect(invalidate_event_cache_on_change, sender=model)
+
+for model in [SumulaClassificatoria, SumulaImortal]:
+    m2m_changed.connect(invalidate_event_cache_on_change,
+                        sender=model.referee.through)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_cache_on_event_change(sender, instance, **kwargs):
+    """Invalida o cache de respostas do evento ao alterar o próprio evento (ex: publicação dos resultados)."""
+    invalidate_event_cache(instance.id)
+
+
+post_save.connect(invalidate_event_cache_on_change, sender=Results)
+m2m_changed.connect(invalidate_event_cache_on_change, sender=Results.top4.through)
+m2m_changed.connect(invalidate_event_cache_on_change, sender=Results.imortals.through)
+
+
+def job_file_path(instance: 'Job', filename: str) -> str:
+    """Caminho dos arquivos de uma tarefa no armazenamento (settings.STORAGES['default'])."""
+    return f'jobs/{instance.id}-{filename}'
+
+
+class Job(models.Model):
+    """ Modelo para as tarefas longas executadas em segundo plano (importações, geração de sumulas e exportações).
+    fields:
+    - id: UUIDField, identificador da tarefa
+    - kind: CharField com o tipo da tarefa
+    - status: CharField com o estado da tarefa (pendente, em execução, concluída ou com erro)
+    - event: ForeignKey para Event
+    - created_by: ForeignKey para User que criou a tarefa
+    - payload: JSONField com os parâmetros da tarefa
+    - input_file: FileField com o arquivo enviado para a tarefa, caso exista. É removido ao final da tarefa
+    - progress: PositiveSmallIntegerField com o progresso da tarefa (0 a 100)
+    - result: JSONField com o resultado da tarefa
+    - error: TextField com a mensagem de erro da tarefa
+    - output_file: FileField com o arquivo gerado pela tarefa, caso exista
+    - output_name: CharField com o nome do arquivo gerado
+    - output_content_type: CharField com o tipo do arquivo gerado
+    - attempts: PositiveSmallIntegerField com o número de vezes que a tarefa foi iniciada
+    - created_at, started_at, finished_at: DateTimeField
+    - heartbeat_at: DateTimeField com o último sinal de vida da tarefa em execução (início ou progresso)
+    """
+    IMPORT_PLAYERS = 'import_players'
+    IMPORT_STAFF = 'import_staff'
+    GENERATE_SUMULAS = 'generate_sumulas'
+    EXPORT_PLAYERS = 'export_players'
+    KIND_CHOICES = [
+        (IMPORT_PLAYERS, 'Importação de jogadores'),
+        (IMPORT_STAFF, 'Importação de monitores'),
+        (GENERATE_SUMULAS, 'Geração de sumulas'),
+        (EXPORT_PLAYERS, 'Exportação de jogadores'),
+    ]
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pendente'),
+        (RUNNING, 'Em execução'),
+        (SUCCEEDED, 'Concluída'),
+        (FAILED, 'Com erro'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES)
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name='jobs', null=True, blank=True)
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, related_name='jobs', null=True, blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+    input_file = models.FileField(upload_to=job_file_path, max_length=255, blank=True)
+    progress = models.PositiveSmallIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    output_file = models.FileField(upload_to=job_file_path, max_length=255, blank=True)
+    output_name = models.CharField(max_length=255, blank=True, default='')
+    output_content_type = models.CharField(
+        max_length=255, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        verbose_name = ("Job")
+        verbose_name_plural = ("Jobs")
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f'{self.kind} - {self.status} - {self.created_at}'
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in [self.SUCCEEDED, self.FAILED]
+
+    def delete_input_file(self) -> None:
+        """Remove o arquivo enviado para a tarefa do armazenamento."""
+        if self.input_file:
+            self.input_file.delete(save=False)
+
+    def set_progress(self, progress: int) -> None:
+        """Atualiza o progresso e o sinal de vida da tarefa sem alterar os demais campos."""
+        self.progress = max(0, min(progress, 100))
+        self.heartbeat_at = timezone.now()
+        Job.objects.filter(id=self.id).update(progress=self.progress, heartbeat_at=self.heartbeat_at)
+
+
+@receiver(post_delete, sender=Job)
+def delete_job_files(sender, instance: Job, **kwargs):
+    """Remove os arquivos da tarefa do armazenamento quando a tarefa é removida."""
+    instance.delete_input_file()
+    if instance.output_file:
+        instance.output_file.delete(save=False)
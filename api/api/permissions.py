@@ -1,13 +1,20 @@
-from guardian.shortcuts import assign_perm
+import threading
+from guardian.models import UserObjectPermission
 from django.contrib.auth.models import Permission, Group
 from django.contrib.contenttypes.models import ContentType
 from typing import Type
 from django.db.models import Model
-from django.db.models import Q
-from api.models import Event
+from django.db.models import Exists, OuterRef, Q
+from api.models import Event, Player, Staff
 from users.models import User
 from typing import Optional
 from django.db.models import QuerySet
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
+
+# Cache em memória do processo: nome do grupo -> (id do ContentType de Event, ids e codenames das permissões do grupo)
+_group_permissions_cache: dict[str, tuple[int, list[int], frozenset[str]]] = {}
+_group_permissions_lock = threading.Lock()
 
 
 def assign_permissions(user: User, group: Group, event: Event) -> None:
@@ -16,10 +23,49 @@ def assign_permissions(user: User, group: Group, event: Event) -> None:
         user (User): Usuário ao qual as permissões serão atribuídas
         group (Group): Grupo do usuário
         event (Event): Evento ao qual as permissões serão atribuídas
+
+    As permissões são inseridas com um único bulk_create, ignorando as que o usuário já possui.
     """
-    permissions = filter_permissions(group)
-    for permission in permissions:
-        assign_perm(permission, user, event)
+    content_type_id, permission_ids = get_group_permission_ids(group)
+    UserObjectPermission.objects.bulk_create([
+        UserObjectPermission(user=user, permission_id=permission_id,
+                             content_type_id=content_type_id, object_pk=str(event.pk))
+        for permission_id in permission_ids], ignore_conflicts=True)
+
+
+def load_group_permissions(group_name: str) -> tuple[int, list[int], frozenset[str]]:
+    """ Retorna o id do ContentType de Event e os ids e codenames das permissões do grupo.
+    O resultado é memoizado durante a vida do processo, evitando as consultas de filter_permissions
+    a cada atribuição ou verificação. Grupos sem permissões definidas retornam listas vazias.
+    """
+    cached = _group_permissions_cache.get(group_name)
+    if cached is not None:
+        return cached
+    permissions = filter_permissions(Group(name=group_name))
+    rows = [] if permissions is None else list(permissions.values_list('id', 'codename'))
+    result = (get_content_type(Event).id, [permission_id for permission_id, _ in rows],
+              frozenset(codename for _, codename in rows))
+    with _group_permissions_lock:
+        _group_permissions_cache[group_name] = result
+    return result
+
+
+def get_group_permission_ids(group: Group) -> tuple[int, list[int]]:
+    """ Retorna o id do ContentType de Event e os ids das permissões do grupo."""
+    content_type_id, permission_ids, _ = load_group_permissions(group.name)
+    return content_type_id, permission_ids
+
+
+def get_group_codenames(group_name: str) -> frozenset[str]:
+    """ Retorna os codenames das permissões do grupo."""
+    return load_group_permissions(group_name)[2]
+
+
+@receiver(post_migrate)
+def clear_group_permissions_cache(**kwargs) -> None:
+    """Limpa o cache de permissões dos grupos, já que as permissões podem ser recriadas após as migrações."""
+    with _group_permissions_lock:
+        _group_permissions_cache.clear()
 
 
 def filter_permissions(group: Group) -> Optional[QuerySet[Permission]]:
@@ -42,3 +88,69 @@ def get_content_type(model: Type[Model]) -> ContentType:
 
 def get_permissions(content_type) -> QuerySet[Permission]:
     return Permission.objects.filter(content_type=content_type)
+
+
+class EventAuthorization:
+    """ Papéis de um usuário em um evento, resolvidos com uma única consulta.
+    Os papéis são derivados dos dados do evento: o email do administrador, os monitores (e gerentes)
+    e os jogadores vinculados ao usuário. As permissões de cada papel são as do grupo correspondente
+    em filter_permissions, verificadas em memória.
+    """
+
+    def __init__(self, user: User, event: Event):
+        row = Event.objects.filter(pk=event.pk).annotate(
+            is_manager=Exists(Staff.objects.filter(event=OuterRef('pk'), user=user, is_manager=True)),
+            is_staff=Exists(Staff.objects.filter(event=OuterRef('pk'), user=user)),
+            is_player=Exists(Player.objects.filter(event=OuterRef('pk'), user=user)),
+            is_member=Exists(User.events.through.objects.filter(event=OuterRef('pk'), user=user)),
+        ).values('admin_email', 'is_manager', 'is_staff', 'is_player', 'is_member').first() or {}
+        self.is_admin = bool(user.email) and row.get('admin_email') == user.email
+        self.is_manager = row.get('is_manager', False)
+        self.is_staff = row.get('is_staff', False)
+        self.is_player = row.get('is_player', False)
+        self.is_member = row.get('is_member', False)
+
+    @property
+    def groups(self) -> list[str]:
+        """Retorna os nomes dos grupos correspondentes aos papéis do usuário no evento."""
+        roles = [('event_admin', self.is_admin), ('staff_manager', self.is_manager),
+                 ('staff_member', self.is_staff), ('player', self.is_player)]
+        return [group_name for group_name, has_role in roles if has_role]
+
+    def has_perm(self, perm: str) -> bool:
+        """Verifica se algum papel do usuário concede a permissão (ex: 'api.change_event')."""
+        codename = perm.split('.', 1)[-1]
+        return any(codename in get_group_codenames(group_name) for group_name in self.groups)
+
+
+def get_event_authorization(request, event: Event) -> EventAuthorization:
+    """ Retorna os papéis do usuário da requisição no evento.
+    Os papéis são resolvidos uma vez por requisição e evento e reaproveitados pelas classes de permissão e pela view.
+    """
+    authorizations = getattr(request, '_event_authorizations', None)
+    if authorizations is None:
+        authorizations = request._event_authorizations = {}
+    if event.pk not in authorizations:
+        authorizations[event.pk] = EventAuthorization(request.user, event)
+    return authorizations[event.pk]
+
+
+def has_event_permission(request, perm: str, event: Event) -> bool:
+    """ Verifica se o usuário da requisição possui a permissão perm no evento.
+    Superusuários possuem todas as permissões. As permissões dos papéis do usuário são verificadas em memória;
+    apenas quando nenhum papel concede a permissão as permissões de objeto atribuídas diretamente
+    ao usuário (UserObjectPermission) são consultadas.
+    """
+    user = request.user
+    if not user.is_authenticated or not user.is_active:
+        return False
+    if user.is_superuser:
+        return True
+    if get_event_authorization(request, event).has_perm(perm):
+        return True
+    return user.has_perm(perm, event)
+
+
+def is_event_member(request, event: Event) -> bool:
+    """ Verifica se o evento está entre os eventos do usuário da requisição, sem carregar todos os eventos do usuário."""
+    return get_event_authorization(request, event).is_member
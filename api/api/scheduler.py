@@ -0,0 +1,48 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def round_robin_schedule(n: int) -> tuple[tuple[tuple[int, int | None], ...], ...]:
+    """Gera as rodadas de um torneio todos contra todos para n jogadores pelo método do círculo.
+    Os jogadores são identificados pelo seu número na chave (de 1 a n).
+    Caso n seja ímpar, um jogador fica sem par a cada rodada, representado por (jogador, None).
+    O resultado é memorizado por número de jogadores.
+    """
+    if n < 2:
+        raise ValueError("Número de jogadores insuficiente para formar duplas!")
+    seats = list(range(1, n + 1))
+    if n % 2 != 0:
+        seats.append(None)
+    size = len(seats)
+    rounds = []
+    for _ in range(size - 1):
+        pairs = []
+        for i in range(size // 2):
+            p1, p2 = seats[i], seats[size - 1 - i]
+            if p1 is None or (p2 is not None and p2 < p1):
+                p1, p2 = p2, p1
+            pairs.append((p1, p2))
+        pairs.sort(key=lambda pair: pair[0])
+        rounds.append(tuple(pairs))
+        # Mantém o primeiro jogador fixo e gira os demais
+        seats = [seats[0], seats[-1]] + seats[1:-1]
+    return tuple(rounds)
+
+
+ROUNDS_VERSION = 2
+
+
+def compact_rounds(schedule, ids_by_seat: dict[int, int]) -> dict:
+    """Converte as rodadas de números de jogadores para ids de PlayerScore.
+    Formato armazenado em Sumula.rounds: {'version': 2, 'rounds': [[[id1, id2 | None], ...], ...]}
+    """
+    return {
+        'version': ROUNDS_VERSION,
+        'rounds': [[[ids_by_seat[p1], ids_by_seat[p2] if p2 else None] for p1, p2 in round_pairs]
+                   for round_pairs in schedule],
+    }
+
+
+def is_compact_rounds(rounds) -> bool:
+    """Verifica se as rodadas estão armazenadas no formato compacto."""
+    return isinstance(rounds, dict) and rounds.get('version') == ROUNDS_VERSION
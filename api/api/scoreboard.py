@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.utils import timezone
+from .leaderboard import leaderboard_page
+from .models import Event, Player, Results, refresh_imortals
+
+# Tempo (em segundos) em que o placar pode ser servido pelo cache do navegador, CDN ou proxy reverso
+SCOREBOARD_MAX_AGE = getattr(settings, 'SCOREBOARD_MAX_AGE', 5)
+# Tempo (em segundos) em que um placar expirado ainda pode ser servido enquanto é revalidado em segundo plano
+SCOREBOARD_STALE_WHILE_REVALIDATE = getattr(settings, 'SCOREBOARD_STALE_WHILE_REVALIDATE', 60)
+SCOREBOARD_LEADERBOARD_SIZE = 100
+# Campos públicos dos jogadores, os mesmos de PlayerResultsSerializer
+PUBLIC_PLAYER_FIELDS = ['id', 'total_score', 'full_name', 'social_name']
+
+
+def ranked_players(event: Event, limit: int = SCOREBOARD_LEADERBOARD_SIZE) -> list[dict]:
+    """Retorna a primeira página da classificação dos jogadores classificados (não imortais) do evento,
+    com a posição calculada por DenseRank (jogadores empatados têm a mesma posição)."""
+    return leaderboard_page(event, is_imortal=False, limit=limit)[0]
+
+
+def public_players(players) -> list[dict]:
+    return list(players.order_by('-total_score', 'id').values(*PUBLIC_PLAYER_FIELDS))
+
+
+def public_player(player: Player | None) -> dict | None:
+    return None if player is None else {field: getattr(player, field) for field in PUBLIC_PLAYER_FIELDS}
+
+
+def build_scoreboard(event: Event, results: Results) -> dict | None:
+    """Gera o placar público do evento com apenas os resultados já publicados.
+    Retorna None caso nenhum resultado tenha sido publicado."""
+    if not event.is_imortal_results_published and not event.is_final_results_published:
+        return None
+    final = event.is_final_results_published
+    return {
+        'event': {'name': event.name},
+        'imortals': public_players(results.imortals.all()) if event.is_imortal_results_published else None,
+        'top4': public_players(results.top4.all()) if final else None,
+        'paladin': public_player(results.paladin) if final else None,
+        'ambassor': public_player(results.ambassor) if final else None,
+        'leaderboard': ranked_players(event) if final else None,
+        'updated_at': timezone.now().isoformat(),
+    }
+
+
+def refresh_scoreboard(event: Event) -> None:
+    """Gera novamente o placar público do evento e o salva em Results.
+    Caso nenhum resultado esteja publicado, o placar salvo é removido."""
+    if not event.is_imortal_results_published and not event.is_final_results_published:
+        Results.objects.filter(event=event, scoreboard__isnull=False).update(
+            scoreboard=None, scoreboard_updated_at=timezone.now())
+        return
+    results = Results.objects.select_related('paladin', 'ambassor').filter(event=event).first()
+    if results is None:
+        return
+    scoreboard = build_scoreboard(event, results)
+    Results.objects.filter(id=results.id).update(
+        scoreboard=scoreboard, scoreboard_updated_at=timezone.now())
+
+
+def refresh_results(event: Event) -> None:
+    """Recalcula os imortais e o placar público do evento.
+    Deve ser chamado após a publicação ou revogação dos resultados e após alterações nas pontuações."""
+    refresh_imortals(event)
+    refresh_scoreboard(event)
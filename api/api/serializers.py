@@ -1,7 +1,9 @@
 from rest_framework.serializers import ModelSerializer
 from rest_framework import serializers
-from api.models import SumulaClassificatoria, Token, Event, Sumula, PlayerScore, Player, Staff, SumulaImortal, Results
+from django.urls import reverse
+from api.models import Job, SumulaClassificatoria, Token, Event, Sumula, PlayerScore, Player, Staff, SumulaImortal, Results
 from users.models import User
+from api.scheduler import is_compact_rounds
 
 
 class UserSerializer(ModelSerializer):
@@ -42,11 +44,11 @@ class TokenSerializer(ModelSerializer):
 
 class EventSerializer(ModelSerializer):
     """ Serializer for the Event model.
-    fields: 'id', 'name','active'
+    fields: 'id', 'name','active', 'scoreboard_slug'
     """
     class Meta:
         model = Event
-        fields = ['id', 'name', 'active']
+        fields = ['id', 'name', 'active', 'scoreboard_slug']
 
 
 class UserEventsSerializer(serializers.Serializer):
@@ -79,6 +81,25 @@ class PlayerScoreForRoundRobinSerializer(ModelSerializer):
         fields = ['id', 'rounds_number', 'player']
 
 
+class SumulaRoundsSerializer(ModelSerializer):
+    """ Base serializer for the Sumula models.
+    Hydrates the rounds, stored only with PlayerScore ids, from a single id -> PlayerScore map.
+    """
+    rounds = serializers.SerializerMethodField()
+
+    def get_rounds(self, obj):
+        if not is_compact_rounds(obj.rounds):
+            return obj.rounds
+        if 'scores' in getattr(obj, '_prefetched_objects_cache', {}):
+            scores = obj.scores.all()
+        else:
+            scores = obj.scores.select_related('player')
+        scores_map = {score['id']: score for score in PlayerScoreForRoundRobinSerializer(
+            scores, many=True).data}
+        return [[{'player1': scores_map.get(player1), 'player2': scores_map.get(player2)}
+                 for player1, player2 in round_pairs] for round_pairs in obj.rounds['rounds']]
+
+
 class StaffSerializer(ModelSerializer):
     """ Serializer for the Staff model.
     fields: id, full_name, event, registration_email
@@ -89,9 +110,9 @@ class StaffSerializer(ModelSerializer):
         fields = ['id', 'full_name', 'registration_email', 'is_manager']
 
 
-class SumulaClassificatoriaSerializer(ModelSerializer):
+class SumulaClassificatoriaSerializer(SumulaRoundsSerializer):
     """ Serializer for the SumulaClassificatoria model.
-    fields: id, active, description, referee, name, players_score
+    fields: id, active, description, referee, name, players_score, rounds, version
     """
     players_score = PlayerScoreSerializer(
         source='scores', many=True)
@@ -100,12 +121,12 @@ class SumulaClassificatoriaSerializer(ModelSerializer):
     class Meta:
         model = SumulaClassificatoria
         fields = ['id', 'active', 'name',
-                  'description', 'referee',  'players_score', 'rounds']
+                  'description', 'referee',  'players_score', 'rounds', 'version']
 
 
-class SumulaImortalSerializer(ModelSerializer):
+class SumulaImortalSerializer(SumulaRoundsSerializer):
     """ Serializer for the Sumula model.
-    fields: id, active, description, referee, name, players_score
+    fields: id, active, description, referee, name, players_score, rounds, version
     """
     players_score = PlayerScoreSerializer(
         source='scores', many=True)
@@ -114,7 +135,7 @@ class SumulaImortalSerializer(ModelSerializer):
     class Meta:
         model = SumulaImortal
         fields = ['id', 'active', 'name',
-                  'description', 'referee',  'players_score', 'rounds']
+                  'description', 'referee',  'players_score', 'rounds', 'version']
 
 
 class SumulaSerializer(serializers.Serializer):
@@ -142,7 +163,7 @@ class PlayerScoreForPlayerSerializer(ModelSerializer):
         fields = ['player']
 
 
-class SumulaClassificatoriaForPlayerSerializer(ModelSerializer):
+class SumulaClassificatoriaForPlayerSerializer(SumulaRoundsSerializer):
     """ Serializer for the Sumula model.
     fields: id, active, referee, name, players_score
     """
@@ -155,7 +176,7 @@ class SumulaClassificatoriaForPlayerSerializer(ModelSerializer):
                   'referee', 'players', 'rounds']
 
 
-class SumulaImortalForPlayerSerializer(ModelSerializer):
+class SumulaImortalForPlayerSerializer(SumulaRoundsSerializer):
     """ Serializer for the Sumula model.
     fields: id, active, referee, name, players_score
     """
@@ -189,6 +210,13 @@ class UploadFileSerializer(serializers.Serializer):
     file = serializers.FileField()
 
 
+class UploadSnapshotSerializer(UploadFileSerializer):
+    """ Serializer for the event snapshot upload.
+    fields: file, name (optional name for the restored event)
+    """
+    name = serializers.CharField(required=False)
+
+
 class StaffLoginSerializer(ModelSerializer):
     event = EventSerializer()
 
@@ -240,3 +268,21 @@ class ResultsSerializer(ModelSerializer):
             return None
         result = PlayerResultsSerializer(obj.paladin).data
         return result
+
+
+class JobSerializer(ModelSerializer):
+    """ Serializer for the Job model.
+    fields: id, kind, status, event, progress, result, error, download_url, created_at, started_at, finished_at
+    download_url is only filled when the job produced a file.
+    """
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = ['id', 'kind', 'status', 'event', 'progress', 'result', 'error',
+                  'download_url', 'created_at', 'started_at', 'finished_at']
+
+    def get_download_url(self, obj):
+        if obj.status != Job.SUCCEEDED or not obj.output_file:
+            return None
+        return reverse('api:job-download', kwargs={'job_id': obj.id})
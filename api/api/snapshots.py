@@ -0,0 +1,252 @@
+import gzip
+import json
+from typing import IO
+from django.contrib.auth.models import Group
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, models, transaction
+from django.forms import ValidationError
+from django.utils import timezone
+from .models import Event, Player, PlayerScore, Results, Staff, SumulaClassificatoria, SumulaImortal, Token
+from .permissions import assign_permissions
+from .scheduler import is_compact_rounds
+from .scoreboard import refresh_scoreboard
+from users.models import User
+
+SNAPSHOT_FORMAT = 'rei-da-derivada/event-snapshot'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_BATCH_SIZE = 1000
+SNAPSHOT_CONTENT_TYPE = 'application/gzip'
+# Campos que não são copiados: ids e vínculos com o evento, com o token e com os usuários.
+# Os usuários voltam a se vincular ao evento restaurado pelo seu novo código de acesso.
+# O placar público recebe um novo identificador e é gerado novamente a partir dos dados restaurados.
+EXCLUDED_FIELDS = {'id', 'event', 'token', 'join_token', 'user', 'scoreboard_slug', 'scoreboard', 'scoreboard_updated_at'}
+
+SumulaImortalReferee = SumulaImortal.referee.through
+SumulaClassificatoriaReferee = SumulaClassificatoria.referee.through
+ResultsImortals = Results.imortals.through
+ResultsTop4 = Results.top4.through
+RESULTS_PLAYER_FIELDS = ['paladin_id', 'ambassor_id']
+
+
+def model_fields(model: type[models.Model]) -> list[str]:
+    """Retorna os nomes das colunas copiadas de um model (chaves estrangeiras terminam em _id)."""
+    return [field.attname for field in model._meta.concrete_fields if field.name not in EXCLUDED_FIELDS]
+
+
+def dump_table(queryset: models.QuerySet, fields: list[str]) -> dict:
+    """Lê uma tabela com uma única consulta, no formato {'fields': [...], 'rows': [[...], ...]}."""
+    return {'fields': fields, 'rows': [list(row) for row in queryset.order_by('pk').values_list(*fields)]}
+
+
+def export_event(event: Event) -> dict:
+    """Serializa o evento, seus monitores, jogadores, sumulas, pontuações e resultados.
+    Cada tabela é lida com uma única consulta, com os ids originais para as referências entre as tabelas."""
+    results = Results.objects.filter(event=event).first()
+    return {
+        'format': SNAPSHOT_FORMAT,
+        'version': SNAPSHOT_VERSION,
+        'created_at': timezone.now(),
+        'event': {field: getattr(event, field) for field in model_fields(Event)},
+        'staff': dump_table(Staff.objects.filter(event=event), ['id', *model_fields(Staff)]),
+        'players': dump_table(Player.objects.filter(event=event), ['id', *model_fields(Player)]),
+        'sumulas_imortal': dump_table(
+            SumulaImortal.objects.filter(event=event), ['id', *model_fields(SumulaImortal)]),
+        'sumulas_classificatoria': dump_table(
+            SumulaClassificatoria.objects.filter(event=event), ['id', *model_fields(SumulaClassificatoria)]),
+        'sumula_imortal_referees': dump_table(
+            SumulaImortalReferee.objects.filter(sumulaimortal__event=event), ['sumulaimortal_id', 'staff_id']),
+        'sumula_classificatoria_referees': dump_table(
+            SumulaClassificatoriaReferee.objects.filter(sumulaclassificatoria__event=event),
+            ['sumulaclassificatoria_id', 'staff_id']),
+        'scores': dump_table(PlayerScore.objects.filter(event=event), ['id', *model_fields(PlayerScore)]),
+        'results': None if results is None else {
+            **{field: getattr(results, field) for field in model_fields(Results)},
+            'imortals': list(ResultsImortals.objects.filter(results=results).values_list('player_id', flat=True)),
+            'top4': list(ResultsTop4.objects.filter(results=results).values_list('player_id', flat=True)),
+        },
+    }
+
+
+def write_snapshot(event: Event, output: IO[bytes]) -> None:
+    """Escreve o snapshot do evento em output como um JSON compactado com gzip."""
+    with gzip.GzipFile(fileobj=output, mode='wb') as archive:
+        archive.write(json.dumps(export_event(event), cls=DjangoJSONEncoder).encode('utf-8'))
+
+
+# Tabelas do snapshot com as colunas obrigatórias de cada uma
+SNAPSHOT_TABLES = {
+    'staff': ['id'],
+    'players': ['id'],
+    'sumulas_imortal': ['id'],
+    'sumulas_classificatoria': ['id'],
+    'sumula_imortal_referees': ['sumulaimortal_id', 'staff_id'],
+    'sumula_classificatoria_referees': ['sumulaclassificatoria_id', 'staff_id'],
+    'scores': ['id', 'player_id', 'sumula_imortal_id', 'sumula_classificatoria_id'],
+}
+# Referências entre as tabelas: (tabela, coluna, tabela referenciada, aceita nulo)
+SNAPSHOT_REFERENCES = [
+    ('sumula_imortal_referees', 'sumulaimortal_id', 'sumulas_imortal', False),
+    ('sumula_imortal_referees', 'staff_id', 'staff', False),
+    ('sumula_classificatoria_referees', 'sumulaclassificatoria_id', 'sumulas_classificatoria', False),
+    ('sumula_classificatoria_referees', 'staff_id', 'staff', False),
+    ('scores', 'player_id', 'players', False),
+    ('scores', 'sumula_imortal_id', 'sumulas_imortal', True),
+    ('scores', 'sumula_classificatoria_id', 'sumulas_classificatoria', True),
+]
+INVALID_SNAPSHOT_ERROR_MESSAGE = 'Arquivo de snapshot inválido!'
+
+
+def table_column(table: dict, field: str) -> list:
+    index = table['fields'].index(field)
+    return [row[index] for row in table['rows']]
+
+
+def validate_snapshot(data) -> None:
+    """Valida a estrutura de um snapshot: as tabelas, suas colunas e as referências entre elas.
+    - ValidationError: Se o snapshot for inválido."""
+    if not isinstance(data, dict) or data.get('format') != SNAPSHOT_FORMAT:
+        raise ValidationError(INVALID_SNAPSHOT_ERROR_MESSAGE)
+    if data.get('version') != SNAPSHOT_VERSION:
+        raise ValidationError(f"Versão de snapshot não suportada: {data.get('version')}")
+    if not isinstance(data.get('event'), dict):
+        raise ValidationError(f'{INVALID_SNAPSHOT_ERROR_MESSAGE} Evento ausente.')
+    for name, required in SNAPSHOT_TABLES.items():
+        table = data.get(name)
+        if (not isinstance(table, dict) or not isinstance(table.get('fields'), list)
+                or not isinstance(table.get('rows'), list)):
+            raise ValidationError(f'{INVALID_SNAPSHOT_ERROR_MESSAGE} Tabela {name} ausente ou inválida.')
+        if not all(isinstance(field, str) for field in table['fields']) or set(required) - set(table['fields']):
+            raise ValidationError(f'{INVALID_SNAPSHOT_ERROR_MESSAGE} Colunas da tabela {name} inválidas.')
+        if not all(isinstance(row, list) and len(row) == len(table['fields']) for row in table['rows']):
+            raise ValidationError(f'{INVALID_SNAPSHOT_ERROR_MESSAGE} Linhas da tabela {name} inválidas.')
+    ids = {name: table_column(data[name], 'id') for name, required in SNAPSHOT_TABLES.items() if 'id' in required}
+    if not all(type(value) is int for values in ids.values() for value in values):
+        raise ValidationError(f'{INVALID_SNAPSHOT_ERROR_MESSAGE} Ids inválidos.')
+    ids = {name: set(values) for name, values in ids.items()}
+    for name, field, target, nullable in SNAPSHOT_REFERENCES:
+        for value in table_column(data[name], field):
+            if not (value is None and nullable) and value not in ids[target]:
+                raise ValidationError(
+                    f'{INVALID_SNAPSHOT_ERROR_MESSAGE} Referência inválida em {name}.{field}: {value}')
+    results = data.get('results')
+    if results is None:
+        return
+    if (not isinstance(results, dict) or not isinstance(results.get('imortals'), list)
+            or not isinstance(results.get('top4'), list)):
+        raise ValidationError(f'{INVALID_SNAPSHOT_ERROR_MESSAGE} Resultados inválidos.')
+    players = [*results['imortals'], *results['top4'], *(results.get(field) for field in RESULTS_PLAYER_FIELDS)]
+    if any(player_id is not None and player_id not in ids['players'] for player_id in players):
+        raise ValidationError(f'{INVALID_SNAPSHOT_ERROR_MESSAGE} Jogador inválido nos resultados.')
+
+
+def read_snapshot(file: IO[bytes]) -> dict:
+    """Lê e valida um snapshot compactado.
+    - ValidationError: Se o arquivo não for um snapshot de evento válido."""
+    try:
+        with gzip.GzipFile(fileobj=file, mode='rb') as archive:
+            data = json.loads(archive.read())
+    except (OSError, EOFError, ValueError):
+        raise ValidationError(INVALID_SNAPSHOT_ERROR_MESSAGE)
+    validate_snapshot(data)
+    return data
+
+
+def remap(value, id_map: dict[int, int]):
+    return None if value is None else id_map[value]
+
+
+def insert_rows(model: type[models.Model], table: dict, values: dict, id_maps: dict[str, dict[int, int]]) -> dict[int, int]:
+    """Insere as linhas de uma tabela do snapshot com um bulk_create, trocando as chaves estrangeiras
+    pelos novos ids de id_maps. Retorna o mapa de ids antigos para os novos ids."""
+    fields = table['fields']
+    # Colunas que não existem mais no model são ignoradas
+    allowed = {'id', *model_fields(model)}
+    old_ids, objs = [], []
+    for row in table['rows']:
+        record = {field: value for field, value in zip(fields, row) if field in allowed}
+        old_ids.append(record.pop('id'))
+        for attname, id_map in id_maps.items():
+            record[attname] = remap(record.get(attname), id_map)
+        objs.append(model(**record, **values))
+    created = model.objects.bulk_create(objs, batch_size=SNAPSHOT_BATCH_SIZE)
+    return {old_id: obj.pk for old_id, obj in zip(old_ids, created)}
+
+
+def insert_links(through: type[models.Model], table: dict, id_maps: dict[str, dict[int, int]]) -> None:
+    """Insere as linhas de uma tabela de ligação ManyToMany com um bulk_create."""
+    fields = table['fields']
+    through.objects.bulk_create([
+        through(**{field: remap(value, id_maps[field]) for field, value in zip(fields, row)})
+        for row in table['rows']], batch_size=SNAPSHOT_BATCH_SIZE)
+
+
+def remap_rounds(sumulas: list[SumulaImortal] | list[SumulaClassificatoria], scores_map: dict[int, int]) -> None:
+    """Troca os ids de PlayerScore das rodadas compactas pelos novos ids."""
+    for sumula in sumulas:
+        if is_compact_rounds(sumula.rounds):
+            sumula.rounds = {**sumula.rounds, 'rounds': [
+                [[remap(player1, scores_map), remap(player2, scores_map)] for player1, player2 in round_pairs]
+                for round_pairs in sumula.rounds['rounds']]}
+
+
+def restore_event(data: dict, name: str | None = None, admin: User | None = None) -> Event:
+    """Cria um novo evento a partir de um snapshot, com um bulk_create por tabela.
+    O evento restaurado recebe um novo token (já utilizado) e um novo código de acesso.
+    Caso admin seja fornecido, ele se torna o administrador do evento restaurado (admin_email) e recebe as suas permissões.
+    O admin_email do snapshot não é copiado.
+    - ValidationError: Se os valores do snapshot não puderem ser salvos (ex: tipos inválidos)."""
+    try:
+        return _restore_event(data, name, admin)
+    except (DatabaseError, KeyError, TypeError, ValueError):
+        raise ValidationError(f'{INVALID_SNAPSHOT_ERROR_MESSAGE} Valores inválidos.')
+
+
+def _restore_event(data: dict, name: str | None, admin: User | None) -> Event:
+    with transaction.atomic():
+        event_fields = {field: value for field, value in data['event'].items()
+                        if field in model_fields(Event)}
+        if name:
+            event_fields['name'] = name
+        # O administrador do evento original não recebe autoridade sobre o evento restaurado
+        event_fields['admin_email'] = admin.email if admin is not None else ''
+        event = Event.objects.create(token=Token.objects.create(used=True), **event_fields)
+        values = {'event': event}
+
+        staff_map = insert_rows(Staff, data['staff'], values, {})
+        players_map = insert_rows(Player, data['players'], values, {})
+        imortal_map = insert_rows(SumulaImortal, data['sumulas_imortal'], values, {})
+        classificatoria_map = insert_rows(
+            SumulaClassificatoria, data['sumulas_classificatoria'], values, {})
+        insert_links(SumulaImortalReferee, data['sumula_imortal_referees'],
+                     {'sumulaimortal_id': imortal_map, 'staff_id': staff_map})
+        insert_links(SumulaClassificatoriaReferee, data['sumula_classificatoria_referees'],
+                     {'sumulaclassificatoria_id': classificatoria_map, 'staff_id': staff_map})
+        scores_map = insert_rows(PlayerScore, data['scores'], values, {
+            'player_id': players_map,
+            'sumula_imortal_id': imortal_map,
+            'sumula_classificatoria_id': classificatoria_map,
+        })
+
+        for model, id_map in [(SumulaImortal, imortal_map), (SumulaClassificatoria, classificatoria_map)]:
+            sumulas = [sumula for sumula in model.objects.filter(id__in=id_map.values()).only('id', 'rounds')
+                       if is_compact_rounds(sumula.rounds)]
+            remap_rounds(sumulas, scores_map)
+            model.objects.bulk_update(sumulas, ['rounds'], batch_size=SNAPSHOT_BATCH_SIZE)
+
+        if data['results'] is not None:
+            results_data = data['results']
+            results = Results.objects.create(event=event, **{
+                field: remap(results_data.get(field), players_map) if field in RESULTS_PLAYER_FIELDS
+                else results_data.get(field) for field in model_fields(Results) if field in results_data})
+            ResultsImortals.objects.bulk_create([
+                ResultsImortals(results=results, player_id=players_map[player_id])
+                for player_id in results_data['imortals']])
+            ResultsTop4.objects.bulk_create([
+                ResultsTop4(results=results, player_id=players_map[player_id])
+                for player_id in results_data['top4']])
+            refresh_scoreboard(event)
+
+        if admin is not None:
+            assign_permissions(admin, Group.objects.get(name='event_admin'), event)
+            admin.events.add(event)
+    return event
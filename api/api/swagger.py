@@ -10,6 +10,7 @@ sumula_imortal_api_put_schema = openapi.Schema(
         'id': openapi.Schema(type=openapi.TYPE_INTEGER, description='ID da sumula', example=1),
         'name': openapi.Schema(type=openapi.TYPE_STRING, description='Nome da sumula', example='Imortais 01'),
         'description': openapi.Schema(type=openapi.TYPE_STRING, description='Descrição da sumula', example='Sala S4'),
+        'version': openapi.Schema(type=openapi.TYPE_INTEGER, description='Versão da sumula lida pelo cliente (obrigatória). Caso a sumula tenha sido alterada desde então, retorna 409', example=1),
         'referee': openapi.Schema(
             type=openapi.TYPE_ARRAY,
             items=openapi.Schema(
@@ -46,7 +47,7 @@ sumula_imortal_api_put_schema = openapi.Schema(
             )
         ),
     },
-    required=['id', 'name', 'referee', 'players_score']
+    required=['id', 'name', 'referee', 'players_score', 'version']
 )
 
 sumula_classicatoria_api_put_schema = openapi.Schema(
@@ -56,6 +57,7 @@ sumula_classicatoria_api_put_schema = openapi.Schema(
         'id': openapi.Schema(type=openapi.TYPE_INTEGER, description='ID da sumula', example=1),
         'name': openapi.Schema(type=openapi.TYPE_STRING, description='Nome da sumula', example='Chave A'),
         'description': openapi.Schema(type=openapi.TYPE_STRING, description='Descrição da sumula', example='Sala S4'),
+        'version': openapi.Schema(type=openapi.TYPE_INTEGER, description='Versão da sumula lida pelo cliente (obrigatória). Caso a sumula tenha sido alterada desde então, retorna 409', example=1),
         'referee': openapi.Schema(
             type=openapi.TYPE_ARRAY,
             items=openapi.Schema(
@@ -96,7 +98,7 @@ sumula_classicatoria_api_put_schema = openapi.Schema(
                 'id': openapi.Schema(type=openapi.TYPE_INTEGER, description='ID do jogador', example=1),
             })),
     },
-    required=['id', 'name', 'referee', 'players_score', 'imortal_players']
+    required=['id', 'name', 'referee', 'players_score', 'imortal_players', 'version']
 )
 
 indivual_sumulas_response_schema = openapi.Schema(title='Sumula', type=openapi.TYPE_OBJECT, properties={
@@ -104,6 +106,7 @@ indivual_sumulas_response_schema = openapi.Schema(title='Sumula', type=openapi.T
     'active': openapi.Schema(type=openapi.TYPE_BOOLEAN, description='Se a sumula está ativa', example=True),
     'name': openapi.Schema(type=openapi.TYPE_STRING, description='Nome da sumula', example='Sumula 1'),
     'description': openapi.Schema(type=openapi.TYPE_STRING, description='Descrição da sumula', example='Sala S4'),
+    'version': openapi.Schema(type=openapi.TYPE_INTEGER, description='Versão da sumula, incrementada a cada edição', example=1),
     'referee': openapi.Schema(
         type=openapi.TYPE_ARRAY,
         items=openapi.Schema(
@@ -409,10 +412,118 @@ sumulas_response_for_player_schema = openapi.Schema(
 manual_parameter_event_id = [openapi.Parameter(
     'event_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Id do evento')]
 
+manual_parameter_dry_run = [openapi.Parameter(
+    'dry_run', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, description='Retorna apenas a prévia das chaves, sem gravar no banco de dados')]
+
+manual_parameters_export_players = manual_parameter_event_id + [
+    openapi.Parameter('file_format', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['xlsx', 'csv'],
+                      description='Formato do arquivo exportado (padrão: xlsx)'),
+    openapi.Parameter('background', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN,
+                      description='Gera o arquivo em segundo plano, em vez de transmiti-lo diretamente na resposta')]
+
+manual_parameters_user_events = [
+    openapi.Parameter('active', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN,
+                      description='Retorna apenas os eventos ativos (true) ou inativos (false)'),
+    openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                      description='Quantidade máxima de eventos retornados (máximo 100). Quando informado, a resposta é paginada'),
+    openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                      description='Valor de next_cursor retornado pela página anterior')]
+
+manual_parameters_leaderboard = manual_parameter_event_id + [
+    openapi.Parameter('category', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['classificatoria', 'imortal'],
+                      description='Categoria da classificação (padrão: classificatoria)'),
+    openapi.Parameter('tie_break', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['score', 'head_to_head'],
+                      description='Critério de desempate: apenas a pontuação total (padrão) ou, em seguida, os pontos nos confrontos diretos'),
+    openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                      description='Quantidade máxima de jogadores retornados (padrão 50, máximo 100)'),
+    openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                      description='Valor de next_cursor retornado pela página anterior')]
+
+manual_parameters_import_report = manual_parameter_event_id + [
+    openapi.Parameter('report_id', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                      description='Id do relatório de importação'),
+    openapi.Parameter('file_format', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['csv', 'xlsx'],
+                      description='Formato do arquivo do relatório (padrão: csv)')]
+
+generate_sumulas_dry_run_response_schema = openapi.Schema(
+    title='Chaves', type=openapi.TYPE_ARRAY, items=openapi.Schema(
+        title='Chave', type=openapi.TYPE_OBJECT, properties={
+            'name': openapi.Schema(type=openapi.TYPE_STRING, description='Nome da chave', example='Chave A'),
+            'size': openapi.Schema(type=openapi.TYPE_INTEGER, description='Número de jogadores da chave', example=8),
+            'players': openapi.Schema(
+                type=openapi.TYPE_ARRAY, items=openapi.Schema(
+                    title='Jogador', type=openapi.TYPE_OBJECT, properties={
+                        'rounds_number': openapi.Schema(type=openapi.TYPE_INTEGER, description='Número do jogador na chave', example=1),
+                        'player': openapi.Schema(
+                            type=openapi.TYPE_OBJECT, title='Player', properties={
+                                'id': openapi.Schema(type=openapi.TYPE_INTEGER, description='ID do jogador', example=1),
+                                'full_name': openapi.Schema(type=openapi.TYPE_STRING, description='Nome completo do jogador', example='João Silva Jacinto'),
+                                'social_name': openapi.Schema(type=openapi.TYPE_STRING, description='Nome social do jogador', example='João Silva'),
+                            }),
+                    })),
+        }))
+
 array_of_sumulas_response_schema = openapi.Schema(
     title='Sumulas', type=openapi.TYPE_ARRAY, items=indivual_sumulas_response_schema)
 
 
+job_accepted_response_schema = openapi.Schema(
+    title='Tarefa', type=openapi.TYPE_OBJECT, properties={
+        'job_id': openapi.Schema(type=openapi.TYPE_STRING, description='Id da tarefa', example='3fa85f64-5717-4562-b3fc-2c963f66afa6'),
+        'status': openapi.Schema(type=openapi.TYPE_STRING, description='Estado da tarefa', enum=['pending', 'running', 'succeeded', 'failed']),
+        'url': openapi.Schema(type=openapi.TYPE_STRING, description='Rota para acompanhar a tarefa', example='/api/jobs/3fa85f64-5717-4562-b3fc-2c963f66afa6/'),
+    })
+
+job_response_schema = openapi.Schema(
+    title='Tarefa', type=openapi.TYPE_OBJECT, properties={
+        'id': openapi.Schema(type=openapi.TYPE_STRING, description='Id da tarefa'),
+        'kind': openapi.Schema(type=openapi.TYPE_STRING, description='Tipo da tarefa', enum=['import_players', 'import_staff', 'generate_sumulas', 'export_players']),
+        'status': openapi.Schema(type=openapi.TYPE_STRING, description='Estado da tarefa', enum=['pending', 'running', 'succeeded', 'failed']),
+        'progress': openapi.Schema(type=openapi.TYPE_INTEGER, description='Progresso da tarefa (0 a 100)', example=100),
+        'result': openapi.Schema(type=openapi.TYPE_OBJECT, description='Resultado da tarefa', example={'message': 'Jogadores adicionados com sucesso!'}),
+        'error': openapi.Schema(type=openapi.TYPE_STRING, description='Mensagem de erro da tarefa', example=''),
+        'download_url': openapi.Schema(type=openapi.TYPE_STRING, description='Rota para baixar o arquivo gerado pela tarefa, caso exista'),
+        'created_at': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+        'started_at': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+        'finished_at': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+    })
+
+public_player_schema = openapi.Schema(
+    title='Jogador', type=openapi.TYPE_OBJECT, properties={
+        'id': openapi.Schema(type=openapi.TYPE_INTEGER, description='ID do jogador', example=5),
+        'total_score': openapi.Schema(type=openapi.TYPE_INTEGER, description='Pontuação total do jogador', example=98),
+        'full_name': openapi.Schema(type=openapi.TYPE_STRING, description='Nome completo do jogador', example='João da Silva'),
+        'social_name': openapi.Schema(type=openapi.TYPE_STRING, description='Nome social do jogador', example='João'),
+    })
+
+scoreboard_response_schema = openapi.Schema(
+    title='Placar', type=openapi.TYPE_OBJECT, properties={
+        'event': openapi.Schema(type=openapi.TYPE_OBJECT, properties={
+            'name': openapi.Schema(type=openapi.TYPE_STRING, description='Nome do evento', example='Rei da Derivada 2024')}),
+        'imortals': openapi.Schema(type=openapi.TYPE_ARRAY, description='Top3 imortais, caso publicados', items=public_player_schema),
+        'top4': openapi.Schema(type=openapi.TYPE_ARRAY, description='Top4 finalistas, caso publicados', items=public_player_schema),
+        'paladin': public_player_schema,
+        'ambassor': public_player_schema,
+        'leaderboard': openapi.Schema(
+            type=openapi.TYPE_ARRAY, description='Classificação dos jogadores não imortais, caso os resultados finais tenham sido publicados',
+            items=openapi.Schema(type=openapi.TYPE_OBJECT, properties={
+                'rank': openapi.Schema(type=openapi.TYPE_INTEGER, description='Posição do jogador (empates têm a mesma posição)', example=1),
+                **public_player_schema.properties})),
+        'updated_at': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME, description='Data de geração do placar'),
+    })
+
+leaderboard_response_schema = openapi.Schema(
+    title='Classificação', type=openapi.TYPE_OBJECT, properties={
+        'results': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT, properties={
+            'rank': openapi.Schema(type=openapi.TYPE_INTEGER, description='Posição do jogador (empates têm a mesma posição)', example=1),
+            **public_player_schema.properties,
+            'head_to_head': openapi.Schema(
+                type=openapi.TYPE_INTEGER, example=12,
+                description='Pontos nas sumulas disputadas contra jogadores empatados (apenas com tie_break=head_to_head)'),
+        })),
+        'next_cursor': openapi.Schema(type=openapi.TYPE_STRING, description='Cursor da próxima página, ou null na última página'),
+    })
+
 class Errors():
 
     def __init__(self, erros: list[int]) -> None:
@@ -0,0 +1,110 @@
+import tempfile
+import pandas as pd
+from django.core.files import File
+from django.db import transaction
+from .exports import EXPORT_CONTENT_TYPES, PLAYER_EXPORT_COLUMNS, PLAYERS_SHEET_NAME, player_export_rows, stream_csv, write_xlsx
+from .imports import import_players, import_staff, read_sheet
+from .jobs import JobError, job_handler
+from .models import Event, ImportReport, Job, Player
+
+SUMULAS_ALREADY_GENERATED_ERROR_MESSAGE = "As sumulas iniciais já foram geradas para este evento!"
+
+# Mensagens do resultado das importações por tipo de tarefa
+IMPORT_MESSAGES = {
+    Job.IMPORT_PLAYERS: {
+        'success': 'Jogadores adicionados com sucesso!',
+        'partial': '{} jogadores não foram adicionados devido a e-mail inválido ou nome ausente. Verifique o relatório de erros e reenvie apenas as linhas corrigidas.',
+        'none': 'Nenhum jogador adicionado! Verifique os e-mails do arquivo!',
+    },
+    Job.IMPORT_STAFF: {
+        'success': 'Monitores adicionados com sucesso!',
+        'partial': '{} monitores não foram adicionados devido a e-mail inválido ou nome ausente. Verifique o relatório de erros e reenvie apenas as linhas corrigidas.',
+        'none': 'Nenhum monitor foi adicionado! Verifique os dados de e-mail dos monitores e tente novamente',
+    },
+}
+
+
+def import_result(kind: str, errors_count: int, total: int, report: ImportReport | None) -> dict:
+    """Monta o resultado de uma importação.
+    - JobError: Se nenhuma linha do arquivo foi importada."""
+    messages = IMPORT_MESSAGES[kind]
+    report_id = str(report.id) if report else None
+    if errors_count >= total:
+        raise JobError(messages['none'], result={'report_id': report_id})
+    result = {'message': messages['success'], 'total': total, 'errors_count': errors_count}
+    if errors_count > 0:
+        result['errors'] = messages['partial'].format(errors_count)
+        result['report_id'] = report_id
+    return result
+
+
+def read_input_sheet(job: Job) -> pd.DataFrame:
+    """Lê a planilha enviada para a tarefa diretamente do armazenamento, sem carregá-la inteira na memória.
+    - JobError: Se o arquivo não existir ou não for uma planilha válida."""
+    if not job.input_file:
+        raise JobError('Arquivo não encontrado!')
+    with job.input_file.open('rb') as file:
+        df = read_sheet(file, job.payload.get('extension'))
+    if df is None:
+        raise JobError('Arquivo inválido!')
+    return df
+
+
+@job_handler(Job.IMPORT_PLAYERS)
+def import_players_job(job: Job) -> dict:
+    df = read_input_sheet(job)
+    job.set_progress(10)
+    try:
+        errors_count, players_count, report = import_players(df=df, event=job.event)
+    except ValueError as e:
+        raise JobError(str(e))
+    return import_result(job.kind, errors_count, players_count, report)
+
+
+@job_handler(Job.IMPORT_STAFF)
+def import_staff_job(job: Job) -> dict:
+    df = read_input_sheet(job)
+    job.set_progress(10)
+    try:
+        errors_count, staff_count, report = import_staff(df=df, event=job.event)
+    except ValueError as e:
+        raise JobError(str(e))
+    return import_result(job.kind, errors_count, staff_count, report)
+
+
+@job_handler(Job.GENERATE_SUMULAS)
+def generate_sumulas_job(job: Job) -> dict:
+    """Gera as sumulas classificatorias do evento.
+    O evento é bloqueado durante a geração, para que as sumulas sejam geradas uma única vez."""
+    from .views.views_sumulas import GenerateSumulas
+    with transaction.atomic():
+        event = Event.objects.select_for_update().get(id=job.event_id)
+        if event.is_sumulas_generated:
+            raise JobError(SUMULAS_ALREADY_GENERATED_ERROR_MESSAGE)
+        sumulas = GenerateSumulas().generate_sumulas(event=event)
+        event.is_sumulas_generated = True
+        event.save()
+    return {'message': 'Sumulas geradas com sucesso!', 'sumulas_count': len(sumulas)}
+
+
+@job_handler(Job.EXPORT_PLAYERS)
+def export_players_job(job: Job) -> dict:
+    from .views.views_players import ExportPlayersView
+    players = ExportPlayersView().get_players(job.event)
+    if not players.exists():
+        raise JobError('Nenhum jogador encontrado!')
+    job.set_progress(10)
+    file_format = job.payload.get('file_format', 'xlsx')
+    header = PLAYER_EXPORT_COLUMNS.values()
+    job.output_name = f'jogadores_classificados.{file_format}'
+    job.output_content_type = EXPORT_CONTENT_TYPES[file_format]
+    # O arquivo é escrito em um arquivo temporário e copiado em blocos para o armazenamento
+    with tempfile.TemporaryFile() as output:
+        if file_format == 'csv':
+            for chunk in stream_csv(header, player_export_rows(players)):
+                output.write(chunk)
+        else:
+            write_xlsx(output, header, player_export_rows(players), PLAYERS_SHEET_NAME)
+        output.seek(0)
+        job.output_file.save(job.output_name, File(output), save=False)
+    return {'message': 'Arquivo gerado com sucesso!', 'players_count': players.count()}
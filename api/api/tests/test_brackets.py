@@ -0,0 +1,47 @@
+from django.forms import ValidationError
+from django.test import SimpleTestCase
+from ..brackets import partition_sizes, plan_brackets, bracket_name
+
+
+class PartitionSizesTestCase(SimpleTestCase):
+    def test_partition_sizes_between_limits(self):
+        for n in range(6, 1001):
+            if n in [9, 10, 11, 17]:
+                continue
+            sizes = partition_sizes(n)
+            self.assertEqual(sum(sizes), n)
+            self.assertTrue(all(6 <= size <= 8 for size in sizes))
+            self.assertEqual(len(sizes), -(-n // 8))
+            self.assertLessEqual(max(sizes) - min(sizes), 1)
+
+    def test_partition_sizes_balanced(self):
+        self.assertEqual(partition_sizes(8), [8])
+        self.assertEqual(partition_sizes(13), [7, 6])
+        self.assertEqual(partition_sizes(20), [7, 7, 6])
+        self.assertEqual(partition_sizes(24), [8, 8, 8])
+
+    def test_partition_sizes_impossible(self):
+        for n in [0, 5, 9, 10, 11, 17]:
+            with self.assertRaises(ValidationError):
+                partition_sizes(n)
+
+    def test_partition_sizes_custom_limits(self):
+        self.assertEqual(partition_sizes(10, 4, 6), [5, 5])
+        with self.assertRaises(ValidationError):
+            partition_sizes(10, 8, 6)
+
+
+class PlanBracketsTestCase(SimpleTestCase):
+    def test_bracket_name(self):
+        self.assertEqual(bracket_name(0), 'Chave A')
+        self.assertEqual(bracket_name(25), 'Chave Z')
+        self.assertEqual(bracket_name(26), 'Chave AA')
+        self.assertEqual(bracket_name(53), 'Chave BBB')
+
+    def test_plan_brackets(self):
+        players = list(range(20))
+        plan = plan_brackets(players)
+        self.assertEqual([bracket['name'] for bracket in plan], [
+                         'Chave A', 'Chave B', 'Chave C'])
+        self.assertEqual(
+            [player for bracket in plan for player in bracket['players']], players)
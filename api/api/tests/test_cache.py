@@ -0,0 +1,213 @@
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from api.models import Player, PlayerScore, SumulaImortal, Results
+from api.views.views_sumulas import SumulasView
+from users.models import User
+from ..cache import get_event_generation, generation_key, get_cache_stats, is_shared_cache, reset_cache_stats
+from .test_views_sumulas import BaseSumulaViewTest
+
+LOCAL_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(EVENT_RESPONSE_CACHE_ALLOW_LOCAL=True, CACHES=LOCAL_CACHES)
+class EventResponseCacheTestCase(BaseSumulaViewTest):
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+        self.client = APIClient()
+        self.setUpEvent()
+        self.setupUser()
+        self.setUpGroup()
+        self.SetUpStaff()
+        self.setUpPlayers()
+        self.setUpPermissions()
+        self.sumula = SumulaImortal.objects.create(event=self.event)
+        self.player_score = PlayerScore.objects.create(
+            player=self.player, sumula_imortal=self.sumula, event=self.event)
+        self.client.force_authenticate(user=self.user_staff_manager)
+        self.url_sumulas = f"{reverse('api:sumula')}?event_id={self.event.id}"
+        self.url_players = f"{reverse('api:players')}?event_id={self.event.id}"
+
+    def test_repeated_reads_are_served_from_cache(self):
+        for url in [self.url_sumulas, self.url_players]:
+            first = self.client.get(url)
+            with self.assertNumQueries(2):
+                second = self.client.get(url)
+            self.assertEqual(second.status_code, status.HTTP_200_OK)
+            self.assertEqual(first.data, second.data)
+
+    def test_player_score_save_invalidates_sumulas(self):
+        self.client.get(self.url_sumulas)
+        self.player_score.points = 7
+        self.player_score.save()
+        response = self.client.get(self.url_sumulas)
+        self.assertEqual(
+            response.data['sumulas_imortal'][0]['players_score'][0]['points'], 7)
+
+    def test_player_save_invalidates_players(self):
+        self.client.get(self.url_players)
+        self.player.full_name = 'Nome Novo'
+        self.player.save()
+        response = self.client.get(self.url_players)
+        self.assertIn('Nome Novo', [player['full_name']
+                      for player in response.data])
+
+    def test_referee_change_invalidates_sumulas(self):
+        self.client.get(self.url_sumulas)
+        self.sumula.referee.add(self.staff1)
+        response = self.client.get(self.url_sumulas)
+        self.assertEqual(
+            response.data['sumulas_imortal'][0]['referee'][0]['id'], self.staff1.id)
+
+    def test_write_on_other_event_keeps_cache(self):
+        self.client.get(self.url_players)
+        generation = get_event_generation(self.event.id)
+        self.setUpEvent()
+        Player.objects.create(event=self.event,
+                              registration_email=self.create_unique_email())
+        self.assertNotEqual(get_event_generation(self.event.id), generation)
+        self.assertEqual(get_event_generation(
+            self.player.event_id), generation)
+
+    def test_evicted_generation_does_not_reuse_old_responses(self):
+        self.client.get(self.url_players)
+        self.player.full_name = 'Nome Novo'
+        self.player.save()
+        cache.delete(generation_key(self.event.id))
+        response = self.client.get(self.url_players)
+        self.assertIn('Nome Novo', [player['full_name']
+                      for player in response.data])
+
+    def test_cache_stats(self):
+        self.client.get(self.url_players)
+        self.client.get(self.url_players)
+        self.assertEqual(get_cache_stats(), {'hits': 1, 'misses': 1})
+        admin = User.objects.create(username='admin_app', email=self.create_unique_email(),
+                                    is_staff=True)
+        self.client.force_authenticate(user=admin)
+        response = self.client.get(reverse('api:cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'hits': 1, 'misses': 1})
+
+    def test_cache_stats_forbidden_for_non_admin(self):
+        response = self.client.get(reverse('api:cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(EVENT_RESPONSE_CACHE_ALLOW_LOCAL=True, CACHES=LOCAL_CACHES)
+class ConditionalResponseTestCase(BaseSumulaViewTest):
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+        self.client = APIClient()
+        self.setUpEvent()
+        self.setupUser()
+        self.setUpGroup()
+        self.SetUpStaff()
+        self.setUpPlayers()
+        self.setUpPermissions()
+        self.sumula = SumulaImortal.objects.create(event=self.event)
+        PlayerScore.objects.create(
+            player=self.player, sumula_imortal=self.sumula, event=self.event)
+        self.results = Results.objects.create(event=self.event)
+        self.event.is_final_results_published = True
+        self.event.save()
+        self.user_staff_manager.events.add(self.event)
+        self.client.force_authenticate(user=self.user_staff_manager)
+        self.urls = [f"{reverse(f'api:{name}')}?event_id={self.event.id}"
+                     for name in ['sumula', 'sumula-ativas', 'sumula-encerradas', 'players', 'staff', 'results']]
+
+    def test_matching_etag_returns_304(self):
+        for url in self.urls:
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, status.HTTP_200_OK, url)
+            self.assertIn('ETag', first)
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(second.status_code,
+                             status.HTTP_304_NOT_MODIFIED, url)
+            self.assertEqual(second.content, b'')
+            self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_not_modified_skips_serialization(self):
+        etag = self.client.get(self.urls[0])['ETag']
+        with patch.object(SumulasView, 'serialize_sumulas') as serialize_sumulas:
+            response = self.client.get(self.urls[0], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        serialize_sumulas.assert_not_called()
+
+    def test_write_changes_etag(self):
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        self.player.full_name = 'Nome Novo'
+        self.player.save()
+        for url, etag in zip(self.urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_results_publication_changes_etag(self):
+        url = self.urls[-1]
+        etag = self.client.get(url)['ETag']
+        self.results.paladin = self.player
+        self.results.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['paladin']['id'], self.player.id)
+
+    def test_stale_etag_returns_200(self):
+        response = self.client.get(
+            self.urls[0], HTTP_IF_NONE_MATCH='"sumula-0-0"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_permissions_checked_before_etag(self):
+        etag = self.client.get(self.urls[0])['ETag']
+        self.client.force_authenticate(user=User.objects.create(
+            username='sem_cargo', email='sem_cargo@gmail.com'))
+        response = self.client.get(self.urls[0], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(EVENT_RESPONSE_CACHE_ALLOW_LOCAL=False, CACHES=LOCAL_CACHES)
+class ProcessLocalCacheTestCase(BaseSumulaViewTest):
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+        self.client = APIClient()
+        self.setUpEvent()
+        self.setupUser()
+        self.setUpGroup()
+        self.SetUpStaff()
+        self.setUpPlayers()
+        self.setUpPermissions()
+        self.client.force_authenticate(user=self.user_staff_manager)
+        self.url_players = f"{reverse('api:players')}?event_id={self.event.id}"
+
+    def test_local_backend_bypasses_cache(self):
+        self.assertFalse(is_shared_cache())
+        self.client.get(self.url_players)
+        self.client.get(self.url_players)
+        self.assertEqual(get_cache_stats(), {'hits': 0, 'misses': 0})
+        self.assertIsNone(cache.get(generation_key(self.event.id)))
+
+    def test_etag_is_derived_from_content(self):
+        first = self.client.get(self.url_players)
+        second = self.client.get(self.url_players, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.player.full_name = 'Nome Novo'
+        self.player.save()
+        response = self.client.get(self.url_players, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Nome Novo', [player['full_name'] for player in response.data])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                                           'LOCATION': 'redis://127.0.0.1:6379'}})
+    def test_shared_backend_uses_cache(self):
+        self.assertTrue(is_shared_cache())
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                                           'LOCATION': 'api_cache'}})
+    def test_database_backend_bypasses_cache(self):
+        self.assertFalse(is_shared_cache())
@@ -0,0 +1,157 @@
+import codecs
+import uuid
+from io import BytesIO
+import numpy as np
+import pandas as pd
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from api.models import Event, Player, Staff, Token
+from users.models import User
+from ..imports import CSV_SAMPLE_SIZE, detect_delimiter, detect_encoding, read_csv, import_players, import_staff, normalize_rows, INVALID_EMAIL, MISSING_NAME, DUPLICATE_IN_FILE, ALREADY_REGISTERED
+
+
+class ImportTestCase(TestCase):
+    def create_dataframe(self, rows: list[tuple]) -> pd.DataFrame:
+        return pd.DataFrame(rows, columns=[' Nome Completo ', 'Nome Social', 'E-mail'])
+
+    def create_rows(self, n: int) -> list[tuple]:
+        return [(f'jogador {i}', '', f'{uuid.uuid4()}@gmail.com') for i in range(n)]
+
+    def setUp(self):
+        self.event = Event.objects.create(name='Evento 1', token=Token.objects.create())
+
+    def test_normalize_players(self):
+        df = self.create_dataframe([
+            ('  maria DA  silva ', '', ' Maria@Gmail.com '),
+            ('JOÃO', '', 'email-invalido'),
+        ])
+        rows = normalize_rows(df)
+        self.assertEqual(list(rows['full_name']), ['Maria Da  Silva', 'João'])
+        self.assertEqual(list(rows['registration_email']), [
+                         'maria@gmail.com', 'email-invalido'])
+        self.assertEqual(list(rows['line']), [2, 3])
+        self.assertEqual(list(rows['error']), [None, INVALID_EMAIL])
+
+    def test_normalize_players_missing_column(self):
+        df = pd.DataFrame([('Maria',)], columns=['Nome Completo'])
+        with self.assertRaises(ValueError):
+            normalize_rows(df)
+
+    def test_normalize_players_empty_cell(self):
+        df = self.create_dataframe([(np.nan, '', 'maria@gmail.com'), ('Maria', '', np.nan)])
+        self.assertEqual(list(normalize_rows(df)['error']), [
+                         MISSING_NAME, INVALID_EMAIL])
+
+    def test_import_players_counts(self):
+        rows = self.create_rows(5) + [('Sem Email', '', 'invalido')]
+        errors_count, players_count, report = import_players(
+            self.create_dataframe(rows), self.event)
+        self.assertEqual((errors_count, players_count), (1, 6))
+        self.assertEqual(report.rows, [{'line': 7, 'full_name': 'Sem Email',
+                         'registration_email': 'invalido', 'error': INVALID_EMAIL}])
+        self.assertEqual(Player.objects.filter(
+            event=self.event, is_present=True).count(), 5)
+
+    def test_import_players_deduplicates_within_file(self):
+        rows = [('primeiro nome', '', 'maria@gmail.com'),
+                ('segundo nome', '', 'MARIA@gmail.com')]
+        errors_count, players_count, report = import_players(
+            self.create_dataframe(rows), self.event)
+        self.assertEqual((errors_count, players_count), (0, 2))
+        self.assertIsNone(report)
+        player = Player.objects.get(event=self.event)
+        self.assertEqual(player.full_name, 'Segundo Nome')
+
+    def test_import_players_duplicate_with_invalid_last_row(self):
+        rows = [('maria silva', '', 'maria@gmail.com'), (np.nan, '', 'maria@gmail.com')]
+        errors_count, players_count, report = import_players(
+            self.create_dataframe(rows), self.event)
+        self.assertEqual((errors_count, players_count), (1, 2))
+        self.assertEqual([(row['line'], row['error']) for row in report.rows], [(3, MISSING_NAME)])
+        self.assertEqual(Player.objects.get(event=self.event).full_name, 'Maria Silva')
+
+    def test_import_players_updates_existing_players(self):
+        user = User.objects.create(username='maria', email='maria@gmail.com')
+        Player.objects.create(event=self.event, user=user, full_name='Antigo',
+                              registration_email='maria@gmail.com', total_score=7)
+        import_players(self.create_dataframe(
+            [('maria silva', '', 'maria@gmail.com')]), self.event)
+        player = Player.objects.get(event=self.event)
+        self.assertEqual(player.full_name, 'Maria Silva')
+        self.assertTrue(player.is_present)
+        self.assertEqual(player.user, user)
+        self.assertEqual(player.total_score, 7)
+
+    def test_import_players_in_chunks(self):
+        with CaptureQueriesContext(connection) as context:
+            import_players(self.create_dataframe(
+                self.create_rows(5)), self.event, chunk_size=2)
+        inserts = [query for query in context.captured_queries
+                   if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(Player.objects.filter(event=self.event).count(), 5)
+
+    def test_import_report_diagnostics(self):
+        Player.objects.create(event=self.event, registration_email='ja@gmail.com')
+        rows = [('Repetido', '', 'rep@gmail.com'), ('Repetido', '', 'rep@gmail.com'),
+                ('Cadastrado', '', 'ja@gmail.com'), (np.nan, '', 'semnome@gmail.com'),
+                ('Invalido', '', 'invalido'), ('Novo', '', 'novo@gmail.com')]
+        errors_count, players_count, report = import_players(
+            self.create_dataframe(rows), self.event)
+        self.assertEqual((errors_count, players_count), (2, 6))
+        self.assertEqual([(row['line'], row['error']) for row in report.rows], [
+            (2, DUPLICATE_IN_FILE), (4, ALREADY_REGISTERED), (5, MISSING_NAME), (6, INVALID_EMAIL)])
+        self.assertEqual(report.rows[2]['full_name'], '')
+        self.assertEqual(Player.objects.filter(event=self.event).count(), 3)
+
+    def test_import_staff(self):
+        rows = self.create_rows(3) + [('Sem Email', '', 'invalido')]
+        errors_count, staff_count, report = import_staff(
+            self.create_dataframe(rows), self.event)
+        self.assertEqual((errors_count, staff_count), (1, 4))
+        self.assertEqual(report.kind, 'staff')
+        self.assertEqual(Staff.objects.filter(event=self.event).count(), 3)
+
+
+class ReadCsvTestCase(SimpleTestCase):
+    content = 'Nome Completo;E-mail\nJoão Conceição;joao@gmail.com\nMaria;maria@gmail.com\n'
+
+    def read(self, data: bytes):
+        file = BytesIO(data)
+        df = read_csv(file)
+        self.assertFalse(file.closed)
+        return df
+
+    def test_detect_encoding(self):
+        self.assertEqual(detect_encoding(codecs.BOM_UTF8 + 'ção'.encode()), 'utf-8-sig')
+        self.assertEqual(detect_encoding('ção'.encode('utf-16')), 'utf-16')
+        self.assertEqual(detect_encoding('ção'.encode()), 'utf-8')
+        self.assertEqual(detect_encoding(b'nome;email'), 'utf-8')
+        self.assertNotIn(detect_encoding(self.content.encode('cp1252')), ['utf-8', 'ascii'])
+
+    def test_detect_encoding_truncated_sample(self):
+        # Caractere multibyte cortado no fim da amostra
+        self.assertEqual(detect_encoding('nome;ção'.encode()[:-1]), 'utf-8')
+
+    def test_detect_delimiter(self):
+        self.assertEqual(detect_delimiter('Nome Completo;E-mail\nMaria;maria@gmail.com\n'), ';')
+        self.assertEqual(detect_delimiter('Nome Completo,E-mail\nMaria,maria@gmail.com\n'), ',')
+        self.assertEqual(detect_delimiter('Nome Completo\tE-mail\nMaria\tmaria@gmail.com\n'), '\t')
+        self.assertEqual(detect_delimiter('Nome Completo'), ',')
+
+    def test_read_csv_encodings(self):
+        for data in [self.content.encode(), codecs.BOM_UTF8 + self.content.encode(),
+                     self.content.encode('utf-16'), self.content.encode('cp1252')]:
+            df = self.read(data)
+            self.assertEqual(list(df.columns), ['Nome Completo', 'E-mail'])
+            self.assertEqual(df['Nome Completo'][0], 'João Conceição')
+
+    def test_read_csv_larger_than_sample(self):
+        rows = ''.join(f'Jogador Conceição {i},jogador{i}@gmail.com\n' for i in range(5000))
+        data = ('Nome Completo,E-mail\n' + rows).encode()
+        self.assertGreater(len(data), CSV_SAMPLE_SIZE)
+        df = self.read(data)
+        self.assertEqual(len(df), 5000)
+        self.assertEqual(df['E-mail'].iloc[-1], 'jogador4999@gmail.com')
+
@@ -0,0 +1,179 @@
+import tempfile
+import uuid
+from datetime import timedelta
+from io import BytesIO, StringIO
+import pandas as pd
+from django.contrib.auth.models import Group
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.conf import settings
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from api.models import Event, Job, Player, Token
+from users.models import User
+from ..jobs import STALE_JOB_ERROR_MESSAGE, enqueue_job, recover_stale_jobs, run_job
+from ..permissions import assign_permissions
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class JobTestCase(APITestCase):
+    def create_user(self) -> User:
+        return User.objects.create(username=f'user_{uuid.uuid4().hex[:10]}', email=f'{uuid.uuid4()}@gmail.com')
+
+    def upload(self, content: str):
+        file = SimpleUploadedFile(
+            'Jogadores.csv', content.encode('utf-8'), content_type='multipart/form-data')
+        return self.client.post(f"{reverse('api:upload-player')}?event_id={self.event.id}",
+                                {'file': file}, format='multipart')
+
+    def setUp(self):
+        self.event = Event.objects.create(name='Evento 1', token=Token.objects.create())
+        self.admin = self.create_user()
+        assign_permissions(self.admin, Group.objects.create(name='event_admin'), self.event)
+        self.client.force_authenticate(user=self.admin)
+
+    @override_settings(JOBS_MODE='worker')
+    def test_worker_runs_pending_jobs(self):
+        response = self.upload('Nome Completo,E-mail\nmaria silva,maria@gmail.com\n')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = self.client.get(response.data['url']).data
+        self.assertEqual(job['status'], Job.PENDING)
+        self.assertFalse(Player.objects.exists())
+
+        out = StringIO()
+        call_command('run_jobs', '--once', stdout=out)
+        self.assertIn('1 tarefa(s) executada(s).', out.getvalue())
+
+        job = self.client.get(response.data['url']).data
+        self.assertEqual(job['status'], Job.SUCCEEDED)
+        self.assertEqual(job['progress'], 100)
+        self.assertEqual(job['result']['message'], 'Jogadores adicionados com sucesso!')
+        self.assertEqual(Player.objects.get().full_name, 'Maria Silva')
+        # Uma tarefa já executada não é executada novamente
+        self.assertIsNone(run_job(job['id']))
+
+    @override_settings(JOBS_MODE='worker')
+    def test_uploaded_file_is_kept_in_storage_until_the_job_runs(self):
+        response = self.upload('Nome Completo,E-mail\nmaria silva,maria@gmail.com\n')
+        job = Job.objects.get(id=response.data['job_id'])
+        name = job.input_file.name
+        self.assertTrue(name.startswith(f'jobs/{job.id}'))
+        self.assertTrue(default_storage.exists(name))
+        run_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.input_file.name), (Job.SUCCEEDED, ''))
+        self.assertFalse(default_storage.exists(name))
+
+    @override_settings(JOBS_MODE='worker')
+    def test_deleted_job_removes_uploaded_file(self):
+        response = self.upload('Nome Completo,E-mail\nmaria silva,maria@gmail.com\n')
+        name = Job.objects.get(id=response.data['job_id']).input_file.name
+        self.event.delete()
+        self.assertFalse(default_storage.exists(name))
+
+    @override_settings(JOBS_MODE='eager')
+    def test_failed_job_reports_error(self):
+        response = self.upload('Nome Completo,E-mail\nmaria silva,invalido\n')
+        job = self.client.get(response.data['url']).data
+        self.assertEqual(job['status'], Job.FAILED)
+        self.assertEqual(job['error'], 'Nenhum jogador adicionado! Verifique os e-mails do arquivo!')
+        self.assertIsNotNone(job['result']['report_id'])
+
+    @override_settings(JOBS_MODE='worker')
+    def test_failed_job_validation_error_message(self):
+        enqueue_job(Job.GENERATE_SUMULAS, event=self.event, user=self.admin)
+        job = run_job()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.error, 'O evento precisa de pelo menos 6 jogadores presentes para iniciar.')
+
+    @override_settings(JOBS_MODE='eager')
+    def test_failed_job_missing_columns(self):
+        response = self.upload('Nome,Email\nmaria silva,maria@gmail.com\n')
+        job = self.client.get(response.data['url']).data
+        self.assertEqual(job['status'], Job.FAILED)
+        self.assertIn('Colunas ausentes', job['error'])
+
+    @override_settings(JOBS_MODE='worker')
+    def test_job_only_visible_to_creator(self):
+        job = enqueue_job(Job.EXPORT_PLAYERS, event=self.event, user=self.admin)
+        url = reverse('api:job', kwargs={'job_id': job.id})
+        self.client.force_authenticate(user=self.create_user())
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=User.objects.create_superuser(
+            username='superuser', email='superuser@gmail.com', password='senha'))
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_job_not_found(self):
+        response = self.client.get(reverse('api:job', kwargs={'job_id': uuid.uuid4()}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'errors': 'Tarefa não encontrada!'})
+
+    @override_settings(JOBS_MODE='eager')
+    def test_export_players_download(self):
+        Player.objects.create(event=self.event, full_name='Maria Silva',
+                              registration_email='maria@gmail.com', total_score=10)
+        response = self.client.get(f"{reverse('api:export-players')}?event_id={self.event.id}&background=1")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = self.client.get(response.data['url']).data
+        self.assertEqual(job['status'], Job.SUCCEEDED)
+        download = self.client.get(job['download_url'])
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+        self.assertEqual(download['Content-Disposition'],
+                         'attachment; filename=jogadores_classificados.xlsx')
+        df = pd.read_excel(BytesIO(b''.join(download.streaming_content)))
+        self.assertEqual(list(df['Nome Completo']), ['Maria Silva'])
+        # O arquivo gerado fica no armazenamento e é removido junto com a tarefa
+        name = Job.objects.get(id=job['id']).output_file.name
+        self.assertTrue(default_storage.exists(name))
+        Job.objects.filter(id=job['id']).delete()
+        self.assertFalse(default_storage.exists(name))
+
+    @override_settings(JOBS_MODE='worker')
+    def test_download_without_output(self):
+        job = enqueue_job(Job.EXPORT_PLAYERS, event=self.event, user=self.admin)
+        response = self.client.get(reverse('api:job-download', kwargs={'job_id': job.id}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def abandon(self, job: Job, attempts: int, heartbeat_age: int) -> None:
+        """Simula uma tarefa em execução cujo processo não dá sinal de vida há heartbeat_age segundos."""
+        Job.objects.filter(id=job.id).update(
+            status=Job.RUNNING, attempts=attempts, started_at=timezone.now(),
+            heartbeat_at=timezone.now() - timedelta(seconds=heartbeat_age))
+
+    @override_settings(JOBS_MODE='worker')
+    def test_stale_job_is_requeued(self):
+        response = self.upload('Nome Completo,E-mail\nmaria silva,maria@gmail.com\n')
+        job = Job.objects.get(id=response.data['job_id'])
+        self.abandon(job, attempts=1, heartbeat_age=settings.JOBS_STALE_TIMEOUT + 1)
+        out = StringIO()
+        call_command('run_jobs', '--once', stdout=out)
+        self.assertIn('1 tarefa(s) executada(s).', out.getvalue())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.SUCCEEDED, 2))
+        self.assertTrue(Player.objects.filter(event=self.event).exists())
+
+    @override_settings(JOBS_MODE='worker')
+    def test_stale_job_fails_after_max_attempts(self):
+        job = enqueue_job(Job.EXPORT_PLAYERS, event=self.event, user=self.admin)
+        self.abandon(job, attempts=settings.JOBS_MAX_ATTEMPTS, heartbeat_age=settings.JOBS_STALE_TIMEOUT + 1)
+        self.assertEqual(recover_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (Job.FAILED, STALE_JOB_ERROR_MESSAGE))
+        self.assertIsNotNone(job.finished_at)
+
+    @override_settings(JOBS_MODE='worker')
+    def test_live_job_is_not_recovered(self):
+        job = enqueue_job(Job.EXPORT_PLAYERS, event=self.event, user=self.admin)
+        self.abandon(job, attempts=1, heartbeat_age=0)
+        self.assertEqual(recover_stale_jobs(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.RUNNING)
+        # Jobs pendentes só são considerados abandonados no modo thread
+        pending = enqueue_job(Job.EXPORT_PLAYERS, event=self.event, user=self.admin)
+        Job.objects.filter(id=pending.id).update(
+            created_at=timezone.now() - timedelta(seconds=settings.JOBS_STALE_TIMEOUT + 1))
+        self.assertEqual(recover_stale_jobs(), 0)
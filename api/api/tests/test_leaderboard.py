@@ -0,0 +1,135 @@
+import uuid
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from api.models import Event, Player, PlayerScore, SumulaClassificatoria, SumulaImortal, Token
+from users.models import User
+from ..leaderboard import TIE_BREAK_HEAD_TO_HEAD, LeaderboardCursor, leaderboard_page
+from ..permissions import assign_permissions
+
+PLAYER_SCORES = [30, 50, 30, 10, 50, 30]
+IMORTAL_SCORES = [5, 20]
+
+
+class LeaderboardTestCase(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', email='admin@email.com')
+        self.event = Event.objects.create(name='Evento 1', token=Token.objects.create(), admin_email=self.admin.email)
+        assign_permissions(self.admin, Group.objects.create(name='event_admin'), self.event)
+        self.admin.events.add(self.event)
+        self.players = Player.objects.bulk_create([
+            Player(event=self.event, full_name=f'Jogador {i}', registration_email=f'jogador{i}@gmail.com',
+                   total_score=score) for i, score in enumerate(PLAYER_SCORES)])
+        self.imortals = Player.objects.bulk_create([
+            Player(event=self.event, full_name=f'Imortal {i}', registration_email=f'imortal{i}@gmail.com',
+                   total_score=score, is_imortal=True) for i, score in enumerate(IMORTAL_SCORES)])
+        self.url = reverse('api:leaderboard')
+
+    def get(self, **params):
+        self.client.force_authenticate(user=self.admin)
+        return self.client.get(self.url, {'event_id': self.event.id, **params})
+
+    def ranking(self, rows: list[dict]) -> list[tuple[int, int]]:
+        return [(row['rank'], row['id']) for row in rows]
+
+    def test_dense_rank(self):
+        rows, next_cursor = leaderboard_page(self.event, is_imortal=False)
+        p = self.players
+        self.assertEqual(self.ranking(rows), [
+            (1, p[1].id), (1, p[4].id), (2, p[0].id), (2, p[2].id), (2, p[5].id), (3, p[3].id)])
+        self.assertIsNone(next_cursor)
+        rows, _ = leaderboard_page(self.event, is_imortal=True)
+        self.assertEqual(self.ranking(rows), [(1, self.imortals[1].id), (2, self.imortals[0].id)])
+
+    def test_keyset_pages_match_full_ranking(self):
+        full, _ = leaderboard_page(self.event, is_imortal=False)
+        pages, cursor = [], None
+        while True:
+            rows, next_cursor = leaderboard_page(
+                self.event, is_imortal=False, limit=2,
+                cursor=LeaderboardCursor.decode(cursor, 'score') if cursor else None)
+            pages.extend(rows)
+            if next_cursor is None:
+                break
+            cursor = next_cursor
+        self.assertEqual(pages, full)
+
+    def test_page_query_count_is_constant(self):
+        rows, cursor = leaderboard_page(self.event, is_imortal=False, limit=2)
+        with CaptureQueriesContext(connection) as queries:
+            leaderboard_page(self.event, is_imortal=False, limit=2, cursor=LeaderboardCursor.decode(cursor, 'score'))
+        self.assertEqual(len(queries.captured_queries), 1)
+
+    def test_head_to_head_tie_break(self):
+        p = self.players
+        # p[5] e p[2] empataram com 30 pontos e se enfrentaram: p[5] fez mais pontos no confronto
+        sumula = SumulaClassificatoria.objects.create(event=self.event, name='Chave A')
+        PlayerScore.objects.bulk_create([
+            PlayerScore(event=self.event, player=p[2], sumula_classificatoria=sumula, points=4),
+            PlayerScore(event=self.event, player=p[5], sumula_classificatoria=sumula, points=9),
+            PlayerScore(event=self.event, player=p[3], sumula_classificatoria=sumula, points=20)])
+        # Pontos em sumulas sem outro jogador empatado não contam para o desempate
+        other = SumulaClassificatoria.objects.create(event=self.event, name='Chave B')
+        PlayerScore.objects.create(event=self.event, player=p[0], sumula_classificatoria=other, points=15)
+        # Confronto entre imortais não influencia a categoria classificatoria
+        imortal_sumula = SumulaImortal.objects.create(event=self.event, name='Imortais 01')
+        PlayerScore.objects.bulk_create([
+            PlayerScore(event=self.event, player=p[0], sumula_imortal=imortal_sumula, points=30),
+            PlayerScore(event=self.event, player=self.imortals[0], sumula_imortal=imortal_sumula, points=1)])
+        # Mantém as pontuações totais do setUp, recalculadas ao salvar as pontuações
+        for player, score in zip([*p, *self.imortals], PLAYER_SCORES + IMORTAL_SCORES):
+            Player.objects.filter(id=player.id).update(total_score=score)
+
+        rows, _ = leaderboard_page(self.event, is_imortal=False, tie_break=TIE_BREAK_HEAD_TO_HEAD)
+        self.assertEqual(self.ranking(rows), [
+            (1, p[1].id), (1, p[4].id), (2, p[5].id), (3, p[2].id), (4, p[0].id), (5, p[3].id)])
+        self.assertEqual([row['head_to_head'] for row in rows], [0, 0, 9, 4, 0, 0])
+
+        pages, cursor = [], None
+        while True:
+            rows, cursor = leaderboard_page(
+                self.event, is_imortal=False, tie_break=TIE_BREAK_HEAD_TO_HEAD, limit=1,
+                cursor=LeaderboardCursor.decode(cursor, TIE_BREAK_HEAD_TO_HEAD) if cursor else None)
+            pages.extend(rows)
+            if cursor is None:
+                break
+        self.assertEqual(pages, leaderboard_page(self.event, is_imortal=False, tie_break=TIE_BREAK_HEAD_TO_HEAD)[0])
+
+    def test_view_pagination(self):
+        response = self.get(limit=4)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['rank'] for row in response.data['results']], [1, 1, 2, 2])
+        self.assertNotIn('registration_email', response.data['results'][0])
+        response = self.get(limit=4, cursor=response.data['next_cursor'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.ranking(response.data['results']), [(2, self.players[5].id), (3, self.players[3].id)])
+        self.assertIsNone(response.data['next_cursor'])
+
+    def test_view_category(self):
+        response = self.get(category='imortal')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.data['results']],
+                         [self.imortals[1].id, self.imortals[0].id])
+
+    def test_view_invalid_params(self):
+        for params in [{'category': 'finalistas'}, {'tie_break': 'nome'}, {'limit': 0},
+                       {'cursor': 'invalido'}, {'cursor': LeaderboardCursor(1, (30,), 1).encode(),
+                                                'tie_break': TIE_BREAK_HEAD_TO_HEAD}]:
+            response = self.get(**params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_view_requires_permission(self):
+        self.client.force_authenticate(user=User.objects.create(
+            username=f'user_{uuid.uuid4().hex[:10]}', email=f'{uuid.uuid4()}@gmail.com'))
+        response = self.client.get(self.url, {'event_id': self.event.id})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_view_reflects_score_changes(self):
+        self.assertEqual(self.get().data['results'][0]['id'], self.players[1].id)
+        player = self.players[3]
+        player.total_score = 90
+        player.save()
+        self.assertEqual(self.ranking(self.get().data['results'][:1]), [(1, player.id)])
@@ -1,10 +1,14 @@
 from django.contrib.auth.models import Permission, Group
 from users.models import User
-from ..models import Event, Token
-from ..permissions import filter_permissions, assign_permissions
+from ..models import Event, Player, Staff, Token
+from ..permissions import (EventAuthorization, filter_permissions, assign_permissions, get_group_permission_ids,
+                           has_event_permission)
 import uuid
+from django.db import connection
 from django.db.models import QuerySet
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from guardian.models import UserObjectPermission
 
 event_admin_permissions = ['change_event', 'view_event', 'delete_event', 'add_sumula_event', 'change_sumula_event', 'delete_sumula_event', 'view_sumula_event', 'add_player_event',
                            'change_player_event', 'view_player_event', 'delete_player_event', 'add_player_score_event', 'change_player_score_event', 'view_player_score_event', 'delete_player_score_event']
@@ -70,6 +74,25 @@ class AddPermissionsTestCase(TestCase):
         permissions = filter_permissions(invalid_group)
         self.assertIsNone(permissions)
 
+    def test_assign_permissions_single_insert(self):
+        """Testa que as permissões são atribuídas com uma única consulta após a primeira atribuição do grupo."""
+        get_group_permission_ids(self.group_player)
+        with CaptureQueriesContext(connection) as queries:
+            assign_permissions(self.user, self.group_player, self.event)
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.verify_permissions(self.user, self.event, player_permissions)
+
+    def test_assign_permissions_ignores_existing(self):
+        assign_permissions(self.user, self.group_player, self.event)
+        assign_permissions(self.user, self.group_staff_member, self.event)
+        self.assertEqual(
+            UserObjectPermission.objects.filter(user=self.user, object_pk=str(self.event.pk)).count(),
+            len(set(player_permissions) | set(staff_member_permissions)))
+
+    def test_assign_permissions_invalid_group(self):
+        assign_permissions(self.user, Group.objects.create(name='invalid_group'), self.event)
+        self.assertFalse(UserObjectPermission.objects.filter(user=self.user).exists())
+
     def verify_permissions(self, user, obj, expected_permissions):
         for perm in expected_permissions:
             self.assertTrue(user.has_perm(perm, obj))
@@ -80,3 +103,47 @@ class AddPermissionsTestCase(TestCase):
         self.user.delete()
         if Group.objects.all().exists():
             Group.objects.all().delete()
+
+
+class EventAuthorizationTestCase(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(name='Evento 1', token=Token.objects.create())
+        self.user = User.objects.create(username='user', email='user@gmail.com')
+
+    def request(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        return request
+
+    def test_roles_resolved_with_one_query(self):
+        Staff.objects.create(event=self.event, user=self.user, registration_email=self.user.email, is_manager=True)
+        Player.objects.create(event=self.event, user=self.user, registration_email=self.user.email)
+        self.user.events.add(self.event)
+        with self.assertNumQueries(1):
+            authorization = EventAuthorization(self.user, self.event)
+        self.assertEqual(authorization.groups, ['staff_manager', 'staff_member', 'player'])
+        self.assertTrue(authorization.is_member)
+        self.assertFalse(authorization.is_admin)
+
+    def test_role_permissions_without_object_permissions(self):
+        self.event.admin_email = self.user.email
+        self.event.save()
+        request = self.request()
+        for perm in EXPECTED_PERMISSIONS['event_admin']:
+            self.assertTrue(has_event_permission(request, f'api.{perm}', self.event))
+        self.assertFalse(UserObjectPermission.objects.exists())
+
+    def test_roles_resolved_once_per_request(self):
+        Player.objects.create(event=self.event, user=self.user, registration_email=self.user.email)
+        request = self.request()
+        has_event_permission(request, 'api.view_event', self.event)
+        with self.assertNumQueries(0):
+            self.assertTrue(has_event_permission(request, 'api.view_player_event', self.event))
+
+    def test_user_without_role(self):
+        request = self.request()
+        self.assertFalse(has_event_permission(request, 'api.view_event', self.event))
+        # Permissões de objeto atribuídas diretamente continuam válidas
+        assign_permissions(self.user, Group.objects.create(name='player'), self.event)
+        self.assertTrue(has_event_permission(self.request(), 'api.view_event', self.event))
+        self.assertFalse(has_event_permission(self.request(), 'api.change_event', self.event))
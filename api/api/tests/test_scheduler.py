@@ -0,0 +1,33 @@
+from itertools import combinations
+from django.test import SimpleTestCase
+from ..scheduler import round_robin_schedule
+
+
+class RoundRobinScheduleTestCase(SimpleTestCase):
+    def test_every_pair_plays_once(self):
+        for n in range(2, 65):
+            schedule = round_robin_schedule(n)
+            self.assertEqual(len(schedule), n - 1 + n % 2)
+            pairs = [pair for round_pairs in schedule for pair in round_pairs
+                     if pair[1] is not None]
+            self.assertEqual(sorted(pairs), list(
+                combinations(range(1, n + 1), 2)))
+
+    def test_each_player_once_per_round(self):
+        for n in range(2, 65):
+            for round_pairs in round_robin_schedule(n):
+                seats = [seat for pair in round_pairs for seat in pair
+                         if seat is not None]
+                self.assertEqual(sorted(seats), list(range(1, n + 1)))
+
+    def test_odd_number_of_players_has_one_bye_per_round(self):
+        for round_pairs in round_robin_schedule(7):
+            byes = [pair for pair in round_pairs if pair[1] is None]
+            self.assertEqual(len(byes), 1)
+
+    def test_schedule_is_memoized(self):
+        self.assertIs(round_robin_schedule(8), round_robin_schedule(8))
+
+    def test_not_enough_players(self):
+        with self.assertRaises(ValueError):
+            round_robin_schedule(1)
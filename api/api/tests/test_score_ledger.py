@@ -0,0 +1,96 @@
+from io import StringIO
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from api.models import Event, Player, PlayerScore, ScoreChange, SumulaClassificatoria, Token, replay_score_ledger
+from users.models import User
+from ..permissions import assign_permissions
+
+
+class ScoreLedgerTestCase(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', email='admin@email.com')
+        self.event = Event.objects.create(name='Evento 1', token=Token.objects.create(), admin_email=self.admin.email)
+        assign_permissions(self.admin, Group.objects.create(name='event_admin'), self.event)
+        self.admin.events.add(self.event)
+        self.sumula = SumulaClassificatoria.objects.create(event=self.event, name='Chave A')
+        self.players = Player.objects.bulk_create([
+            Player(event=self.event, full_name=f'Jogador {i}', registration_email=f'jogador{i}@gmail.com')
+            for i in range(3)])
+        self.scores = PlayerScore.objects.bulk_create([
+            PlayerScore(event=self.event, player=player, sumula_classificatoria=self.sumula)
+            for player in self.players])
+
+    def close_sumula(self, points: list[int]):
+        self.client.force_authenticate(user=self.admin)
+        self.sumula.refresh_from_db()
+        data = {'id': self.sumula.id, 'version': self.sumula.version, 'name': 'Chave A', 'description': 'Sala S4',
+                'players_score': [{'id': score.id, 'points': value, 'player': {'id': score.player_id}}
+                                  for score, value in zip(self.scores, points)]}
+        response = self.client.put(
+            f"{reverse('api:sumula-classificatoria')}?event_id={self.event.id}", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def totals(self) -> list[int]:
+        return list(Player.objects.filter(event=self.event).order_by('id').values_list('total_score', flat=True))
+
+    def test_close_records_changes_in_bulk(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.close_sumula([5, 3, 0])
+        inserts = [query['sql'] for query in queries.captured_queries
+                   if query['sql'].startswith(f'INSERT INTO "{ScoreChange._meta.db_table}"')]
+        self.assertEqual(len(inserts), 1)
+        self.close_sumula([7, 3, 1])
+        changes = list(ScoreChange.objects.filter(event=self.event).order_by('id').values_list(
+            'player_id', 'old_points', 'new_points', 'actor', 'sumula_classificatoria'))
+        self.assertEqual(changes, [
+            (self.players[0].id, 0, 5, self.admin.id, self.sumula.id),
+            (self.players[1].id, 0, 3, self.admin.id, self.sumula.id),
+            (self.players[2].id, 0, 0, self.admin.id, self.sumula.id),
+            (self.players[0].id, 5, 7, self.admin.id, self.sumula.id),
+            (self.players[1].id, 3, 3, self.admin.id, self.sumula.id),
+            (self.players[2].id, 0, 1, self.admin.id, self.sumula.id),
+        ])
+
+    def test_replay_restores_points_and_totals(self):
+        self.close_sumula([5, 3, 0])
+        self.close_sumula([7, 3, 1])
+        # Edições fora do encerramento das sumulas (por exemplo, pelo admin) e totais divergentes
+        PlayerScore.objects.filter(id=self.scores[0].id).update(points=40)
+        PlayerScore.objects.filter(id=self.scores[2].id).update(points=9)
+        Player.objects.filter(id=self.players[1].id).update(total_score=99)
+        with CaptureQueriesContext(connection) as queries:
+            restored, updated = replay_score_ledger(self.event.id)
+        self.assertEqual([query['sql'].split()[0] for query in queries.captured_queries
+                          if 'SAVEPOINT' not in query['sql']], ['UPDATE', 'UPDATE'])
+        self.assertEqual((restored, updated), (2, 1))
+        self.assertEqual(sorted(PlayerScore.objects.filter(event=self.event).values_list('points', flat=True)),
+                         [1, 3, 7])
+        self.assertEqual(self.totals(), [7, 3, 1])
+
+    def test_replay_keeps_scores_without_changes(self):
+        other = SumulaClassificatoria.objects.create(event=self.event, name='Chave B')
+        PlayerScore.objects.create(event=self.event, player=self.players[0], sumula_classificatoria=other, points=2)
+        self.close_sumula([5, 3, 0])
+        replay_score_ledger(self.event.id)
+        self.assertEqual(self.totals(), [7, 3, 0])
+
+    def test_replay_ignores_other_events(self):
+        self.close_sumula([5, 3, 0])
+        other_event = Event.objects.create(name='Evento 2', token=Token.objects.create())
+        PlayerScore.objects.filter(id=self.scores[0].id).update(points=40)
+        self.assertEqual(replay_score_ledger(other_event.id), (0, 0))
+        self.assertEqual(PlayerScore.objects.get(id=self.scores[0].id).points, 40)
+
+    def test_replay_score_ledger_command(self):
+        self.close_sumula([5, 3, 0])
+        PlayerScore.objects.filter(id=self.scores[0].id).update(points=40)
+        Player.objects.filter(id=self.players[0].id).update(total_score=40)
+        out = StringIO()
+        call_command('replay_score_ledger', self.event.id, stdout=out)
+        self.assertEqual(self.totals(), [5, 3, 0])
+        self.assertIn('1 pontuação(ões) restaurada(s) e 1 jogador(es)', out.getvalue())
@@ -0,0 +1,138 @@
+from django.contrib.auth.models import Group
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from api.models import Event, Player, PlayerScore, Results, SumulaImortal, Token
+from users.models import User
+from ..permissions import assign_permissions
+from ..scoreboard import ranked_players
+
+
+class ScoreboardViewTestCase(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', email='admin@email.com')
+        self.event = Event.objects.create(name='Evento 1', token=Token.objects.create(), admin_email=self.admin.email)
+        assign_permissions(self.admin, Group.objects.create(name='event_admin'), self.event)
+        self.admin.events.add(self.event)
+        self.results = Results.objects.create(event=self.event)
+        self.sumula = SumulaImortal.objects.create(event=self.event, name='Imortais 01')
+        self.imortals = Player.objects.bulk_create([
+            Player(event=self.event, full_name=f'Imortal {i}', registration_email=f'imortal{i}@gmail.com',
+                   is_imortal=True) for i in range(4)])
+        # Executa os recálculos agendados pelas pontuações criadas, como no commit da transação
+        with self.captureOnCommitCallbacks(execute=True):
+            self.scores = [PlayerScore.objects.create(event=self.event, player=player, sumula_imortal=self.sumula,
+                                                      points=10 * index) for index, player in enumerate(self.imortals)]
+        self.players = Player.objects.bulk_create([
+            Player(event=self.event, full_name=f'Jogador {i}', registration_email=f'jogador{i}@gmail.com',
+                   total_score=score) for i, score in enumerate([30, 50, 30, 10])])
+        self.url = reverse('api:scoreboard', kwargs={'slug': self.event.scoreboard_slug})
+
+    def publish_imortals(self):
+        self.client.force_authenticate(user=self.admin)
+        self.client.put(f"{reverse('api:publish-results-imortals')}?event_id={self.event.id}")
+        self.client.force_authenticate(user=None)
+
+    def publish_final(self):
+        self.client.force_authenticate(user=self.admin)
+        self.client.put(f"{reverse('api:results')}?event_id={self.event.id}", {
+            'top4': [{'player_id': player.id} for player in self.players],
+            'paladin': {'player_id': self.players[0].id},
+            'ambassor': {'player_id': self.players[1].id},
+        }, format='json')
+        self.client.force_authenticate(user=None)
+
+    def test_unknown_slug(self):
+        response = self.client.get(reverse('api:scoreboard', kwargs={'slug': 'inexistente'}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'errors': 'Placar não encontrado!'})
+
+    def test_not_published(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'errors': 'Resultados ainda não publicados.'})
+
+    def test_imortals_published(self):
+        self.publish_imortals()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([player['id'] for player in response.data['imortals']],
+                         [player.id for player in reversed(self.imortals[1:])])
+        self.assertNotIn('registration_email', response.data['imortals'][0])
+        for field in ['top4', 'paladin', 'ambassor', 'leaderboard']:
+            self.assertIsNone(response.data[field])
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=', response['Cache-Control'])
+        self.assertIn('stale-while-revalidate=', response['Cache-Control'])
+
+    def test_final_results_published(self):
+        self.publish_imortals()
+        self.publish_final()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['paladin']['id'], self.players[0].id)
+        self.assertEqual(response.data['ambassor']['id'], self.players[1].id)
+        self.assertEqual(len(response.data['top4']), 4)
+        self.assertEqual([(player['rank'], player['id']) for player in response.data['leaderboard']], [
+            (1, self.players[1].id), (2, self.players[0].id), (2, self.players[2].id), (3, self.players[3].id)])
+
+    def test_matching_etag_returns_304(self):
+        self.publish_imortals()
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn('stale-while-revalidate=', response['Cache-Control'])
+
+    def test_score_change_regenerates_scoreboard(self):
+        self.publish_imortals()
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_authenticate(user=self.admin)
+        data = {'id': self.sumula.id, 'version': self.sumula.version, 'name': 'Imortais 01', 'description': 'Sala S4',
+                'players_score': [{'id': self.scores[0].id, 'points': 100}]}
+        # O placar é gerado novamente após o commit da transação
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(f"{reverse('api:sumula-imortal')}?event_id={self.event.id}", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imortals'][0]['id'], self.imortals[0].id)
+
+    def test_score_change_outside_views_regenerates_leaderboard(self):
+        self.publish_final()
+        # Pontuação criada fora das views (admin, importações ou comandos)
+        with self.captureOnCommitCallbacks(execute=True):
+            PlayerScore.objects.create(event=self.event, player=self.players[3], sumula_imortal=self.sumula,
+                                       points=100)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['leaderboard'][0]['id'], self.players[3].id)
+
+    def test_player_deletion_regenerates_leaderboard(self):
+        self.publish_final()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.players[3].delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn(self.players[3].id, [player['id'] for player in response.data['leaderboard']])
+        self.assertNotIn(self.players[3].id, [player['id'] for player in response.data['top4']])
+
+    def test_sumula_deletion_regenerates_scoreboard(self):
+        self.publish_imortals()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sumula.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(all(player['total_score'] == 0 for player in response.data['imortals']))
+
+    def test_revoked_results_are_hidden(self):
+        self.publish_imortals()
+        self.client.force_authenticate(user=self.admin)
+        self.client.delete(f"{reverse('api:results')}?event_id={self.event.id}")
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ranked_players_limit(self):
+        self.assertEqual([player['id'] for player in ranked_players(self.event, limit=2)],
+                         [self.players[1].id, self.players[0].id])
@@ -0,0 +1,226 @@
+import gzip
+import json
+import os
+import tempfile
+import uuid
+from io import BytesIO, StringIO
+from django.contrib.auth.models import Group
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.forms import ValidationError
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from api.models import Event, Player, PlayerScore, Results, Staff, SumulaClassificatoria, SumulaImortal, Token
+from users.models import User
+from ..snapshots import SNAPSHOT_FORMAT, SNAPSHOT_VERSION, export_event, read_snapshot, restore_event, write_snapshot
+from ..views.views_sumulas import GenerateSumulas
+
+
+def create_event(n_players: int) -> Event:
+    """Cria um evento com monitores, sumulas geradas, uma sumula imortal e resultados."""
+    event = Event.objects.create(name='Evento 1', token=Token.objects.create(), is_sumulas_generated=True)
+    staff = Staff.objects.create(event=event, full_name='Monitor', registration_email='monitor@gmail.com',
+                                 is_manager=True)
+    Player.objects.bulk_create([
+        Player(event=event, full_name=f'Jogador {i}', registration_email=f'jogador{i}@gmail.com', is_present=True)
+        for i in range(n_players)])
+    sumulas = GenerateSumulas().generate_sumulas(event=event)
+    sumulas[0].referee.add(staff)
+    PlayerScore.objects.filter(event=event).update(points=3)
+    imortal = SumulaImortal.objects.create(event=event, name='Imortal 1')
+    imortal.referee.add(staff)
+    players = list(Player.objects.filter(event=event).order_by('id')[:4])
+    for player in players:
+        PlayerScore.objects.create(event=event, player=player, sumula_imortal=imortal, points=1)
+    Player.objects.filter(id__in=[player.id for player in players]).update(is_imortal=True)
+    results = Results.objects.create(event=event, paladin=players[0], ambassor=players[1])
+    results.imortals.add(*players[:3])
+    results.top4.add(*players)
+    return event
+
+
+class EventSnapshotTestCase(TestCase):
+    def snapshot(self, event: Event) -> dict:
+        output = BytesIO()
+        write_snapshot(event, output)
+        output.seek(0)
+        return read_snapshot(output)
+
+    def test_restore_event(self):
+        event = create_event(20)
+        restored = restore_event(self.snapshot(event), name='Ensaio')
+
+        self.assertNotEqual(restored.id, event.id)
+        self.assertNotEqual(restored.join_token, event.join_token)
+        self.assertNotEqual(restored.scoreboard_slug, event.scoreboard_slug)
+        self.assertTrue(restored.token.used)
+        self.assertEqual(restored.name, 'Ensaio')
+        self.assertTrue(restored.is_sumulas_generated)
+        for model in [Staff, Player, PlayerScore, SumulaClassificatoria, SumulaImortal]:
+            self.assertEqual(model.objects.filter(event=restored).count(),
+                             model.objects.filter(event=event).count())
+        self.assertEqual(
+            sorted(Player.objects.filter(event=restored).values_list('registration_email', 'is_imortal')),
+            sorted(Player.objects.filter(event=event).values_list('registration_email', 'is_imortal')))
+
+        for sumula in SumulaClassificatoria.objects.filter(event=restored):
+            score_ids = set(sumula.scores.values_list('id', flat=True))
+            round_ids = {score_id for round_pairs in sumula.rounds['rounds']
+                         for pair in round_pairs for score_id in pair if score_id}
+            self.assertEqual(round_ids, score_ids)
+        self.assertEqual(SumulaClassificatoria.referee.through.objects.filter(
+            sumulaclassificatoria__event=restored, staff__event=restored).count(), 1)
+        imortal = SumulaImortal.objects.get(event=restored)
+        self.assertEqual(imortal.referee.get().event, restored)
+        self.assertEqual(imortal.scores.count(), 4)
+
+        results = Results.objects.get(event=restored)
+        self.assertEqual(results.paladin.event, restored)
+        self.assertEqual(results.paladin.registration_email, event.results.paladin.registration_email)
+        self.assertEqual(results.imortals.filter(event=restored).count(), 3)
+        self.assertEqual(results.top4.filter(event=restored).count(), 4)
+
+    def test_restore_query_count_is_constant(self):
+        small = self.snapshot(create_event(16))
+        large = self.snapshot(create_event(200))
+        with CaptureQueriesContext(connection) as small_queries:
+            restore_event(small)
+        with CaptureQueriesContext(connection) as large_queries:
+            restore_event(large)
+        self.assertEqual(len(small_queries.captured_queries), len(large_queries.captured_queries))
+
+    def test_export_query_count_is_constant(self):
+        small, large = create_event(16), create_event(200)
+        with CaptureQueriesContext(connection) as small_queries:
+            export_event(small)
+        with CaptureQueriesContext(connection) as large_queries:
+            export_event(large)
+        self.assertEqual(len(small_queries.captured_queries), len(large_queries.captured_queries))
+
+    def test_read_invalid_snapshot(self):
+        with self.assertRaises(ValidationError):
+            read_snapshot(BytesIO(b'invalido'))
+
+    def test_read_snapshot_validates_structure(self):
+        data = json.loads(json.dumps(export_event(create_event(8)), cls=DjangoJSONEncoder))
+        invalid = [
+            {'format': SNAPSHOT_FORMAT, 'version': SNAPSHOT_VERSION},
+            {**data, 'version': SNAPSHOT_VERSION + 1},
+            {**data, 'players': []},
+            {**data, 'scores': {'fields': ['id'], 'rows': []}},
+            {**data, 'staff': {'fields': ['id'], 'rows': [[1, 2]]}},
+            {**data, 'players': {**data['players'], 'rows': [[str(row[0]), *row[1:]] for row in data['players']['rows']]}},
+            {**data, 'scores': {**data['scores'], 'rows': data['scores']['rows'] + [
+                [0 if field == 'id' else None for field in data['scores']['fields']]]}},
+            {**data, 'results': {**data['results'], 'top4': [0]}},
+        ]
+        for snapshot in invalid:
+            with self.assertRaises(ValidationError):
+                read_snapshot(BytesIO(gzip.compress(json.dumps(snapshot).encode())))
+
+    def test_restore_invalid_values(self):
+        data = json.loads(json.dumps(export_event(create_event(8)), cls=DjangoJSONEncoder))
+        fields = data['scores']['fields']
+        data['scores']['rows'][0][fields.index('points')] = 'pontos'
+        with self.assertRaises(ValidationError):
+            restore_event(data)
+        self.assertEqual(Event.objects.count(), 1)
+
+    def test_command_invalid_snapshot(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'evento.json.gz')
+            with open(path, 'wb') as file:
+                file.write(gzip.compress(json.dumps({'format': SNAPSHOT_FORMAT, 'version': SNAPSHOT_VERSION}).encode()))
+            with self.assertRaisesMessage(CommandError, 'Arquivo de snapshot inválido!'):
+                call_command('event_snapshot', 'restore', path, stdout=StringIO())
+
+    def test_command(self):
+        event = create_event(16)
+        admin = User.objects.create(username='admin', email='admin@gmail.com')
+        Group.objects.create(name='event_admin')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'evento.json.gz')
+            call_command('event_snapshot', 'export', str(event.id), path, stdout=StringIO())
+            out = StringIO()
+            call_command('event_snapshot', 'restore', path, '--admin-email', admin.email, stdout=out)
+        restored = Event.objects.exclude(id=event.id).get()
+        self.assertIn(restored.join_token, out.getvalue())
+        self.assertTrue(admin.has_perm('api.change_event', restored))
+        self.assertEqual(Player.objects.filter(event=restored).count(), 16)
+
+
+class EventSnapshotViewTestCase(APITestCase):
+    def setUp(self):
+        self.event = create_event(16)
+        self.admin = User.objects.create_superuser(
+            username='superuser', email='superuser@gmail.com', password='senha')
+        Group.objects.create(name='event_admin')
+        self.url = f"{reverse('api:event-snapshot')}?event_id={self.event.id}"
+
+    def test_snapshot_requires_app_admin(self):
+        self.client.force_authenticate(user=User.objects.create(
+            username=f'user_{uuid.uuid4().hex[:10]}', email=f'{uuid.uuid4()}@gmail.com'))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_and_restore(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        file = SimpleUploadedFile('evento.json.gz', response.content)
+        response = self.client.post(reverse('api:event-snapshot'), {'file': file, 'name': 'Ensaio'},
+                                    format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['name'], 'Ensaio')
+        restored = Event.objects.get(id=response.data['id'])
+        self.assertEqual(Player.objects.filter(event=restored).count(), 16)
+        self.assertIn(restored, self.admin.events.all())
+
+    def test_restorer_administers_restored_event(self):
+        self.event.admin_email = 'original@gmail.com'
+        self.event.save()
+        original_admin = User.objects.create(username='original', email='original@gmail.com')
+        self.client.force_authenticate(user=self.admin)
+        file = SimpleUploadedFile('evento.json.gz', self.client.get(self.url).content)
+        response = self.client.post(reverse('api:event-snapshot'), {'file': file}, format='multipart')
+        restored = Event.objects.get(id=response.data['id'])
+        self.assertEqual(restored.admin_email, self.admin.email)
+
+        # O usuário comum que restaurou o evento o vê na sua lista de eventos como administrador
+        restorer = User.objects.create(username='restorer', email='restorer@gmail.com')
+        restored_by_user = restore_event(export_event(self.event), admin=restorer)
+        self.client.force_authenticate(user=restorer)
+        response = self.client.get(reverse('api:event'))
+        self.assertEqual([(item['event']['id'], item['role']) for item in response.data],
+                         [(restored_by_user.id, 'admin')])
+        response = self.client.get(f"{reverse('api:players')}?event_id={restored_by_user.id}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # O administrador do evento original não administra as cópias
+        self.client.force_authenticate(user=original_admin)
+        self.assertEqual(self.client.get(reverse('api:event')).data, [])
+        response = self.client.get(f"{reverse('api:players')}?event_id={restored_by_user.id}")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_restore_invalid_file(self):
+        self.client.force_authenticate(user=self.admin)
+        file = SimpleUploadedFile('evento.json.gz', b'invalido')
+        response = self.client.post(reverse('api:event-snapshot'), {'file': file}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'errors': 'Arquivo de snapshot inválido!'})
+
+    def test_restore_snapshot_with_missing_tables(self):
+        self.client.force_authenticate(user=self.admin)
+        content = gzip.compress(json.dumps({'format': SNAPSHOT_FORMAT, 'version': SNAPSHOT_VERSION,
+                                            'event': {}}).encode())
+        file = SimpleUploadedFile('evento.json.gz', content)
+        response = self.client.post(reverse('api:event-snapshot'), {'file': file}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'errors': 'Arquivo de snapshot inválido! Tabela staff ausente ou inválida.'})
+        self.assertEqual(Event.objects.count(), 1)
@@ -0,0 +1,67 @@
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from api.models import Event, Token, TOKEN_LENGTH, generate_unique_codes
+from users.models import User
+
+
+class TokenMintTestCase(TestCase):
+    def test_mint_tokens(self):
+        tokens = Token.mint(50)
+        self.assertEqual(len(tokens), 50)
+        self.assertEqual(len({token.token_code for token in tokens}), 50)
+        self.assertTrue(all(len(token.token_code) == TOKEN_LENGTH for token in tokens))
+        self.assertEqual(Token.objects.count(), 50)
+
+    def test_mint_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as few:
+            Token.mint(5)
+        with CaptureQueriesContext(connection) as many:
+            Token.mint(500)
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+        self.assertEqual(Token.objects.count(), 505)
+
+    def test_only_colliders_are_regenerated(self):
+        Token.objects.create(token_code='AAAAAAA11')
+        codes = iter(['AAAAAAA11', 'BBBBBBB22', 'CCCCCCC33'])
+        with mock.patch('api.models.generate_code', side_effect=lambda: next(codes)):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(sorted(generate_unique_codes(Token, 'token_code', 2)),
+                                 ['BBBBBBB22', 'CCCCCCC33'])
+        self.assertEqual(len(queries.captured_queries), 2)
+
+    def test_event_join_token_skips_existing(self):
+        event = Event.objects.create(name='Evento 1', token=Token.objects.create())
+        codes = iter([event.join_token, 'DDDDDDD44'])
+        with mock.patch('api.models.generate_code', side_effect=lambda: next(codes)):
+            other = Event.objects.create(name='Evento 2', token=Token.objects.create(token_code='EEEEEEE55'))
+        self.assertEqual(other.join_token, 'DDDDDDD44')
+
+    def test_mint_tokens_command(self):
+        out = StringIO()
+        call_command('mint_tokens', '3', stdout=out, stderr=StringIO())
+        codes = out.getvalue().split()
+        self.assertEqual(sorted(codes), sorted(Token.objects.values_list('token_code', flat=True)))
+
+    def test_admin_create_tokens(self):
+        self.client.force_login(User.objects.create_superuser(
+            username='superuser', email='superuser@gmail.com', password='senha'))
+        response = self.client.post(reverse('admin:create-tokens'), {'quantity': 25})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Token.objects.count(), 25)
+        self.client.post(reverse('admin:create-tokens'), {'quantity': 0})
+        self.assertEqual(Token.objects.count(), 25)
+        self.assertEqual(self.client.get(reverse('admin:api_token_changelist')).status_code, 200)
+
+
+class JoinTokenTestCase(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(name='Evento 1', token=Token.objects.create())
+
+    def test_join_token_is_unique(self):
+        with self.assertRaises(IntegrityError):
+            Event.objects.create(name='Evento 2', token=Token.objects.create(), join_token=self.event.join_token)
@@ -0,0 +1,111 @@
+import uuid
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from api.models import Event, Player, PlayerScore, SumulaClassificatoria, Token, recompute_total_scores
+
+
+class TotalScoreTestCase(TestCase):
+    def create_player(self, event: Event) -> Player:
+        return Player.objects.create(event=event, registration_email=f'{uuid.uuid4()}@gmail.com')
+
+    def setUp(self):
+        self.event = Event.objects.create(name='Evento 1', token=Token.objects.create())
+        self.sumula = SumulaClassificatoria.objects.create(event=self.event)
+        self.player = self.create_player(self.event)
+        self.player2 = self.create_player(self.event)
+
+    def create_score(self, player: Player, points: int = 0) -> PlayerScore:
+        return PlayerScore.objects.create(
+            player=player, event=self.event, sumula_classificatoria=self.sumula, points=points)
+
+    def total_score(self, player: Player) -> int:
+        player.refresh_from_db()
+        return player.total_score
+
+    def test_save_updates_total_with_single_statement(self):
+        score = PlayerScore.objects.get(id=self.create_score(self.player, 5).id)
+        score.points = 8
+        with CaptureQueriesContext(connection) as context:
+            score.save()
+        player_queries = [query['sql'] for query in context.captured_queries
+                          if query['sql'].startswith(f'UPDATE "{Player._meta.db_table}"')]
+        self.assertEqual(len(player_queries), 1)
+        self.assertNotIn('SUM', ' '.join(
+            query['sql'] for query in context.captured_queries))
+        self.assertEqual(self.total_score(self.player), 8)
+
+    def test_stale_instances_do_not_lose_increments(self):
+        score1 = self.create_score(self.player)
+        score2 = self.create_score(self.player)
+        stale1 = PlayerScore.objects.get(id=score1.id)
+        stale2 = PlayerScore.objects.select_related('player').get(id=score2.id)
+        stale1.points = 10
+        stale1.save()
+        stale2.points = 7
+        stale2.save()
+        self.assertEqual(self.total_score(self.player), 17)
+
+    def test_delete_subtracts_points(self):
+        score = self.create_score(self.player, 10)
+        self.create_score(self.player, 4)
+        PlayerScore.objects.filter(id=score.id).delete()
+        self.assertEqual(self.total_score(self.player), 4)
+
+    def test_moving_score_to_another_player(self):
+        score = PlayerScore.objects.get(id=self.create_score(self.player, 6).id)
+        score.player = self.player2
+        score.save()
+        self.assertEqual(self.total_score(self.player), 0)
+        self.assertEqual(self.total_score(self.player2), 6)
+
+    def test_score_from_another_event_is_ignored(self):
+        other_event = Event.objects.create(name='Evento 2', token=Token.objects.create())
+        Player.objects.filter(id=self.player.id).update(total_score=10)
+        # Pontuação inconsistente criada sem passar pela validação de PlayerScore.save
+        score = PlayerScore.objects.bulk_create([PlayerScore(
+            player=self.player, event=other_event, sumula_classificatoria=self.sumula, points=10)])[0]
+        PlayerScore.objects.get(id=score.id).delete()
+        self.assertEqual(self.total_score(self.player), 10)
+
+    def test_negative_total_is_recomputed(self):
+        self.create_score(self.player, 4)
+        score = self.create_score(self.player, 10)
+        Player.objects.filter(id=self.player.id).update(total_score=2)
+        PlayerScore.objects.get(id=score.id).delete()
+        self.assertEqual(self.total_score(self.player), 4)
+
+    def test_recompute_after_bulk_update(self):
+        scores = [self.create_score(self.player), self.create_score(self.player2)]
+        for score in scores:
+            score.points = 9
+        PlayerScore.objects.bulk_update(scores, ['points'])
+        Player.objects.filter(id=self.player2.id).update(total_score=50)
+        with self.assertNumQueries(1):
+            updated = recompute_total_scores(self.event.id)
+        self.assertEqual(updated, 2)
+        self.assertEqual(self.total_score(self.player), 9)
+        self.assertEqual(self.total_score(self.player2), 9)
+
+    def test_recompute_only_given_players(self):
+        Player.objects.filter(event=self.event).update(total_score=3)
+        recompute_total_scores(self.event.id, [self.player.id])
+        self.assertEqual(self.total_score(self.player), 0)
+        self.assertEqual(self.total_score(self.player2), 3)
+
+    def test_recompute_ignores_other_events(self):
+        other_event = Event.objects.create(name='Evento 2', token=Token.objects.create())
+        other_player = self.create_player(other_event)
+        Player.objects.filter(id=other_player.id).update(total_score=3)
+        recompute_total_scores(self.event.id)
+        self.assertEqual(self.total_score(other_player), 3)
+
+    def test_recompute_total_scores_command(self):
+        self.create_score(self.player, 5)
+        Player.objects.filter(id=self.player.id).update(total_score=0)
+        out = StringIO()
+        call_command('recompute_total_scores', self.event.id, stdout=out)
+        self.assertEqual(self.total_score(self.player), 5)
+        self.assertIn('1 jogador(es)', out.getvalue())
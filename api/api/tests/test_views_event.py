@@ -1,15 +1,20 @@
 
-from api.models import Token, Event
+from api.models import Token, Event, Player, PlayerScore, Results, Staff, SumulaImortal
 from users.models import User
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
+from django.core.cache import cache
+from django.test import override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import Group
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.models import Permission
 from ..utils import get_permissions, get_content_type
 from guardian.shortcuts import assign_perm, remove_perm
 from ..serializers import UserEventsSerializer
+from ..permissions import assign_permissions
 
 
 # class TokenViewTest(APITestCase):
@@ -206,6 +211,8 @@ class EventViewTest(APITestCase):
         data = {'token_code': self.token2.token_code}
 
         remove_perm('delete_event', self.user, self.event)
+        self.event.admin_email = 'another@email.com'
+        self.event.save()
         self.client.force_authenticate(user=self.user)  # type: ignore
 
         response = self.client.delete(url, data, format='json')
@@ -239,3 +246,159 @@ class EventViewTest(APITestCase):
         self.client.force_authenticate(user=None)
         if Event.objects.exists():
             Event.objects.all().delete()
+
+
+class UserEventsViewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='testuser', email='test@email.com')
+        self.url = reverse('api:event')
+        self.roles = {}
+        for index, role in enumerate(['admin', 'manager', 'staff', 'player', None] * 4):
+            event = Event.objects.create(name=f'Evento {index}', token=Token.objects.create(), active=index % 2 == 0)
+            if role == 'admin':
+                event.admin_email = self.user.email
+                event.save()
+            elif role in ['manager', 'staff']:
+                Staff.objects.create(event=event, user=self.user, registration_email=self.user.email,
+                                     is_manager=role == 'manager')
+            elif role == 'player':
+                Player.objects.create(event=event, user=self.user, registration_email=self.user.email)
+            self.user.events.add(event)
+            if role:
+                self.roles[event.id] = role
+        self.client.force_authenticate(user=self.user)
+
+    def test_get_events_with_roles_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({item['event']['id']: item['role'] for item in response.data}, self.roles)
+        ids = [item['event']['id'] for item in response.data]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_highest_role_is_returned(self):
+        event_id = next(event_id for event_id, role in self.roles.items() if role == 'admin')
+        Staff.objects.create(event_id=event_id, user=self.user, registration_email=self.user.email, is_manager=True)
+        response = self.client.get(self.url)
+        self.assertEqual(next(item['role'] for item in response.data if item['event']['id'] == event_id), 'admin')
+
+    def test_active_filter(self):
+        response = self.client.get(self.url, {'active': 'true'})
+        self.assertTrue(response.data)
+        self.assertTrue(all(item['event']['active'] for item in response.data))
+        response = self.client.get(self.url, {'active': 'false'})
+        self.assertTrue(response.data)
+        self.assertFalse(any(item['event']['active'] for item in response.data))
+        response = self.client.get(self.url, {'active': 'talvez'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_keyset_pagination(self):
+        ids, cursor = [], None
+        while True:
+            params = {'limit': 5} if cursor is None else {'limit': 5, 'cursor': cursor}
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 5)
+            ids += [item['event']['id'] for item in response.data['results']]
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(ids, sorted(self.roles, reverse=True))
+
+    def test_invalid_pagination_parameters(self):
+        for params in [{'limit': 0}, {'limit': 'abc'}, {'cursor': 'abc'}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ImortalsResultsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create(username='admin', email='admin@email.com')
+        self.event = Event.objects.create(name='Evento 1', token=Token.objects.create(), admin_email=self.admin.email)
+        assign_permissions(self.admin, Group.objects.create(name='event_admin'), self.event)
+        self.admin.events.add(self.event)
+        self.results = Results.objects.create(event=self.event)
+        self.sumula = SumulaImortal.objects.create(event=self.event, name='Imortais 01')
+        self.players = Player.objects.bulk_create([
+            Player(event=self.event, full_name=f'Jogador {i}', registration_email=f'jogador{i}@gmail.com',
+                   is_imortal=True) for i in range(5)])
+        # Executa os recálculos agendados pelas pontuações criadas, como no commit da transação
+        with self.captureOnCommitCallbacks(execute=True):
+            self.scores = [PlayerScore.objects.create(event=self.event, player=player, sumula_imortal=self.sumula,
+                                                      points=10 * index) for index, player in enumerate(self.players)]
+        self.user = User.objects.create(username='jogador', email='jogador0@gmail.com')
+        Player.objects.filter(id=self.players[0].id).update(user=self.user)
+        self.user.events.add(self.event)
+        self.url = f"{reverse('api:results')}?event_id={self.event.id}"
+
+    def imortal_ids(self) -> set[int]:
+        return set(self.results.imortals.values_list('id', flat=True))
+
+    def publish(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.put(f"{reverse('api:publish-results-imortals')}?event_id={self.event.id}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_publish_computes_imortals(self):
+        self.assertEqual(self.imortal_ids(), set())
+        self.publish()
+        self.assertEqual(self.imortal_ids(), {player.id for player in self.players[2:]})
+
+    @override_settings(EVENT_RESPONSE_CACHE_ALLOW_LOCAL=True,
+                       CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_get_results_does_not_write(self):
+        self.publish()
+        self.client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({player['id'] for player in response.data['imortals']},
+                         {player.id for player in self.players[2:]})
+        self.assertFalse([query for query in queries.captured_queries
+                          if query['sql'].split()[0] in ['INSERT', 'UPDATE', 'DELETE']])
+        with CaptureQueriesContext(connection) as cached:
+            self.assertEqual(self.client.get(self.url).data, response.data)
+        self.assertLess(len(cached.captured_queries), len(queries.captured_queries))
+
+    def test_score_change_after_publication_updates_imortals(self):
+        self.publish()
+        self.client.get(self.url)
+        data = {'id': self.sumula.id, 'version': self.sumula.version, 'name': 'Imortais 01', 'description': 'Sala S4',
+                'players_score': [{'id': self.scores[0].id, 'points': 100}]}
+        # Os imortais são recalculados após o commit da transação
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(f"{reverse('api:sumula-imortal')}?event_id={self.event.id}", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = {self.players[0].id, self.players[4].id, self.players[3].id}
+        self.assertEqual(self.imortal_ids(), expected)
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual({player['id'] for player in self.client.get(self.url).data['imortals']}, expected)
+
+    def test_sumula_deletion_after_publication_updates_imortals(self):
+        other = SumulaImortal.objects.create(event=self.event, name='Imortais 02')
+        with self.captureOnCommitCallbacks(execute=True):
+            PlayerScore.objects.create(event=self.event, player=self.players[0], sumula_imortal=other, points=5)
+            PlayerScore.objects.create(event=self.event, player=self.players[1], sumula_imortal=other, points=3)
+        self.publish()
+        self.assertEqual(self.imortal_ids(), {player.id for player in self.players[2:]})
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.delete(f"{reverse('api:sumula')}?event_id={self.event.id}",
+                                          {'id': self.sumula.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # As pontuações deletadas agendam um único recálculo
+        self.assertEqual(len([callback for callback in callbacks if hasattr(callback, 'results_event_id')]), 1)
+        self.assertEqual(self.imortal_ids(), {player.id for player in self.players[:3]})
+
+    def test_player_deletion_after_publication_updates_imortals(self):
+        self.publish()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.players[4].delete()
+        self.assertEqual(self.imortal_ids(), {player.id for player in self.players[1:4]})
+
+    def test_score_change_before_publication_does_not_compute(self):
+        self.client.force_authenticate(user=self.admin)
+        data = {'id': self.sumula.id, 'version': self.sumula.version, 'name': 'Imortais 01', 'description': 'Sala S4',
+                'players_score': [{'id': self.scores[0].id, 'points': 100}]}
+        self.client.put(f"{reverse('api:sumula-imortal')}?event_id={self.event.id}", data, format='json')
+        self.assertEqual(self.imortal_ids(), set())
@@ -1,9 +1,15 @@
 
 import random
+import tempfile
+from io import BytesIO
+import pandas as pd
 from rest_framework.test import APITestCase, APIClient
+from django.test import override_settings
 from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
-from api.models import Results, SumulaImortal, SumulaClassificatoria, Event,  Token, Player
+from api.models import Results, SumulaImortal, SumulaClassificatoria, Event, Job, Token, Player
 from users.models import User
 import uuid
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -26,6 +32,8 @@ class PlayersViewTest(APITestCase):
         perms = get_perms(user, event)
         for perm in perms:
             remove_perm(perm, user, event)
+        # As permissões também são derivadas do vínculo do usuário com o jogador do evento
+        Player.objects.filter(user=user, event=event).update(user=None)
 
     def generate_random_name(self):
         names = ['João', 'José', 'Pedro', 'Paulo', 'Lucas', 'Mário', 'Luiz']
@@ -114,7 +122,7 @@ class PlayersViewTest(APITestCase):
 
     def test_get_all_players_with_invalid_event_id(self):
         self.client.force_authenticate(user=self.admin)
-        url = f"{reverse('api:players')}?event_id=100"
+        url = f"{reverse('api:players')}?event_id=999999"
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
@@ -245,6 +253,8 @@ class GetPlayerResultsViewTest(APITestCase):
         perms = get_perms(user, event)
         for perm in perms:
             remove_perm(perm, user, event)
+        # As permissões também são derivadas do vínculo do usuário com o jogador do evento
+        Player.objects.filter(user=user, event=event).update(user=None)
 
     def test_get_player(self):
         self.client.force_authenticate(user=self.user)
@@ -267,7 +277,7 @@ class GetPlayerResultsViewTest(APITestCase):
 
     def test_get_player_with_invalid_event_id(self):
         self.client.force_authenticate(user=self.user)
-        url = f"{reverse('api:player')}?event_id=100"
+        url = f"{reverse('api:player')}?event_id=999999"
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(
@@ -311,6 +321,7 @@ class GetPlayerResultsViewTest(APITestCase):
         self.client = None
 
 
+@override_settings(JOBS_MODE='eager')
 class AddPlayersViewTest(APITestCase):
     def create_unique_email(self):
         return f'{uuid.uuid4()}@gmail.com'
@@ -368,6 +379,13 @@ class AddPlayersViewTest(APITestCase):
         self.setUpUrl()
         self.client = APIClient()
 
+    def get_job(self, response):
+        """Retorna o estado da tarefa enfileirada pela importação."""
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = self.client.get(response.data['url'])
+        self.assertEqual(job.status_code, status.HTTP_200_OK)
+        return job.data
+
     def test_add_players_csv(self):
         self.client.force_authenticate(user=self.admin)
 
@@ -375,8 +393,9 @@ class AddPlayersViewTest(APITestCase):
 
         response = self.client.post(self.url, data, format='multipart')
 
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(response.data, 'Jogadores adicionados com sucesso!')
+        job = self.get_job(response)
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['result']['message'], 'Jogadores adicionados com sucesso!')
 
         players = Player.objects.filter(event=self.event)
         self.assertEqual(players.count(), 10)
@@ -385,11 +404,20 @@ class AddPlayersViewTest(APITestCase):
         self.client.force_authenticate(user=self.admin)
         data = {'file': self.excel_uploaded_file}
         response = self.client.post(self.url, data, format='multipart')
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(response.data, 'Jogadores adicionados com sucesso!')
+        job = self.get_job(response)
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['result']['message'], 'Jogadores adicionados com sucesso!')
         players = Player.objects.filter(event=self.event)
         self.assertEqual(players.count(), 10)
 
+    def test_add_players_invalid_extension(self):
+        self.client.force_authenticate(user=self.admin)
+        file = SimpleUploadedFile(
+            'Exemplo.txt', b'Nome Completo,E-mail', content_type='multipart/form-data')
+        response = self.client.post(self.url, {'file': file}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'errors': 'Arquivo inválido!'})
+
     def test_add_players_unauthenticated(self):
         data = {'file': self.csv_uploaded_file}
         response = self.client.post(self.url, data, format='multipart')
@@ -412,12 +440,55 @@ class AddPlayersViewTest(APITestCase):
 
     def test_add_players_with_invalid_event_id(self):
         self.client.force_authenticate(user=self.admin)
-        url = f"{reverse('api:upload-player')}?event_id=100"
+        url = f"{reverse('api:upload-player')}?event_id=999999"
         response = self.client.post(url, {'file': self.csv_uploaded_file})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(
             response.data, {'errors': "['Evento não encontrado!']"})
 
+    def upload_with_errors(self):
+        content = 'Nome Completo,E-mail\nMaria Silva,maria@gmail.com\nSem Email,invalido\n'
+        file = SimpleUploadedFile(
+            'Erros.csv', content.encode('utf-8'), content_type='multipart/form-data')
+        return self.get_job(self.client.post(self.url, {'file': file}, format='multipart'))
+
+    def report_url(self, report_id, file_format='csv'):
+        return f"{reverse('api:import-report')}?event_id={self.event.id}&report_id={report_id}&file_format={file_format}"
+
+    def test_add_players_with_errors_returns_report(self):
+        self.client.force_authenticate(user=self.admin)
+        job = self.upload_with_errors()
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertIn('report_id', job['result'])
+        report = self.client.get(self.report_url(job['result']['report_id']))
+        self.assertEqual(report.status_code, status.HTTP_200_OK)
+        self.assertEqual(report['Content-Type'], 'text/csv; charset=utf-8')
+        lines = report.content.decode('utf-8-sig').splitlines()
+        self.assertEqual(lines, ['Linha,Nome Completo,E-mail,Erro',
+                                 '3,Sem Email,invalido,E-mail inválido'])
+
+    def test_import_report_xlsx(self):
+        self.client.force_authenticate(user=self.admin)
+        report_id = self.upload_with_errors()['result']['report_id']
+        report = self.client.get(self.report_url(report_id, 'xlsx'))
+        self.assertEqual(report.status_code, status.HTTP_200_OK)
+        df = pd.read_excel(BytesIO(report.content))
+        self.assertEqual(list(df['Erro']), ['E-mail inválido'])
+
+    def test_import_report_not_found(self):
+        self.client.force_authenticate(user=self.admin)
+        for report_id in [uuid.uuid4(), 'invalido']:
+            response = self.client.get(self.report_url(report_id))
+            self.assertEqual(response.status_code,
+                             status.HTTP_400_BAD_REQUEST)
+
+    def test_import_report_without_permission(self):
+        self.client.force_authenticate(user=self.admin)
+        report_id = self.upload_with_errors()['result']['report_id']
+        self.remove_permissions()
+        response = self.client.get(self.report_url(report_id))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def tearDown(self):
         User.objects.all().delete()
         Event.objects.all().delete()
@@ -427,6 +498,80 @@ class AddPlayersViewTest(APITestCase):
         self.excel_file.close()
 
 
+class ExportPlayersViewTest(APITestCase):
+    def setUp(self):
+        self.event = Event.objects.create(name='Evento 1', token=Token.objects.create())
+        self.admin = User.objects.create(
+            username='admin', email=f'{uuid.uuid4()}@gmail.com', first_name='Admin', last_name='Admin')
+        assign_permissions(self.admin, Group.objects.create(name='event_admin'), self.event)
+        Player.objects.bulk_create([
+            Player(event=self.event, full_name=f'Jogador {i}', social_name=f'Social {i}' if i % 2 else None,
+                   registration_email=f'jogador{i}@gmail.com', total_score=i)
+            for i in range(50)])
+        Player.objects.create(event=self.event, full_name='Imortal', registration_email='imortal@gmail.com',
+                              total_score=100, is_imortal=True)
+        self.url = f"{reverse('api:export-players')}?event_id={self.event.id}"
+        self.client.force_authenticate(user=self.admin)
+
+    def test_stream_csv(self):
+        response = self.client.get(f'{self.url}&stream=1&file_format=csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'],
+                         'attachment; filename=jogadores_classificados.csv')
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(lines[0], 'Nome Completo,Email,Nome Social')
+        self.assertEqual(lines[1:3], ['Jogador 1,jogador1@gmail.com,Social 1',
+                                      'Jogador 2,jogador2@gmail.com,'])
+        self.assertEqual(len(lines), 50)
+
+    def test_stream_csv_sends_header_before_query(self):
+        response = self.client.get(f'{self.url}&stream=1&file_format=csv')
+        content = iter(response.streaming_content)
+        with CaptureQueriesContext(connection) as queries:
+            header = next(content)
+        self.assertEqual(len(queries.captured_queries), 0)
+        self.assertIn(b'Nome Completo', header)
+        list(content)
+
+    def test_stream_xlsx(self):
+        response = self.client.get(f'{self.url}&stream=true')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        df = pd.read_excel(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(list(df.columns), ['Nome Completo', 'Email', 'Nome Social'])
+        self.assertEqual(len(df), 49)
+        self.assertNotIn('Imortal', list(df['Nome Completo']))
+
+    def test_export_invalid_file_format(self):
+        response = self.client.get(f'{self.url}&stream=1&file_format=pdf')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_without_players(self):
+        Player.objects.filter(event=self.event).update(total_score=0)
+        response = self.client.get(f'{self.url}&stream=1')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'errors': 'Nenhum jogador encontrado!'})
+
+    def test_export_streams_by_default(self):
+        response = self.client.get(f'{self.url}&file_format=csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOBS_MODE='eager', MEDIA_ROOT=tempfile.mkdtemp())
+    def test_export_csv_job(self):
+        response = self.client.get(f'{self.url}&background=1&file_format=csv')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = self.client.get(response.data['url']).data
+        self.assertEqual(job['result']['players_count'], 49)
+        download = self.client.get(job['download_url'])
+        self.assertTrue(download.streaming)
+        self.assertEqual(download['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(len(b''.join(download.streaming_content).decode('utf-8-sig').splitlines()), 50)
+
+
 class PublishPlayersResultsViewTestCase(APITestCase):
     def create_unique_email(self):
         return f'{uuid.uuid4()}@gmail.com'
@@ -438,6 +583,8 @@ class PublishPlayersResultsViewTestCase(APITestCase):
         perms = get_perms(user, event)
         for perm in perms:
             remove_perm(perm, user, event)
+        # As permissões também são derivadas do vínculo do usuário com o jogador do evento
+        Player.objects.filter(user=user, event=event).update(user=None)
 
     def setUpUser(self):
         self.admin = User.objects.create(username='admin', email=self.create_unique_email(
@@ -498,7 +645,7 @@ class PublishPlayersResultsViewTestCase(APITestCase):
 
     def test_publish_results_with_invalid_event_id(self):
         self.client.force_authenticate(user=self.admin)
-        url = f"{reverse('api:publish-results-imortals')}?event_id=100"
+        url = f"{reverse('api:publish-results-imortals')}?event_id=999999"
         response = self.client.put(url)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(
@@ -5,6 +5,7 @@ from ..serializers import StaffSerializer
 from ..permissions import assign_permissions
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
+from django.test import override_settings
 from django.urls import reverse
 from django.contrib.auth.models import Group
 from django.contrib.contenttypes.models import ContentType
@@ -278,6 +279,7 @@ class AddStaffManagerTestCase(APITestCase):
             Token.objects.all().delete()
 
 
+@override_settings(JOBS_MODE='eager')
 class AddStaffMembersTestCase(APITestCase):
 
     def setUpFiles(self):
@@ -323,9 +325,11 @@ class AddStaffMembersTestCase(APITestCase):
 
         data = {'event_id': self.event.id, 'file': self.excel_uploaded_file}
         response = self.client.post(self.url, data, format='multipart')
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = self.client.get(response.data['url']).data
+        self.assertEqual(job['status'], 'succeeded')
         self.assertEqual(
-            response.data, 'Monitores adicionados com sucesso!'
+            job['result']['message'], 'Monitores adicionados com sucesso!'
         )
         self.assertIsNotNone(Staff.objects.filter(event=self.event))
 
@@ -333,9 +337,11 @@ class AddStaffMembersTestCase(APITestCase):
 
         data = {'event_id': self.event.id, 'file': self.csv_uploaded_file}
         response = self.client.post(self.url, data, format='multipart')
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = self.client.get(response.data['url']).data
+        self.assertEqual(job['status'], 'succeeded')
         self.assertEqual(
-            response.data, 'Monitores adicionados com sucesso!'
+            job['result']['message'], 'Monitores adicionados com sucesso!'
         )
         self.assertIsNotNone(Staff.objects.filter(event=self.event))
 
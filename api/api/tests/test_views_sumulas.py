@@ -1,10 +1,17 @@
+from datetime import timedelta
+from django.conf import settings
 from django.forms import ValidationError
 from rest_framework.test import APITestCase
+from django.test import override_settings
 from django.urls import reverse
+from django.db import connection
+from django.db.models import Prefetch
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.utils.crypto import get_random_string
 from rest_framework import status
 from rest_framework.test import APIClient
-from api.models import SumulaImortal, SumulaClassificatoria, Event, PlayerScore, Token, Player, Staff
+from api.models import SumulaImortal, SumulaClassificatoria, Event, Job, PlayerScore, Token, Player, Staff
 from users.models import User
 import uuid
 from ..utils import get_permissions, get_content_type
@@ -12,6 +19,10 @@ from ..permissions import assign_permissions, filter_permissions
 from ..serializers import SumulaForPlayerSerializer, SumulaImortalForPlayerSerializer, SumulaClassificatoriaForPlayerSerializer
 from django.contrib.auth.models import Group
 from guardian.shortcuts import remove_perm, assign_perm, get_perms
+from ..scheduler import round_robin_schedule, compact_rounds
+
+# Consultas de uma listagem de sumulas: evento, papéis do usuário e 3 consultas por tipo de sumula
+LISTING_QUERIES = 8
 
 
 class BaseSumulaViewTest(APITestCase):
@@ -77,6 +88,8 @@ class BaseSumulaViewTest(APITestCase):
         perm = get_perms(self.user_staff_manager, self.event)
         for p in perm:
             remove_perm(p, self.user_staff_manager, self.event)
+        # As permissões também são derivadas do vínculo do usuário com o monitor do evento
+        Staff.objects.filter(user=self.user_staff_manager, event=self.event).update(user=None)
 
     def SetUpStaff(self):
         self.staff1 = Staff.objects.create(
@@ -230,6 +243,7 @@ class SumulaImortalViewTest(BaseSumulaViewTest):
     def setUpData(self):
         self.data_update = {
             "id": self.sumula.id,
+            "version": self.sumula.version,
             "active": True,
             "description": 'Sala S4',
             "referee": [
@@ -339,6 +353,43 @@ class SumulaImortalViewTest(BaseSumulaViewTest):
         sumula = SumulaImortal.objects.get(id=sumula_id)
         self.assertEqual(sumula.referee.count(), 1)
 
+    def test_create_sumula_with_ten_players(self):
+        PlayerScore.objects.all().delete()
+        players = Player.objects.bulk_create([
+            Player(event=self.event, registration_email=self.create_unique_email())
+            for _ in range(10)])
+        self.data_post['players'] = [{'id': player.id} for player in players]
+        self.client.force_authenticate(user=self.user_staff_manager)
+        response = self.client.post(
+            self.url_post, self.data_post, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['rounds']), 9)
+        self.assertEqual(sorted(PlayerScore.objects.values_list(
+            'rounds_number', flat=True)), list(range(1, 11)))
+
+    def test_create_sumula_stores_compact_rounds(self):
+        PlayerScore.objects.all().delete()
+        self.client.force_authenticate(user=self.user_staff_manager)
+        response = self.client.post(
+            self.url_post, self.data_post, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        sumula = SumulaImortal.objects.get(id=response.data['id'])
+        self.assertEqual(sumula.rounds['version'], 2)
+        score_ids = set(sumula.scores.values_list('id', flat=True))
+        for round_pairs in sumula.rounds['rounds']:
+            self.assertEqual(
+                {score_id for pair in round_pairs for score_id in pair}, score_ids)
+
+        self.player.full_name = 'Nome Novo'
+        self.player.save()
+        response = self.client.get(
+            f"{reverse('api:sumula')}?event_id={self.event.id}")
+        sumula_data = next(
+            data for data in response.data['sumulas_imortal'] if data['id'] == sumula.id)
+        names = {pair[key]['player']['full_name'] for round_pairs in sumula_data['rounds']
+                 for pair in round_pairs for key in ['player1', 'player2']}
+        self.assertIn('Nome Novo', names)
+
     def test_create_sumula_without_referee(self):
         self.data_post['referees'] = []
         self.client.force_authenticate(user=self.user_staff_manager)
@@ -425,7 +476,7 @@ class SumulaImortalViewTest(BaseSumulaViewTest):
     def test_update_sumula_not_found(self):
         self.client.force_authenticate(user=self.user_staff_manager)
 
-        self.data_update['id'] = 100
+        self.data_update['id'] = 99999
         response = self.client.put(
             self.url_update, format='json', data=self.data_update)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -441,7 +492,7 @@ class SumulaImortalViewTest(BaseSumulaViewTest):
 
     def test_update_sumula_with_i_player_score_id_not_found(self):
 
-        self.data_update['players_score'][0]['id'] = 100
+        self.data_update['players_score'][0]['id'] = 99999
         self.client.force_authenticate(user=self.user_staff_manager)
         response = self.client.put(
             self.url_update, self.data_update, format='json')
@@ -463,6 +514,7 @@ class SumulaClassificatoriaViewTest(BaseSumulaViewTest):
     def setUpData(self):
         self.data_update = {
             "id": self.sumula.id,
+            "version": self.sumula.version,
             "active": True,
             "description": 'Sala S4',
             "referee": [
@@ -642,7 +694,7 @@ class SumulaClassificatoriaViewTest(BaseSumulaViewTest):
     def test_update_sumula_not_found(self):
         self.client.force_authenticate(user=self.user_staff_manager)
 
-        self.data_update['id'] = 100
+        self.data_update['id'] = 99999
         response = self.client.put(
             self.url_update, format='json', data=self.data_update)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -658,7 +710,7 @@ class SumulaClassificatoriaViewTest(BaseSumulaViewTest):
 
     def test_update_sumula_with_i_player_score_id_not_found(self):
 
-        self.data_update['players_score'][0]['id'] = 100
+        self.data_update['players_score'][0]['id'] = 99999
         self.client.force_authenticate(user=self.user_staff_manager)
         response = self.client.put(
             self.url_update, self.data_update, format='json')
@@ -684,13 +736,19 @@ class GetSumulaForPlayerTest(APITestCase):
     def create_unique_username(self):
         return f'user_{uuid.uuid4().hex[:10]}'
 
+    def ordered_sumulas(self, model, sumulas: list):
+        """Sumulas com as pontuações e os árbitros ordenados pelo id, como são retornados pela rota."""
+        return model.objects.filter(id__in=[sumula.id for sumula in sumulas]).order_by('name').prefetch_related(
+            Prefetch('scores', queryset=PlayerScore.objects.order_by('id')),
+            Prefetch('referee', queryset=Staff.objects.order_by('id')))
+
     def setUpData(self):
-        self.expected_data_classificatoria = SumulaClassificatoriaForPlayerSerializer(
-            [self.sumula_classificatoria1, self.sumula_classificatoria2], many=True).data
+        self.expected_data_classificatoria = SumulaClassificatoriaForPlayerSerializer(self.ordered_sumulas(
+            SumulaClassificatoria, [self.sumula_classificatoria1, self.sumula_classificatoria2]), many=True).data
         self.player.is_imortal = True
         self.player.save()
-        self.expected_data_imortal = SumulaImortalForPlayerSerializer(
-            [self.sumula_imortal1, self.sumula_imortal2], many=True).data
+        self.expected_data_imortal = SumulaImortalForPlayerSerializer(self.ordered_sumulas(
+            SumulaImortal, [self.sumula_imortal1, self.sumula_imortal2]), many=True).data
         self.player.is_imortal = False
         self.player.save()
 
@@ -785,6 +843,19 @@ class GetSumulaForPlayerTest(APITestCase):
         self.assertEqual(response.data[1]['id'],
                          self.sumula_imortal2.id)
 
+    def test_get_sumulas_for_player_query_count_is_constant(self):
+        self.client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as two_sumulas:
+            self.client.get(self.url)
+        for i in range(3, 6):
+            sumula = SumulaClassificatoria.objects.create(event=self.event, name=f'Chave 0{i}')
+            sumula.referee.add(self.staff1)
+            PlayerScore.objects.create(player=self.player, sumula_classificatoria=sumula, event=self.event)
+        with CaptureQueriesContext(connection) as five_sumulas:
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(len(two_sumulas.captured_queries), len(five_sumulas.captured_queries))
+
     def test_get_sumulas_for_player_unauthenticated(self):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -801,7 +872,8 @@ class GetSumulaForPlayerTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_get_sumulas_for_player_unauthorized(self):
-        self.client.force_authenticate(user=self.user2)
+        self.client.force_authenticate(user=User.objects.create(
+            username='test_user3', email='example3@email.com'))
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
@@ -889,3 +961,335 @@ class AddRefereeToSumulaTestCase(BaseSumulaViewTest):
         Group.objects.all().delete()
         Token.objects.all().delete()
         Staff.objects.all().delete()
+
+
+@override_settings(JOBS_MODE='eager')
+class GenerateSumulasTestCase(BaseSumulaViewTest):
+    def setUpPresentPlayers(self, n: int):
+        Player.objects.bulk_create([
+            Player(event=self.event, full_name=f'Jogador {i}', is_present=True,
+                   registration_email=self.create_unique_email())
+            for i in range(n)])
+
+    def generate(self):
+        self.client.force_authenticate(user=self.user_staff_manager)
+        return self.client.post(self.url, format='json')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.setUpEvent()
+        self.setupUser()
+        self.setUpGroup()
+        self.SetUpStaff()
+        self.setUpPermissions()
+        self.url = f"{reverse('api:sumula-generate')}?event_id={self.event.id}"
+
+    def test_generate_sumulas(self):
+        self.setUpPresentPlayers(20)
+        response = self.generate()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = self.client.get(response.data['url']).data
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['result'], {
+                         'message': 'Sumulas geradas com sucesso!', 'sumulas_count': 3})
+        sumulas = SumulaClassificatoria.objects.filter(
+            event=self.event).order_by('name')
+        self.assertEqual([sumula.name for sumula in sumulas], [
+                         'Chave A', 'Chave B', 'Chave C'])
+        for sumula in sumulas:
+            scores = sumula.scores.order_by('rounds_number')
+            self.assertTrue(6 <= scores.count() <= 8)
+            self.assertEqual([score.rounds_number for score in scores], list(
+                range(1, scores.count() + 1)))
+            seats = scores.count() + scores.count() % 2
+            self.assertEqual(len(sumula.rounds['rounds']), seats - 1)
+        self.assertEqual(PlayerScore.objects.filter(event=self.event).values(
+            'player').distinct().count(), 20)
+        self.event.refresh_from_db()
+        self.assertTrue(self.event.is_sumulas_generated)
+
+    def test_generate_sumulas_not_enough_players(self):
+        self.setUpPresentPlayers(5)
+        response = self.generate()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(SumulaClassificatoria.objects.exists())
+        self.event.refresh_from_db()
+        self.assertFalse(self.event.is_sumulas_generated)
+
+    def test_generate_sumulas_already_generated(self):
+        self.setUpPresentPlayers(20)
+        self.generate()
+        response = self.generate()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(SumulaClassificatoria.objects.count(), 3)
+
+    @override_settings(JOBS_MODE='worker')
+    def test_generate_sumulas_reuses_pending_job(self):
+        self.setUpPresentPlayers(20)
+        first = self.generate()
+        second = self.generate()
+        self.assertEqual(first.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(first.data['status'], 'pending')
+        self.assertEqual(first.data['job_id'], second.data['job_id'])
+        self.assertFalse(SumulaClassificatoria.objects.exists())
+
+    @override_settings(JOBS_MODE='worker')
+    def test_generate_sumulas_recovers_stale_job(self):
+        self.setUpPresentPlayers(20)
+        first = self.generate()
+        # O processo que executava a geração foi encerrado sem concluí-la
+        Job.objects.filter(id=first.data['job_id']).update(
+            status=Job.RUNNING, attempts=settings.JOBS_MAX_ATTEMPTS,
+            heartbeat_at=timezone.now() - timedelta(seconds=settings.JOBS_STALE_TIMEOUT + 1))
+        second = self.generate()
+        self.assertEqual(second.status_code, status.HTTP_202_ACCEPTED)
+        self.assertNotEqual(first.data['job_id'], second.data['job_id'])
+        self.assertEqual(Job.objects.get(id=first.data['job_id']).status, Job.FAILED)
+
+    def test_generate_sumulas_query_count_is_constant(self):
+        self.setUpPresentPlayers(16)
+        with CaptureQueriesContext(connection) as small_event:
+            self.generate()
+
+        PlayerScore.objects.all().delete()
+        SumulaClassificatoria.objects.all().delete()
+        self.event.is_sumulas_generated = False
+        self.event.save()
+        self.setUpPresentPlayers(400)
+        with CaptureQueriesContext(connection) as large_event:
+            response = self.generate()
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(PlayerScore.objects.count(), 416)
+        self.assertEqual(len(small_event.captured_queries),
+                         len(large_event.captured_queries))
+
+    def test_generate_sumulas_dry_run(self):
+        self.setUpPresentPlayers(20)
+        self.client.force_authenticate(user=self.user_staff_manager)
+        response = self.client.post(f'{self.url}&dry_run=1', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([bracket['size']
+                         for bracket in response.data], [7, 7, 6])
+        self.assertEqual(response.data[0]['name'], 'Chave A')
+        self.assertEqual([player['rounds_number'] for player in response.data[0]['players']], list(
+            range(1, 8)))
+        self.assertFalse(SumulaClassificatoria.objects.exists())
+        self.assertFalse(PlayerScore.objects.exists())
+        self.event.refresh_from_db()
+        self.assertFalse(self.event.is_sumulas_generated)
+
+    def test_generate_sumulas_impossible_partition(self):
+        self.setUpPresentPlayers(17)
+        response = self.generate()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(SumulaClassificatoria.objects.exists())
+
+
+class SumulaListingQueryCountTestCase(BaseSumulaViewTest):
+    PLAYERS_PER_SUMULA = 6
+
+    def setUpSumulas(self, n: int):
+        players = Player.objects.bulk_create([
+            Player(event=self.event, full_name=f'Jogador {i}',
+                   registration_email=self.create_unique_email())
+            for i in range(n * self.PLAYERS_PER_SUMULA)])
+        for model, field in [(SumulaClassificatoria, 'sumula_classificatoria'), (SumulaImortal, 'sumula_imortal')]:
+            sumulas = model.objects.bulk_create([
+                model(event=self.event, name=f'Sumula {i:03}', number=i) if model == SumulaImortal
+                else model(event=self.event, name=f'Sumula {i:03}') for i in range(n)])
+            scores = PlayerScore.objects.bulk_create([
+                PlayerScore(event=self.event, player=player, rounds_number=seat, **{field: sumula})
+                for index, sumula in enumerate(sumulas)
+                for seat, player in enumerate(players[index * self.PLAYERS_PER_SUMULA:(index + 1) * self.PLAYERS_PER_SUMULA], start=1)])
+            model.referee.through.objects.bulk_create([
+                model.referee.through(**{f'{model.__name__.lower()}_id': sumula.id, 'staff_id': staff.id})
+                for sumula in sumulas for staff in [self.staff1, self.staff2]])
+            for index, sumula in enumerate(sumulas):
+                sumula_scores = scores[index * self.PLAYERS_PER_SUMULA:(index + 1) * self.PLAYERS_PER_SUMULA]
+                sumula.rounds = compact_rounds(round_robin_schedule(self.PLAYERS_PER_SUMULA), {
+                    score.rounds_number: score.id for score in sumula_scores})
+            model.objects.bulk_update(sumulas, ['rounds'])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.setUpEvent()
+        self.setupUser()
+        self.setUpGroup()
+        self.SetUpStaff()
+        self.setUpPermissions()
+        self.client.force_authenticate(user=self.user_staff_manager)
+
+    def assertListingQueries(self, url_name: str, n: int, active: bool = True):
+        self.setUpSumulas(n)
+        SumulaImortal.objects.update(active=active)
+        SumulaClassificatoria.objects.update(active=active)
+        url = f"{reverse(url_name)}?event_id={self.event.id}"
+        with self.assertNumQueries(LISTING_QUERIES):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['sumulas_classificatoria']), n)
+        self.assertEqual(len(response.data['sumulas_imortal']), n)
+        first = response.data['sumulas_imortal'][0]
+        self.assertEqual(len(first['players_score']), self.PLAYERS_PER_SUMULA)
+        self.assertEqual(len(first['referee']), 2)
+        self.assertEqual(first['rounds'][0][0]['player1']['player']['full_name'],
+                         first['players_score'][0]['player']['full_name'])
+
+    def test_get_sumulas_with_few_sumulas(self):
+        self.assertListingQueries('api:sumula', 5)
+
+    def test_get_sumulas_with_many_sumulas(self):
+        self.assertListingQueries('api:sumula', 150)
+
+    def test_get_active_sumulas_with_few_sumulas(self):
+        self.assertListingQueries('api:sumula-ativas', 5)
+
+    def test_get_active_sumulas_with_many_sumulas(self):
+        self.assertListingQueries('api:sumula-ativas', 150)
+
+    def test_get_finished_sumulas_with_few_sumulas(self):
+        self.assertListingQueries('api:sumula-encerradas', 5, active=False)
+
+    def test_get_finished_sumulas_with_many_sumulas(self):
+        self.assertListingQueries('api:sumula-encerradas', 150, active=False)
+
+
+class SumulaCloseTestCase(BaseSumulaViewTest):
+    def setUpSumula(self, n: int) -> SumulaClassificatoria:
+        sumula = SumulaClassificatoria.objects.create(
+            event=self.event, name='Chave A')
+        sumula.referee.add(self.staff1)
+        players = Player.objects.bulk_create([
+            Player(event=self.event, full_name=f'Jogador {i}',
+                   registration_email=self.create_unique_email())
+            for i in range(n)])
+        PlayerScore.objects.bulk_create([
+            PlayerScore(event=self.event, player=player, sumula_classificatoria=sumula)
+            for player in players])
+        return sumula
+
+    def close_data(self, sumula: SumulaClassificatoria, points: int = 10) -> dict:
+        scores = list(sumula.scores.order_by('id'))
+        return {
+            'id': sumula.id,
+            'version': sumula.version,
+            'name': sumula.name,
+            'description': 'Sala S4',
+            'players_score': [{'id': score.id, 'points': points + index, 'player': {'id': score.player_id}}
+                              for index, score in enumerate(scores)],
+            'imortal_players': [{'id': score.player_id} for score in scores[-2:]],
+        }
+
+    def close(self, data: dict):
+        return self.client.put(self.url, data, format='json')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.setUpEvent()
+        self.setupUser()
+        self.setUpGroup()
+        self.SetUpStaff()
+        self.setUpPermissions()
+        self.client.force_authenticate(user=self.user_staff_manager)
+        self.url = f"{reverse('api:sumula-classificatoria')}?event_id={self.event.id}"
+
+    def test_close_sumula(self):
+        sumula = self.setUpSumula(8)
+        response = self.close(self.close_data(sumula))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sumula.refresh_from_db()
+        self.assertFalse(sumula.active)
+        for index, score in enumerate(sumula.scores.select_related('player').order_by('id')):
+            self.assertEqual(score.points, 10 + index)
+            self.assertEqual(score.player.total_score, 10 + index)
+            self.assertEqual(score.player.is_imortal, index >= 6)
+
+    def test_close_sumula_query_count_is_constant(self):
+        small = self.setUpSumula(2)
+        large = self.setUpSumula(8)
+        with CaptureQueriesContext(connection) as small_close:
+            self.close(self.close_data(small))
+        with CaptureQueriesContext(connection) as large_close:
+            response = self.close(self.close_data(large))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(small_close.captured_queries),
+                         len(large_close.captured_queries))
+
+    def test_close_sumula_with_score_from_other_sumula(self):
+        sumula = self.setUpSumula(6)
+        other = self.setUpSumula(6)
+        data = self.close_data(sumula)
+        data['players_score'][0]['id'] = other.scores.first().id
+        response = self.close(data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(PlayerScore.objects.exclude(points=0).exists())
+        sumula.refresh_from_db()
+        self.assertTrue(sumula.active)
+
+    def test_close_sumula_with_invalid_points(self):
+        sumula = self.setUpSumula(6)
+        data = self.close_data(sumula)
+        data['players_score'][-1]['points'] = -1
+        response = self.close(data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(PlayerScore.objects.exclude(points=0).exists())
+
+    def test_close_sumula_with_imortal_player_from_other_sumula_is_atomic(self):
+        sumula = self.setUpSumula(6)
+        other = self.setUpSumula(6)
+        data = self.close_data(sumula)
+        data['imortal_players'].append({'id': other.scores.first().player_id})
+        response = self.close(data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Jogador não encontrado!', response.data['errors'])
+        self.assertFalse(PlayerScore.objects.exclude(points=0).exists())
+        self.assertFalse(Player.objects.filter(is_imortal=True).exists())
+        self.assertFalse(Player.objects.exclude(total_score=0).exists())
+
+    def test_close_sumula_increments_version(self):
+        sumula = self.setUpSumula(6)
+        data = self.close_data(sumula)
+        data['version'] = 1
+        response = self.close(data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sumula.refresh_from_db()
+        self.assertEqual(sumula.version, 2)
+        response = self.client.get(
+            f"{reverse('api:sumula')}?event_id={self.event.id}")
+        self.assertEqual(
+            response.data['sumulas_classificatoria'][0]['version'], 2)
+
+    def test_close_sumula_with_stale_version_returns_conflict(self):
+        Staff.objects.filter(id=self.staff1.id).update(is_manager=True)
+        sumula = self.setUpSumula(6)
+        data = self.close_data(sumula)
+        data['version'] = 1
+        self.assertEqual(self.close(data).status_code, status.HTTP_200_OK)
+        data['description'] = 'Sala S5'
+        data['players_score'][0]['points'] = 99
+        response = self.close(data)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        sumula.refresh_from_db()
+        self.assertEqual(sumula.description, 'Sala S4')
+        self.assertEqual(sumula.version, 2)
+        self.assertFalse(PlayerScore.objects.filter(points=99).exists())
+
+    def test_close_sumula_with_invalid_version(self):
+        sumula = self.setUpSumula(6)
+        data = self.close_data(sumula)
+        for version in ['um', True, None]:
+            data['version'] = version
+            response = self.close(data)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        sumula.refresh_from_db()
+        self.assertTrue(sumula.active)
+
+    def test_close_sumula_without_version(self):
+        sumula = self.setUpSumula(6)
+        data = self.close_data(sumula)
+        del data['version']
+        response = self.close(data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Versão da sumula não fornecida!', response.data['errors'])
+        self.assertFalse(PlayerScore.objects.exclude(points=0).exists())
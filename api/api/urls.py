@@ -2,7 +2,12 @@ from django.contrib import admin
 from django.urls import path, re_path
 from .views.views_event import EventView, ResultsView, PublishFinalResults, PublishImortalsResults
 from .views.views_staff import StaffView, AddStaffManager, AddStaffMembers, AddSingleStaff, DeleteAllStaffs
-from .views.views_players import PlayersView, GetPlayerResults, AddPlayersExcel, AddSinglePlayer, DeleteAllPlayers, GetNotImortalPlayers, ExportPlayersView
+from .views.views_players import PlayersView, GetPlayerResults, AddPlayersExcel, AddSinglePlayer, DeleteAllPlayers, GetNotImortalPlayers, ExportPlayersView, LeaderboardView
+from .views.views_cache import CacheStatsView
+from .views.views_imports import ImportReportView
+from .views.views_jobs import JobView, JobDownloadView
+from .views.views_scoreboard import ScoreboardView
+from .views.views_snapshots import EventSnapshotView
 from .views.views_sumulas import SumulasView, ActiveSumulaView, FinishedSumulaView, GetSumulaForPlayer, SumulaImortalView, SumulaClassificatoriaView, AddRefereeToSumulaView, GenerateSumulas
 
 app_name = 'api'
@@ -12,12 +17,14 @@ urlpatterns = [
     # Rotas de evento e token
     #     path('token/', TokenView.as_view(), name='token'),
     path('event/', EventView.as_view(), name='event'),
+    path('event/snapshot/', EventSnapshotView.as_view(), name='event-snapshot'),
     path('results/', ResultsView.as_view(), name='results'),
     path('results/player/', GetPlayerResults.as_view(), name='player'),
     path('publish/results/imortals/', PublishImortalsResults.as_view(),
          name='publish-results-imortals'),
     path('publish/results/final',
          PublishFinalResults.as_view(), name='publish-results-final'),
+    path('scoreboard/<str:slug>/', ScoreboardView.as_view(), name='scoreboard'),
 
     # Rotas de sumula
     path('sumula/', SumulasView.as_view(), name='sumula'),
@@ -40,10 +47,21 @@ urlpatterns = [
     path('players/qualified/', GetNotImortalPlayers.as_view(),
          name='qualified-players'),
     path('players/export/', ExportPlayersView.as_view(), name='export-players'),
+    path('players/leaderboard/', LeaderboardView.as_view(), name='leaderboard'),
     # Rotas de staff
     path('staff/', StaffView.as_view(), name='staff'),
     path('staff/add', AddSingleStaff.as_view(), name='add-staff'),
     path('staff-manager/', AddStaffManager.as_view(), name='staff-manager'),
     path('upload-staff/', AddStaffMembers.as_view(), name='upload-staff'),
     path('staffs/delete/', DeleteAllStaffs.as_view(), name='delete-staffs'),
+
+    # Rotas de importação
+    path('import/report/', ImportReportView.as_view(), name='import-report'),
+
+    # Rotas de tarefas em segundo plano
+    path('jobs/<uuid:job_id>/', JobView.as_view(), name='job'),
+    path('jobs/<uuid:job_id>/download/', JobDownloadView.as_view(), name='job-download'),
+
+    # Rotas de cache
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
 ]
@@ -13,6 +13,14 @@ def handle_400_error(error_msg: str) -> response.Response:
         }, status.HTTP_400_BAD_REQUEST)
 
 
+def handle_409_error(error_msg: str) -> response.Response:
+    """ Função para lidar com erros 409."""
+    return response.Response(
+        {
+            "errors": error_msg
+        }, status.HTTP_409_CONFLICT)
+
+
 def get_content_type(model):
     """ Função para retornar o content type de um modelo."""
     return ContentType.objects.get_for_model(model)
@@ -1,11 +1,16 @@
-from ..models import Event, PlayerScore, Staff, SumulaImortal, SumulaClassificatoria, Player
-from ..serializers import PlayerScoreForRoundRobinSerializer
-from io import StringIO
+from ..models import Event, Job, PlayerScore, ScoreChange, Staff, SumulaImortal, SumulaClassificatoria, Player, recompute_total_scores, schedule_results_refresh
+from ..serializers import SumulaSerializer
+from ..scheduler import round_robin_schedule, compact_rounds
+from ..cache import content_etag, event_etag, invalidate_event_cache
+from typing import Any, Callable
 from django.db import transaction
+from django.db.models import F, Prefetch, QuerySet
 # from django.db.models import BaseManager
-import chardet
 from django.utils.deprecation import MiddlewareMixin
 from django.forms import ValidationError
+from django.urls import reverse
+from django.utils.http import parse_etags
+from rest_framework import response, status
 from rest_framework.views import APIView
 from rest_framework.exceptions import NotFound
 import logging
@@ -17,6 +22,16 @@ EVENT_ID_NOT_PROVIDED_ERROR_MESSAGE = "Id do evento não fornecido!"
 SUMULA_NOT_FOUND_ERROR_MESSAGE = "Sumula não encontrada!"
 SUMULA_ID_NOT_PROVIDED_ERROR_MESSAGE = "Id da sumula não fornecido!"
 SUMULA_NOT_FOUND_ERROR_MESSAGE = "Sumula não encontrada!"
+SUMULA_VERSION_NOT_PROVIDED_ERROR_MESSAGE = "Versão da sumula não fornecida!"
+SUMULA_VERSION_CONFLICT_ERROR_MESSAGE = "A sumula foi alterada por outro usuário. Recarregue a sumula e tente novamente."
+SHEET_EXTENSIONS = ['csv', 'xlsx', 'xls']
+INVALID_LIMIT_ERROR_MESSAGE = 'Parâmetro limit inválido!'
+INVALID_CURSOR_ERROR_MESSAGE = 'Parâmetro cursor inválido!'
+PAGE_MAX_LIMIT = 100
+
+
+class SumulaVersionConflict(Exception):
+    """A sumula foi alterada desde a versão lida pelo cliente."""
 
 
 class BaseView(APIView):
@@ -36,6 +51,61 @@ class BaseView(APIView):
             raise ValidationError(EVENT_NOT_FOUND_ERROR_MESSAGE)
         return event
 
+    def conditional_event_response(self, event: Event, endpoint: str, build: Callable[[], Any]) -> response.Response:
+        """Retorna uma resposta condicional para um endpoint de leitura do evento.
+        Caso o cabeçalho If-None-Match do cliente corresponda ao ETag atual, retorna 304 sem corpo
+        e build não é chamado. Caso contrário, retorna 200 com os dados gerados por build e o ETag.
+        Caso o cache não seja compartilhado entre os processos, o ETag é derivado do conteúdo da resposta
+        e build é sempre chamado.
+        As permissões devem ser verificadas antes de chamar este método.
+        """
+        etag = event_etag(event.id, endpoint)
+        data = None
+        if etag is None:
+            data = build()
+            etag = content_etag(endpoint, data)
+        if_none_match = parse_etags(self.request.headers.get('If-None-Match', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            return response.Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        if data is None:
+            data = build()
+        return response.Response(status=status.HTTP_200_OK, data=data, headers={'ETag': etag})
+
+    def get_limit(self) -> int | None:
+        """ Retorna o tamanho da página informado no parâmetro limit, limitado a PAGE_MAX_LIMIT.
+        Retorna None caso o parâmetro não tenha sido fornecido.
+        - ValidationError: Se o limit não for um inteiro positivo.
+        """
+        limit = self.request.query_params.get('limit')
+        if limit is None:
+            return None
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValidationError(INVALID_LIMIT_ERROR_MESSAGE)
+        if limit < 1:
+            raise ValidationError(INVALID_LIMIT_ERROR_MESSAGE)
+        return min(limit, PAGE_MAX_LIMIT)
+
+    def get_cursor(self) -> int | None:
+        """ Retorna o id informado no parâmetro cursor da paginação por chave, ou None caso não tenha sido fornecido.
+        - ValidationError: Se o cursor não for um inteiro positivo.
+        """
+        cursor = self.request.query_params.get('cursor')
+        if not cursor:
+            return None
+        if not cursor.isdigit():
+            raise ValidationError(INVALID_CURSOR_ERROR_MESSAGE)
+        return int(cursor)
+
+    def job_accepted_response(self, job: Job) -> response.Response:
+        """Retorna 202 com o id da tarefa enfileirada e a rota para acompanhar o seu progresso."""
+        return response.Response(status=status.HTTP_202_ACCEPTED, data={
+            'job_id': str(job.id),
+            'status': job.status,
+            'url': reverse('api:job', kwargs={'job_id': job.id}),
+        })
+
     def treat_name_and_email_excel(self, name: str, email: str) -> tuple[str, str]:
         """Trata o nome e o email de um jogador para serem inseridos no banco de dados."""
         if name.__class__ != str or email.__class__ != str:
@@ -46,126 +116,36 @@ class BaseView(APIView):
             name = name.replace(word, word.capitalize())
         return name, email
 
-    def treat_csv(self, file) -> tuple[StringIO, str]:
-        """Trata um arquivo CSV para ser lido pelo pandas.
-        Lidando com a codificação do arquivo e convertendo-o em um StringIO.
-        """
-        raw_data = file.read()
-        detection = chardet.detect(raw_data)
-        encoding = detection['encoding']
-        file_data = raw_data.decode(encoding)
-        # Converte a string em um StringIO, que pode ser lido pelo pandas
-        csv_data = StringIO(file_data)
-        return csv_data, encoding
-
-    def get_delimiter(self, csv_data):
-        first_line = csv_data.readline()
-        csv_data.seek(0)  # Resetar o ponteiro para o início do arquivo
-        if ';' in first_line:
-            return ';'
-        else:
-            return ','
-
 
 class BaseSumulaView(BaseView):
     """Classe base para as views de sumula. Contém métodos comuns a todas as views de sumula."""
 
-    def round_robin_tournament(self, n: int, players_score: list[PlayerScore]) -> list[list[dict[dict]]] | Exception:
-        """Gera os pares de jogadores para um torneio com n-1 rodadas.
-        Todos os jogadores jogam com todos os outros jogadores em formato de duplas"""
+    def round_robin_tournament(self, n: int, players_score: list[PlayerScore]) -> dict | Exception:
+        """Gera os pares de jogadores para um torneio todos contra todos.
+        Todos os jogadores jogam com todos os outros jogadores em formato de duplas.
+        O número de cada jogador na chave é gravado com um único bulk_update.
+        As rodadas são retornadas no formato compacto, apenas com os ids dos PlayerScores."""
 
         if len(players_score) != n:
             raise Exception(
                 "Número de jogadores não corresponde ao número fornecido!")
-
-        if n % 2 != 0:
-            players_score.append(None)
-            n += 1
-
-        ordem = {
-            4: [
-                [(1, 2), (3, 4)],
-                [(1, 3), (2, 4)],
-                [(1, 4), (2, 3)]
-            ],
-            6: [
-                [(1, 2), (3, 4), (5, 6)],
-                [(1, 3), (2, 5), (4, 6)],
-                [(1, 4), (2, 3), (5, 6)],
-                [(1, 5), (2, 4), (3, 6)],
-                [(1, 6), (2, 5), (3, 4)]
-            ],
-            8: [
-                [(1, 2), (3, 4), (5, 6), (7, 8)],
-                [(1, 3), (2, 4), (5, 7), (6, 8)],
-                [(1, 4), (2, 3), (5, 8), (6, 7)],
-                [(1, 5), (2, 6), (3, 7), (4, 8)],
-                [(1, 6), (2, 5), (3, 8), (4, 7)],
-                [(1, 7), (2, 8), (3, 5), (4, 6)],
-                [(1, 8), (2, 7), (3, 6), (4, 5)]
-            ]
-        }
-
-        if n not in ordem:
-            raise Exception(
-                "Número de jogadores insuficiente para formar duplas!")
+        try:
+            schedule = round_robin_schedule(n)
+        except ValueError as e:
+            raise Exception(str(e))
 
         # Mapear os jogadores para os seus respectivos números
         player_map = {i + 1: players_score[i] for i in range(n)}
+        players_to_update = []
+        for number, player in player_map.items():
+            if player.rounds_number == 0:
+                player.rounds_number = number
+                players_to_update.append(player)
+        if players_to_update:
+            PlayerScore.objects.bulk_update(
+                players_to_update, ['rounds_number'])
 
-        # Gerar os pares de jogadores conforme a ordem predefinida
-        numbered_rounds = []
-        # print('length players_score', len(players_score))
-        for round_pairs in ordem[n]:
-            numbered_round = []
-            for p1, p2 in round_pairs:
-                player1 = player_map[p1]
-                player2 = player_map[p2] if p2 <= len(players_score) else None
-                # print(f"p1: {p1} p2: {p2}")
-                # print(f"player1: {player1} player2: {player2}")
-                if player1 is not None and player1.rounds_number == 0:
-                    player1.rounds_number = p1
-                    player1.save()
-                if player2 is not None and player2.rounds_number == 0:
-                    player2.rounds_number = p2
-                    player2.save()
-                numbered_round.append((player1, player2))
-            numbered_rounds.append(numbered_round)
-
-        # Caso o número de jogadores seja ímpar (5 ou 7), garantir que um jogador jogue sozinho a cada rodada
-        # if n % 2 != 0:
-        #     print("Jogador sozinho NUMERO IMPAR")
-        #     for i, round in enumerate(numbered_rounds):
-        #         for j, pair in enumerate(round):
-        #             if pair[1] is None:
-        #                 player1 = pair[0]
-        #                 player1.rounds_number = ordem[n][i][j][0]
-        #                 numbered_rounds[i][j] = (player1, None)
-
-        # Serializar os dados corretamente
-        serialized_rounds = []
-        for round in numbered_rounds:
-            serialized_round = []
-            for pair in round:
-                serialized_pair = {
-                    'player1': PlayerScoreForRoundRobinSerializer(pair[0]).data if pair[0] else None,
-                    'player2': PlayerScoreForRoundRobinSerializer(pair[1]).data if pair[1] else None
-                }
-                serialized_round.append(serialized_pair)
-            serialized_rounds.append(serialized_round)
-        # k = 1
-        # for round in serialized_rounds:
-        #     print(f"Rodada {k}")
-        #     for pair in round:
-        #         if pair['player2'] is None:
-        #             print(
-        #                 f"{pair['player1']['player']['full_name']} {pair['player1']['rounds_number']} E {pair['player2']} ")
-        #         else:
-        #             print(
-        #                 f"{pair['player1']['player']['full_name']} {pair['player1']['rounds_number']} E {pair['player2']['rounds_number']} {pair['player2']['player']['full_name']}")
-        #     k += 1
-
-        return serialized_rounds
+        return compact_rounds(schedule, {number: player.id for number, player in player_map.items()})
 
     def validate_request_data_dict(self, data):
         """Valida se os dados fornecidos na requisição estão no formato correto."""
@@ -205,20 +185,33 @@ class BaseSumulaView(BaseView):
                 return False
         return True
 
-    def get_sumulas(self, event: Event, active: bool = None) -> tuple[SumulaClassificatoria, SumulaImortal]:
+    def get_sumulas_queryset(self, model: type[SumulaClassificatoria] | type[SumulaImortal], event: Event, active: bool = None) -> QuerySet:
+        """Retorna as sumulas de um evento com as pontuações, os jogadores e os árbitros pré-carregados.
+        O número de consultas para serializar as sumulas é constante, independente do número de sumulas."""
+        sumulas = model.objects.filter(event=event)
+        if active is not None:
+            sumulas = sumulas.filter(active=active)
+        return sumulas.order_by('name').prefetch_related(
+            Prefetch('scores', queryset=PlayerScore.objects.select_related(
+                'player').order_by('id')),
+            Prefetch('referee', queryset=Staff.objects.order_by('id')),
+        )
+
+    def get_sumulas(self, event: Event, active: bool = None) -> tuple[QuerySet[SumulaImortal], QuerySet[SumulaClassificatoria]]:
         """Retorna as sumulas de um evento de acordo com o parâmetro active."""
-        if active is None:
-            sumula_imortal = SumulaImortal.objects.filter(
-                event=event).order_by('name')
-            sumula_classificatoria = SumulaClassificatoria.objects.filter(
-                event=event).order_by('name')
-        else:
-            sumula_imortal = SumulaImortal.objects.filter(
-                event=event, active=active).order_by('name')
-            sumula_classificatoria = SumulaClassificatoria.objects.filter(
-                event=event, active=active).order_by('name')
+        sumula_imortal = self.get_sumulas_queryset(
+            SumulaImortal, event=event, active=active)
+        sumula_classificatoria = self.get_sumulas_queryset(
+            SumulaClassificatoria, event=event, active=active)
         return sumula_imortal, sumula_classificatoria
 
+    def serialize_sumulas(self, event: Event, active: bool = None) -> dict:
+        """Serializa as sumulas de um evento de acordo com o parâmetro active."""
+        sumula_imortal, sumula_classificatoria = self.get_sumulas(
+            event=event, active=active)
+        return SumulaSerializer(
+            {'sumulas_classificatoria': sumula_classificatoria, 'sumulas_imortal': sumula_imortal}).data
+
     def create_players_score(self, players: list, sumula: SumulaImortal | SumulaClassificatoria, event: Event,) -> list[PlayerScore] | ValidationError:
         """Cria uma lista de PlayerScore associados a uma sumula."""
         players_score = []
@@ -259,44 +252,86 @@ class BaseSumulaView(BaseView):
                 sumula.referee.add(staff)
         sumula.save()
 
-    def update_player_score(self, players_score: list[dict]) -> bool:
-        """Atualiza a pontuação de um jogador."""
+    def update_player_score(self, sumula: SumulaImortal | SumulaClassificatoria, event: Event, players_score: list[dict]) -> list[PlayerScore]:
+        """Atualiza em lote a pontuação dos jogadores de uma sumula.
+        Todas as pontuações são carregadas em uma única consulta e validadas antes de qualquer escrita,
+        sendo salvas com um único bulk_update. Retorna as pontuações atualizadas.
+        - ValidationError: Se alguma pontuação não existir, não pertencer à sumula ou ao evento, ou tiver pontos inválidos.
+        """
+        points_by_id = {}
         for player_score in players_score:
             player_score_id = player_score.get('id')
             if player_score_id is None:
-                return False
-            player_score_obj = PlayerScore.objects.filter(
-                id=player_score_id).first()
-            if not player_score_obj:
-                return False
-            player_score_obj.points = player_score['points']
-            player_score_obj.save()
-        return True
-
-    def update_sumula(self, sumula: SumulaImortal | SumulaClassificatoria, event: Event) -> None | ValidationError:
-        """Atualiza uma sumula."""
-        players_score = self.request.data['players_score']
-
-        if not self.update_player_score(players_score):
+                raise ValidationError("Dados de pontuação inválidos!")
+            try:
+                points = int(player_score['points'])
+            except (TypeError, ValueError):
+                raise ValidationError("Dados de pontuação inválidos!")
+            if points < 0:
+                raise ValidationError("Dados de pontuação inválidos!")
+            points_by_id[player_score_id] = points
+        scores = list(sumula.scores.filter(
+            id__in=points_by_id.keys(), event=event))
+        if len(scores) != len(points_by_id):
             raise ValidationError("Dados de pontuação inválidos!")
+        for score in scores:
+            score.points = points_by_id[score.id]
+        PlayerScore.objects.bulk_update(scores, ['points'])
+        return scores
+
+    def update_imortal_players(self, sumula: SumulaImortal | SumulaClassificatoria, event: Event, players: list[dict]) -> list[int]:
+        """Marca em lote os jogadores da sumula como imortais.
+        Os jogadores são carregados em uma única consulta e validados antes de qualquer escrita.
+        Retorna os ids dos jogadores marcados como imortais.
+        - ValidationError: Se algum jogador não existir ou não pertencer à sumula e ao evento.
+        """
+        player_ids = {player.get('id')
+                      for player in players if player.get('id') is not None}
+        if not player_ids:
+            return []
+        found_ids = set(Player.objects.filter(
+            id__in=player_ids, event=event, scores__in=sumula.scores.all()).values_list('id', flat=True))
+        if found_ids != player_ids:
+            raise ValidationError("Jogador não encontrado!")
+        Player.objects.filter(id__in=player_ids).update(is_imortal=True)
+        return list(player_ids)
 
-        if 'imortal_players' in self.request.data:
-            players = self.request.data['imortal_players']
-            for player in players:
-                player_id = player.get('id')
-                if player_id is None:
-                    continue
-                player_obj = Player.objects.filter(id=player_id).first()
-                if not player_obj:
-                    raise ValidationError("Jogador não encontrado!")
-                player_obj.is_imortal = True
-                player_obj.save()
-
-        sumula.description = self.request.data['description']
-        sumula.active = False
+    def update_sumula(self, sumula: SumulaImortal | SumulaClassificatoria, event: Event) -> None | ValidationError:
+        """Encerra uma sumula, salvando as pontuações dos jogadores, os jogadores imortais e os dados da sumula.
+        Todas as escritas são feitas em uma única transação: as pontuações salvas são registradas em ScoreChange
+        e a pontuação total dos jogadores é recalculada uma única vez ao final, assim como os imortais e o placar público, caso já tenham sido publicados.
+        A sumula só é alterada se a sua versão for a enviada pelo cliente, que deve enviar a versão lida da sumula.
+        - ValidationError: Se a versão não foi fornecida ou é inválida.
+        - SumulaVersionConflict: Se a sumula foi alterada por outra requisição.
+        """
+        if sumula.event_id != event.id:
+            raise ValidationError(SUMULA_NOT_FOUND_ERROR_MESSAGE)
+        if 'version' not in self.request.data:
+            raise ValidationError(SUMULA_VERSION_NOT_PROVIDED_ERROR_MESSAGE)
+        version = self.request.data['version']
+        if type(version) is not int:
+            raise ValidationError("Versão da sumula inválida!")
+        fields = {'description': self.request.data['description'], 'active': False}
         if sumula.__class__ != SumulaImortal:
-            sumula.name = self.request.data['name']
-        sumula.save()
+            fields['name'] = self.request.data['name']
+        with transaction.atomic():
+            # UPDATE condicional: a primeira escrita trava a linha até o commit e as concorrentes
+            # com a mesma versão não encontram a linha e falham, sem necessidade de select_for_update
+            updated = sumula.__class__.objects.filter(id=sumula.id, version=version).update(
+                version=F('version') + 1, **fields)
+            if not updated:
+                raise SumulaVersionConflict(SUMULA_VERSION_CONFLICT_ERROR_MESSAGE)
+            scores = self.update_player_score(
+                sumula, event, self.request.data['players_score'])
+            ScoreChange.record(scores, self.request.user)
+            if 'imortal_players' in self.request.data:
+                self.update_imortal_players(
+                    sumula, event, self.request.data['imortal_players'])
+            recompute_total_scores(
+                event.id, [score.player_id for score in scores])
+            # Os imortais são marcados com update, que não dispara os sinais dos jogadores
+            schedule_results_refresh(event.id)
+            invalidate_event_cache(event.id)
 
     def validate_if_staff_is_sumula_referee(self, sumula: SumulaClassificatoria | SumulaImortal, event: Event) -> Exception | Staff:
         staff = Staff.objects.filter(
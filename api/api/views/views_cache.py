@@ -0,0 +1,27 @@
+from rest_framework import status, request, response
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+
+from ..cache import get_cache_stats
+from ..swagger import Errors
+
+
+class CacheStatsView(APIView):
+    """Expõe os contadores do cache de respostas dos eventos."""
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        tags=['cache'],
+        operation_summary="Retorna os contadores de acertos e falhas do cache de respostas.",
+        operation_description="""Retorna os contadores de acertos (hits) e falhas (misses) do cache de respostas das listagens de sumulas e jogadores.
+        Os contadores são mantidos na memória de cada processo do servidor.
+        Apenas administradores da aplicação podem acessar esta rota.""",
+        security=[{'Bearer': []}],
+        responses={200: openapi.Response('OK', openapi.Schema(type=openapi.TYPE_OBJECT, properties={
+            'hits': openapi.Schema(type=openapi.TYPE_INTEGER, description='Respostas servidas pelo cache', example=120),
+            'misses': openapi.Schema(type=openapi.TYPE_INTEGER, description='Respostas geradas a partir do banco de dados', example=8),
+        })), **Errors([403]).retrieve_erros()})
+    def get(self, request: request.Request, *args, **kwargs) -> response.Response:
+        return response.Response(status=status.HTTP_200_OK, data=get_cache_stats())
@@ -2,6 +2,8 @@ from typing import Optional
 from django.contrib.auth.models import Group
 
 from django.forms import ValidationError
+from django.db import transaction
+from django.db.models import Case, CharField, Exists, OuterRef, QuerySet, Value, When
 from rest_framework import status, request, response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.permissions import BasePermission
@@ -9,9 +11,11 @@ from rest_framework.permissions import BasePermission
 from ..views.base_views import BaseView
 from api.models import Token, Event, Staff, Player, Results
 from ..serializers import EventSerializer, PlayerResultsSerializer, UserEventsSerializer, ResultsSerializer
+from ..cache import cached_event_data
 from ..utils import handle_400_error
-from ..swagger import Errors, manual_parameter_event_id
-from ..permissions import assign_permissions
+from ..swagger import Errors, manual_parameter_event_id, manual_parameters_user_events
+from ..permissions import assign_permissions, has_event_permission, is_event_member
+from ..scoreboard import refresh_results
 
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
@@ -21,6 +25,7 @@ TOKEN_NOT_FOUND_ERROR_MESSAGE = "Token não encontrado!"
 TOKEN_ALREADY_USED_ERROR_MESSAGE = "Token já utilizado para criação de evento!"
 EVENT_NOT_FOUND_ERROR_MESSAGE = "Nenhum evento encontrado!"
 EVENT_DOES_NOT_EXIST_ERROR_MESSAGE = "Este evento não existe!"
+INVALID_ACTIVE_ERROR_MESSAGE = "Parâmetro active inválido!"
 
 
 # class TokenPermissions(BasePermission):
@@ -57,9 +62,9 @@ class EventPermissions(BasePermission):
     def has_object_permission(self, request, view, obj):
         # Verifica se o usuário tem a permissão 'delete_event' para o objeto específico
         if request.method == 'DELETE':
-            return request.user.has_perm('api.delete_event', obj)
+            return has_event_permission(request, 'api.delete_event', obj)
         if request.method == 'PUT':
-            return request.user.has_perm('api.change_event', obj)
+            return has_event_permission(request, 'api.change_event', obj)
 
 
 class EventView(BaseView):
@@ -107,8 +112,12 @@ class EventView(BaseView):
         Os cargos que um usuário pode ter em um evento são: 'admin', 'manager', 'staff' e 'player'.
         Sempre o maior cargo do usuário é retornado. Ou seja, se o usuário é um _staff manager_ em um evento, o cargo retornado será apenas 'manager'.
         Se o usuário é um _staff_ em um evento, o cargo retornado será 'staff'.
+        Os eventos são ordenados do mais recente para o mais antigo e podem ser filtrados pelo parâmetro **active**.
+        Caso o parâmetro **limit** seja informado, a resposta é paginada no formato **{"results": [...], "next_cursor": id}**.
+        A próxima página é obtida enviando o **next_cursor** no parâmetro **cursor**; na última página, next_cursor é null.
         """,
         security=[{'Bearer': []}],
+        manual_parameters=manual_parameters_user_events,
         responses={200: openapi.Response(
             'OK', UserEventsSerializer), **Errors([400]).retrieve_erros()}
     )
@@ -116,31 +125,44 @@ class EventView(BaseView):
         """Retorna todos os eventos associados ao usuário que fez a requisição.
         E o cargo dele no evento.
         """
-        events = request.user.events.all()
-        data_to_serialize = []
-        for event in events:
-            if event.admin_email == request.user.email:
-                data_to_serialize.append(
-                    {'event': event, 'role': 'admin'})
-                continue
-            staff = Staff.objects.filter(
-                event=event, user=request.user).first()
-            if staff and staff.is_manager:
-                data_to_serialize.append(
-                    {'event': event, 'role': 'manager'})
-                continue
-            elif staff:
-                data_to_serialize.append(
-                    {'event': event, 'role': 'staff'})
-                continue
-            else:
-                player = Player.objects.filter(
-                    event=event, user=request.user).first()
-                if player:
-                    data_to_serialize.append(
-                        {'event': event, 'role': 'player'})
-        data = UserEventsSerializer(data_to_serialize, many=True).data
-        return response.Response(status=status.HTTP_200_OK, data=data)
+        try:
+            events = self.get_user_events()
+            limit = self.get_limit()
+            cursor = self.get_cursor()
+        except ValidationError as e:
+            return handle_400_error(str(e))
+        if cursor is not None:
+            events = events.filter(id__lt=cursor)
+        # Um evento a mais é lido para saber se existe uma próxima página
+        page = list(events if limit is None else events[:limit + 1])
+        data = UserEventsSerializer(
+            [{'event': event, 'role': event.role} for event in page[:limit]], many=True).data
+        if limit is None:
+            return response.Response(status=status.HTTP_200_OK, data=data)
+        next_cursor = page[limit - 1].id if len(page) > limit else None
+        return response.Response(status=status.HTTP_200_OK, data={'results': data, 'next_cursor': next_cursor})
+
+    def get_user_events(self) -> QuerySet[Event]:
+        """ Retorna os eventos do usuário anotados com o seu cargo, em uma única consulta.
+        O cargo é o maior entre admin (email do administrador do evento), manager e staff (monitores)
+        e player (jogadores). Eventos em que o usuário não possui cargo são ignorados.
+        - ValidationError: Se o parâmetro active for inválido.
+        """
+        user = self.request.user
+        staff = Staff.objects.filter(event=OuterRef('pk'), user=user)
+        events = user.events.annotate(role=Case(
+            When(admin_email=user.email, then=Value('admin')),
+            When(Exists(staff.filter(is_manager=True)), then=Value('manager')),
+            When(Exists(staff), then=Value('staff')),
+            When(Exists(Player.objects.filter(event=OuterRef('pk'), user=user)), then=Value('player')),
+            default=None, output_field=CharField(),
+        )).filter(role__isnull=False).order_by('-id')
+        active = self.request.query_params.get('active')
+        if active is not None:
+            if active.lower() not in ['1', 'true', '0', 'false']:
+                raise ValidationError(INVALID_ACTIVE_ERROR_MESSAGE)
+            events = events.filter(active=active.lower() in ['1', 'true'])
+        return events
 
     @ swagger_auto_schema(
         tags=['event'],
@@ -284,11 +306,11 @@ class EventView(BaseView):
 class ResultsPermissions(BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method == 'PUT':
-            return request.user.has_perm('api.change_event', obj)
+            return has_event_permission(request, 'api.change_event', obj)
         if request.method == 'DELETE':
-            return request.user.has_perm('api.delete_event', obj)
+            return has_event_permission(request, 'api.delete_event', obj)
         if request.method == 'GET':
-            return request.user.has_perm('api.view_player_event', obj)
+            return has_event_permission(request, 'api.view_player_event', obj)
         return True
 
 
@@ -334,7 +356,7 @@ class ResultsView(BaseView):
             event = self.get_event()
         except Exception as e:
             return handle_400_error(str(e))
-        if event not in request.user.events.all():
+        if not is_event_member(request, event):
             return response.Response(status=status.HTTP_403_FORBIDDEN, data={'errors': 'Você não tem permissão para acessar este evento.'})
         self.check_object_permissions(request, event)
         results = Results.objects.get(event=event)
@@ -365,6 +387,7 @@ class ResultsView(BaseView):
         event.is_final_results_published = True
         # event.is_imortal_results_published = True
         event.save()
+        refresh_results(event)
         return response.Response(status=status.HTTP_200_OK, data='Resultados atribuídos e publicados com sucesso!')
 
     @swagger_auto_schema(
@@ -383,7 +406,7 @@ class ResultsView(BaseView):
         except Exception as e:
             return handle_400_error(str(e))
         self.check_object_permissions(request, event)
-        if event not in request.user.events.all():
+        if not is_event_member(request, event):
             return response.Response(status=status.HTTP_403_FORBIDDEN, data={'errors': 'Você não tem permissão para acessar este evento.'})
         results = Results.objects.get(event=event)
         results.top4.clear()
@@ -394,6 +417,7 @@ class ResultsView(BaseView):
         event.is_final_results_published = False
         event.is_imortal_results_published = False
         event.save()
+        refresh_results(event)
         return response.Response(status=status.HTTP_200_OK, data='Resultados deletados com sucesso.')
 
     @swagger_auto_schema(
@@ -451,15 +475,18 @@ class ResultsView(BaseView):
             event = self.get_event()
         except Exception as e:
             return handle_400_error(str(e))
-        if event not in request.user.events.all():
+        if not is_event_member(request, event):
             return response.Response(status=status.HTTP_403_FORBIDDEN, data={'errors': 'Você não tem permissão para acessar este evento.'})
         if not event.is_final_results_published and not event.is_imortal_results_published:
             return handle_400_error('Resultados ainda não publicados.')
-        results = Results.objects.get(event=event)
-        if event.is_imortal_results_published:
-            results.calculate_imortals()
-        data = ResultsSerializer(results).data
-        return response.Response(status=status.HTTP_200_OK, data=data)
+        return self.conditional_event_response(event, 'results', lambda: cached_event_data(
+            event.id, 'results', request.query_params, lambda: self.serialize_results(event)))
+
+    def serialize_results(self, event: Event) -> dict:
+        """Serializa os resultados do evento. Os imortais são calculados na publicação e após
+        as alterações de pontuação, então a leitura não faz nenhuma escrita."""
+        results = Results.objects.select_related('event', 'paladin', 'ambassor').get(event=event)
+        return ResultsSerializer(results).data
 
 
 class PublishFinalResults(BaseView):
@@ -506,8 +533,10 @@ class PublishImortalsResults(BaseView):
         except ValidationError as e:
             return handle_400_error(str(e))
         self.check_object_permissions(request, event)
-        event.is_imortal_results_published = True
-        event.save()
+        with transaction.atomic():
+            event.is_imortal_results_published = True
+            event.save()
+            refresh_results(event)
         return response.Response(status=status.HTTP_200_OK, data='Resultados de imortais publicados com sucesso!')
 
 
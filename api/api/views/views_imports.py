@@ -0,0 +1,87 @@
+from io import BytesIO
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.forms import ValidationError
+from django.http import HttpResponse
+import pandas as pd
+from rest_framework import request, response
+from rest_framework.permissions import BasePermission, IsAuthenticated
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+
+from .base_views import BaseView
+from ..imports import report_dataframe
+from ..models import ImportReport
+from ..swagger import Errors, manual_parameters_import_report
+from ..permissions import has_event_permission
+from ..utils import handle_400_error
+
+REPORT_NOT_FOUND_ERROR_MESSAGE = 'Relatório de importação não encontrado!'
+REPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+class ImportReportPermission(BasePermission):
+    def has_object_permission(self, request, view, obj):
+        if request.method == 'GET':
+            if obj.kind == ImportReport.PLAYERS:
+                return has_event_permission(request, 'api.add_player_event', obj.event)
+            return has_event_permission(request, 'api.change_event', obj.event)
+        return False
+
+
+class ImportReportView(BaseView):
+    permission_classes = [IsAuthenticated, ImportReportPermission]
+
+    @swagger_auto_schema(
+        tags=['import'],
+        operation_summary='Retorna o relatório de erros de uma importação de planilha.',
+        operation_description="""Retorna o relatório de erros por linha de uma importação de jogadores ou monitores.
+        O id do relatório é retornado pelas rotas de importação quando alguma linha é rejeitada.
+        O relatório contém as colunas **Linha, Nome Completo, E-mail e Erro** e pode ser corrigido e reenviado para a importação.
+        """,
+        security=[{'Bearer': []}],
+        manual_parameters=manual_parameters_import_report,
+        responses={200: openapi.Response(
+            description='Relatório gerado com sucesso',
+            content={content_type: {} for content_type in REPORT_CONTENT_TYPES.values()}), **Errors([400]).retrieve_erros()})
+    def get(self, request: request.Request, *args, **kwargs) -> response.Response | HttpResponse:
+        try:
+            event = self.get_event()
+            report = self.get_report(event)
+        except ValidationError as e:
+            return handle_400_error(str(e))
+        self.check_object_permissions(request, report)
+        file_format = request.query_params.get('file_format', 'csv').lower()
+        if file_format not in REPORT_CONTENT_TYPES:
+            return handle_400_error('Formato de arquivo inválido!')
+        content = self.generate_report(report, file_format)
+        http_response = HttpResponse(
+            content, content_type=REPORT_CONTENT_TYPES[file_format])
+        http_response['Content-Disposition'] = f'attachment; filename=relatorio_importacao_{report.id}.{file_format}'
+        return http_response
+
+    def get_report(self, event) -> ImportReport:
+        """Retorna o relatório de importação do evento associado ao id fornecido.
+        - ValidationError: Se o id não foi fornecido ou o relatório não foi encontrado."""
+        report_id = self.request.query_params.get('report_id')
+        if not report_id:
+            raise ValidationError('Id do relatório não fornecido!')
+        try:
+            report = ImportReport.objects.filter(
+                id=report_id, event=event).select_related('event').first()
+        except DjangoValidationError:
+            report = None
+        if not report:
+            raise ValidationError(REPORT_NOT_FOUND_ERROR_MESSAGE)
+        return report
+
+    def generate_report(self, report: ImportReport, file_format: str) -> bytes:
+        df = report_dataframe(report)
+        if file_format == 'csv':
+            return df.to_csv(index=False).encode('utf-8-sig')
+        buffer = BytesIO()
+        with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
+            df.to_excel(writer, index=False, sheet_name='Relatório')
+        return buffer.getvalue()
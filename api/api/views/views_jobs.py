@@ -0,0 +1,71 @@
+from django.http import FileResponse
+from rest_framework import status, request, response
+from rest_framework.permissions import BasePermission, IsAuthenticated
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+
+from .base_views import BaseView
+from ..models import Job
+from ..serializers import JobSerializer
+from ..swagger import Errors, job_response_schema
+from ..utils import handle_400_error
+
+JOB_NOT_FOUND_ERROR_MESSAGE = 'Tarefa não encontrada!'
+JOB_WITHOUT_FILE_ERROR_MESSAGE = 'A tarefa não possui arquivo para download!'
+
+
+class JobPermission(BasePermission):
+    def has_object_permission(self, request, view, obj):
+        if request.method == 'GET':
+            return request.user.is_superuser or obj.created_by_id == request.user.id
+        return False
+
+
+class JobView(BaseView):
+    permission_classes = [IsAuthenticated, JobPermission]
+
+    @swagger_auto_schema(
+        tags=['jobs'],
+        operation_summary='Retorna o estado de uma tarefa em segundo plano.',
+        operation_description="""Retorna o estado, o progresso, o resultado e o erro de uma tarefa em segundo plano
+        (importação de jogadores ou monitores, geração de sumulas ou exportação de jogadores).
+        Apenas o usuário que criou a tarefa ou um administrador da aplicação pode consultá-la.
+        """,
+        security=[{'Bearer': []}],
+        responses={200: openapi.Response('OK', job_response_schema), **Errors([400, 403]).retrieve_erros()})
+    def get(self, request: request.Request, job_id, *args, **kwargs) -> response.Response:
+        job = Job.objects.filter(id=job_id).first()
+        if not job:
+            return handle_400_error(JOB_NOT_FOUND_ERROR_MESSAGE)
+        self.check_object_permissions(request, job)
+        return response.Response(status=status.HTTP_200_OK, data=JobSerializer(job).data)
+
+
+class JobDownloadView(BaseView):
+    permission_classes = [IsAuthenticated, JobPermission]
+
+    @swagger_auto_schema(
+        tags=['jobs'],
+        operation_summary='Baixa o arquivo gerado por uma tarefa em segundo plano.',
+        operation_description="""Baixa o arquivo gerado por uma tarefa concluída, como a exportação dos jogadores classificados.
+        Apenas o usuário que criou a tarefa ou um administrador da aplicação pode baixar o arquivo.
+        """,
+        security=[{'Bearer': []}],
+        responses={200: openapi.Response(
+            description='Arquivo gerado pela tarefa',
+            content={'application/octet-stream': {}}), **Errors([400, 403]).retrieve_erros()})
+    def get(self, request: request.Request, job_id, *args, **kwargs) -> response.Response | FileResponse:
+        job = Job.objects.filter(id=job_id).first()
+        if not job:
+            return handle_400_error(JOB_NOT_FOUND_ERROR_MESSAGE)
+        self.check_object_permissions(request, job)
+        if job.status != Job.SUCCEEDED or not job.output_file:
+            return handle_400_error(JOB_WITHOUT_FILE_ERROR_MESSAGE)
+        # O arquivo é lido do armazenamento e transmitido em blocos
+        try:
+            file = job.output_file.open('rb')
+        except FileNotFoundError:
+            return handle_400_error(JOB_WITHOUT_FILE_ERROR_MESSAGE)
+        http_response = FileResponse(file, content_type=job.output_content_type)
+        http_response['Content-Disposition'] = f'attachment; filename={job.output_name}'
+        return http_response
@@ -1,6 +1,4 @@
-from django.http import HttpResponse
-from io import BytesIO, StringIO
-from typing import Optional
+from django.http import StreamingHttpResponse
 from django.forms import ValidationError
 from django.contrib.auth.models import Group
 from django.core.files.uploadedfile import UploadedFile
@@ -12,27 +10,32 @@ from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import BasePermission
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from ..views.base_views import BaseView
-from api.models import Event, Player, Results
+from ..views.base_views import BaseView, SHEET_EXTENSIONS, INVALID_CURSOR_ERROR_MESSAGE
+from api.models import Event, Job, Player, Results
 from ..utils import handle_400_error
 from ..serializers import PlayerSerializer, UploadFileSerializer, PlayerResultsSerializer, PlayerLoginSerializer
-from ..swagger import Errors, manual_parameter_event_id
-from ..permissions import assign_permissions
-import pandas as pd
-import chardet
+from ..swagger import Errors, manual_parameter_event_id, manual_parameters_export_players, job_accepted_response_schema, manual_parameters_leaderboard, leaderboard_response_schema
+from ..permissions import assign_permissions, has_event_permission, is_event_member
+from ..cache import cached_event_data
+from ..jobs import enqueue_job
+from ..leaderboard import LEADERBOARD_CATEGORIES, LEADERBOARD_PAGE_SIZE, LEADERBOARD_TIE_BREAKS, TIE_BREAK_SCORE, LeaderboardCursor, leaderboard_page
+from ..exports import EXPORT_CONTENT_TYPES, PLAYER_EXPORT_COLUMNS, PLAYERS_SHEET_NAME, player_export_rows, stream_csv, stream_xlsx
 import os
 
+INVALID_CATEGORY_ERROR_MESSAGE = 'Parâmetro category inválido!'
+INVALID_TIE_BREAK_ERROR_MESSAGE = 'Parâmetro tie_break inválido!'
+
 
 class PlayersPermission(BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method == 'GET':
-            return request.user.has_perm('api.view_player_event', obj)
+            return has_event_permission(request, 'api.view_player_event', obj)
         if request.method == 'POST':
-            return request.user.has_perm('api.add_player_event', obj)
+            return has_event_permission(request, 'api.add_player_event', obj)
         if request.method == 'PUT':
-            return request.user.has_perm('api.change_player_event', obj)
+            return has_event_permission(request, 'api.change_player_event', obj)
         if request.method == 'DELETE':
-            return request.user.has_perm('api.delete_player_event', obj)
+            return has_event_permission(request, 'api.delete_player_event', obj)
         return True
 
 
@@ -53,17 +56,15 @@ class PlayersView(BaseView):
         except Exception as e:
             return handle_400_error(str(e))
         self.check_object_permissions(request, event)
+        return self.conditional_event_response(event, 'players', lambda: cached_event_data(
+            event.id, 'players', request.query_params, lambda: self.serialize_players(event=event)))
 
-        players = Player.objects.filter(event=event)
+    def serialize_players(self, event: Event) -> list:
+        """Serializa todos os jogadores de um evento."""
+        players = list(Player.objects.filter(event=event))
         if not players:
-            return response.Response(status=status.HTTP_200_OK, data=['Nenhum jogador encontrado!'])
-        players_list = []
-        for player in players:
-            players_list.append(player)
-
-        data = PlayerSerializer(players_list, many=True).data
-
-        return response.Response(status=status.HTTP_200_OK, data=data)
+            return ['Nenhum jogador encontrado!']
+        return PlayerSerializer(players, many=True).data
 
     @swagger_auto_schema(
         security=[{'Bearer': []}],
@@ -177,7 +178,7 @@ class PlayersView(BaseView):
             event = self.get_event()
         except Exception as e:
             return handle_400_error(str(e))
-        if event not in request.user.events.all():
+        if not is_event_member(request, event):
             return handle_400_error('Usuário não tem permissão para acessar este evento!')
         self.check_object_permissions(request, event)
 
@@ -217,9 +218,9 @@ class PlayersView(BaseView):
             player.registration_email = new_email
         if clear_user:
             player.user = None
-            player.save()
-            return response.Response(status=status.HTTP_200_OK, data='Jogador editado com sucesso. Usuário removido do jogador!')
         player.save()
+        if clear_user:
+            return response.Response(status=status.HTTP_200_OK, data='Jogador editado com sucesso. Usuário removido do jogador!')
         return response.Response(status=status.HTTP_200_OK, data='Jogador editado com sucesso!')
 
 
@@ -260,15 +261,17 @@ class AddPlayersExcel(BaseView):
 
     @swagger_auto_schema(
         tags=['player'],
-        operation_description='Adiciona os jogadores ao evento através do excel fornecido pelo administrador com os participantes do evento.',
+        operation_description='''Adiciona os jogadores ao evento através do excel fornecido pelo administrador com os participantes do evento.
+        A importação é executada em segundo plano: a rota retorna o id da tarefa, cujo progresso e resultado são consultados em **jobs/<id>/**.''',
         operation_summary='Adiciona multiplos jogadores ao evento.',
         manual_parameters=manual_parameter_event_id,
         request_body=UploadFileSerializer,
-        responses={201: openapi.Response(
-            201), **Errors([400]).retrieve_erros()})
+        responses={202: openapi.Response(
+            'Accepted', job_accepted_response_schema), **Errors([400]).retrieve_erros()})
     def post(self, request: request.Request, *args, **kwargs) -> response.Response:
         """Adiciona os jogadores ao evento através do excel
-        forncecido pelo administrador com os participantes do evento."""
+        forncecido pelo administrador com os participantes do evento.
+        A importação é enfileirada e o seu resultado é consultado pela rota de tarefas."""
         try:
             event = self.get_event()
         except ValidationError as e:
@@ -283,65 +286,13 @@ class AddPlayersExcel(BaseView):
 
         # Obtém a última extensão do arquivo
         extension = os.path.splitext(excel_file.name)[-1].lower().strip('.')
-        # Cria o DataFrame usando a extensão correta
-        df = self.createData(extension=extension, file=excel_file)
-        if df is None:
+        if extension not in SHEET_EXTENSIONS:
             return handle_400_error('Arquivo inválido!')
-        try:
-            errors_count, players_count = self.create_players(
-                df=df, event=event)
-        except Exception as e:
-            return handle_400_error(str(e))
-        if errors_count > 0 and errors_count < players_count:
-            return response.Response(status=status.HTTP_201_CREATED, data={
-                'message': 'Jogadores adicionados com sucesso!',
-                'errors': f'{errors_count} jogadores não foram adicionados devido a e-mail inválido. Verfique os e-mails dos jogadores e tente novamente.'
-            })
-        elif errors_count >= players_count:
-            return handle_400_error('Nenhum jogador adicionado! Verifique os e-mails do arquivo!')
-        return response.Response(status=status.HTTP_201_CREATED, data='Jogadores adicionados com sucesso!')
-
-    def create_players(self, df: pd.DataFrame, event: Event) -> tuple[int, int]:
-        process_data = ['nome completo', 'e-mail']
-        df.columns = df.columns.str.strip().str.lower()
-        # Verificar se as colunas necessárias estão presentes
-        missing_columns = [
-            col for col in process_data if col not in df.columns]
-        if missing_columns:
-            raise ValueError(
-                f"ERRO - Colunas ausentes no arquivo: {', '.join(missing_columns)}")
-        df_needed = df[process_data]
-
-        players_count = 0
-        errors_count = 0
-        for i, line in df_needed.iterrows():
-            name = line['nome completo']
-            email = line['e-mail']
-            name, email = self.treat_name_and_email_excel(name, email)
-            players_count += 1
-            try:
-                validate_email(email)
-            except ValidationError:
-                errors_count += 1
-                continue
-            player, created = Player.objects.get_or_create(
-                registration_email=email, event=event)
-            player.full_name = name
-            player.is_present = True
-            player.save()
-        return errors_count, players_count
-
-    def createData(self, extension, file) -> Optional[pd.DataFrame]:
-        data = None
-        if extension == 'csv':
-            csv_data, encoding = self.treat_csv(file)
-            delimiter = self.get_delimiter(csv_data)
-            data = pd.read_csv(csv_data, header=0,
-                               encoding=encoding, delimiter=delimiter)
-
-        elif extension == 'xlsx' or extension == 'xls':
-            data = pd.read_excel(file)
-        return data
+        # A importação é executada em segundo plano
+        job = enqueue_job(Job.IMPORT_PLAYERS, event=event, user=request.user,
+                          payload={'extension': extension, 'file_name': excel_file.name},
+                          input_file=excel_file)
+        return self.job_accepted_response(job)
 
     def get_excel_file(self):
         excel_file = self.request.data['file']
@@ -461,15 +412,64 @@ class GetNotImortalPlayers(BaseView):
         except Exception as e:
             return handle_400_error(str(e))
         self.check_object_permissions(request, event)
+        return self.conditional_event_response(event, 'players-qualified', lambda: cached_event_data(
+            event.id, 'players-qualified', request.query_params, lambda: self.serialize_players(event=event)))
 
+    def serialize_players(self, event: Event) -> list:
+        """Serializa os jogadores não imortais de um evento."""
         players = Player.objects.filter(event=event, is_imortal=False)
-        players_list = []
-        for player in players:
-            players_list.append(player)
+        return PlayerSerializer(players, many=True).data
 
-        data = PlayerSerializer(players_list, many=True).data
 
-        return response.Response(status=status.HTTP_200_OK, data=data)
+class LeaderboardView(BaseView):
+    permission_classes = [IsAuthenticated, PlayersPermission]
+
+    @swagger_auto_schema(
+        tags=['player'],
+        operation_description="""Retorna a classificação dos jogadores de uma categoria do evento (classificatoria ou imortal), paginada por cursor.
+        A posição é calculada pelo banco de dados: jogadores empatados em todos os critérios de desempate têm a mesma posição.
+        Com **tie_break=head_to_head**, jogadores com a mesma pontuação total são desempatados pelos pontos feitos nas sumulas em que enfrentaram outro jogador empatado.
+        Para obter a próxima página, envie o valor de **next_cursor** no parâmetro **cursor**, com os mesmos category e tie_break.
+        """,
+        operation_summary='Retorna a classificação dos jogadores de uma categoria do evento.',
+        manual_parameters=manual_parameters_leaderboard,
+        responses={200: openapi.Response('OK', leaderboard_response_schema), **Errors([400]).retrieve_erros()}
+    )
+    def get(self, request: request.Request, *args, **kwargs) -> response.Response:
+        """ Retorna uma página da classificação dos jogadores de uma categoria do evento."""
+        try:
+            event = self.get_event()
+            category = request.query_params.get('category', 'classificatoria')
+            if category not in LEADERBOARD_CATEGORIES:
+                raise ValidationError(INVALID_CATEGORY_ERROR_MESSAGE)
+            tie_break = request.query_params.get('tie_break', TIE_BREAK_SCORE)
+            if tie_break not in LEADERBOARD_TIE_BREAKS:
+                raise ValidationError(INVALID_TIE_BREAK_ERROR_MESSAGE)
+            limit = self.get_limit() or LEADERBOARD_PAGE_SIZE
+            cursor = self.get_leaderboard_cursor(tie_break)
+        except Exception as e:
+            return handle_400_error(str(e))
+        self.check_object_permissions(request, event)
+        return self.conditional_event_response(event, 'leaderboard', lambda: cached_event_data(
+            event.id, 'leaderboard', request.query_params, lambda: self.serialize_leaderboard(
+                event, LEADERBOARD_CATEGORIES[category], tie_break, limit, cursor)))
+
+    def get_leaderboard_cursor(self, tie_break: str) -> LeaderboardCursor | None:
+        """ Retorna o cursor informado no parâmetro cursor, ou None caso não tenha sido fornecido.
+        - ValidationError: Se o cursor não for válido para o critério de desempate.
+        """
+        cursor = self.request.query_params.get('cursor')
+        if not cursor:
+            return None
+        try:
+            return LeaderboardCursor.decode(cursor, tie_break)
+        except ValueError:
+            raise ValidationError(INVALID_CURSOR_ERROR_MESSAGE)
+
+    def serialize_leaderboard(self, event: Event, is_imortal: bool, tie_break: str, limit: int,
+                              cursor: LeaderboardCursor | None) -> dict:
+        results, next_cursor = leaderboard_page(event, is_imortal, tie_break, limit, cursor)
+        return {'results': results, 'next_cursor': next_cursor}
 
 
 class ExportPlayersView(BaseView):
@@ -477,14 +477,17 @@ class ExportPlayersView(BaseView):
 
     @swagger_auto_schema(
         tags=['player'],
-        operation_description="""Exporta os jogadores classificados nas chaves do evento em um arquivo Excel.
-        O arquivo Excel contém as informações de **Nome Completo, Email e Nome Social** dos jogadores classificados nas chaves.
+        operation_description="""Exporta os jogadores classificados nas chaves do evento em um arquivo Excel ou CSV.
+        O arquivo contém as informações de **Nome Completo, Email e Nome Social** dos jogadores classificados nas chaves.
+        Por padrão, o arquivo é transmitido diretamente na resposta, a partir de um cursor do banco de dados, sem ser montado em memória.
+        Com o parâmetro **background=1**, o arquivo é gerado em segundo plano: a rota retorna o id da tarefa e o arquivo é baixado em **jobs/<id>/download/** após a sua conclusão.
         """,
-        operation_summary='Exporta os jogadores classificados nas chaves do evento em um arquivo Excel.',
-        manual_parameters=manual_parameter_event_id,
+        operation_summary='Exporta os jogadores classificados nas chaves do evento em um arquivo Excel ou CSV.',
+        manual_parameters=manual_parameters_export_players,
         responses={200: openapi.Response(
-            description='Arquivo Excel gerado com sucesso',
-            content={'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': {}}), **Errors([400]).retrieve_erros()})
+            description='Arquivo transmitido com sucesso',
+            content={content_type: {} for content_type in EXPORT_CONTENT_TYPES.values()}), 202: openapi.Response(
+            'Accepted (background=1)', job_accepted_response_schema), **Errors([400]).retrieve_erros()})
     def get(self, request, *args, **kwargs):
         try:
             event = self.get_event()
@@ -493,38 +496,34 @@ class ExportPlayersView(BaseView):
 
         self.check_object_permissions(request, event)
 
-        players = Player.objects.filter(
-            event=event, is_imortal=False, total_score__gt=0)
-        print(players)
-        if not players:
+        file_format = request.query_params.get('file_format', 'xlsx').lower()
+        if file_format not in EXPORT_CONTENT_TYPES:
+            return handle_400_error('Formato de arquivo inválido!')
+        players = self.get_players(event)
+        if not players.exists():
             return handle_400_error('Nenhum jogador encontrado!')
 
-        # Gera o arquivo Excel
-        excel_file = self.generate_excel(players=players)
-
-        # Cria a resposta HTTP com o arquivo Excel
-        response = HttpResponse(
-            excel_file, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = 'attachment; filename=jogadores_classificados.xlsx'
+        if request.query_params.get('background', '').lower() in ['1', 'true']:
+            # O arquivo é gerado em segundo plano e baixado pela rota jobs/<id>/download/
+            job = enqueue_job(Job.EXPORT_PLAYERS, event=event, user=request.user,
+                              payload={'file_format': file_format})
+            return self.job_accepted_response(job)
+        return self.stream_players(players, file_format)
 
-        return response
-
-    def generate_excel(self, players):
-        # Cria um DataFrame com os dados dos jogadores
-        data = {
-            'Nome Completo': [player.full_name for player in players],
-            'Email': [player.registration_email for player in players],
-            'Nome Social': [player.social_name for player in players],
-        }
-        df = pd.DataFrame(data)
-
-        # Salva o DataFrame em um buffer de memória
-        buffer = BytesIO()
-        with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-            df.to_excel(writer, index=False,
-                        sheet_name='Jogadores Classificados')
-
-        # Move o ponteiro do buffer para o início
-        buffer.seek(0)
+    def get_players(self, event: Event):
+        """Retorna os jogadores classificados nas chaves do evento."""
+        return Player.objects.filter(
+            event=event, is_imortal=False, total_score__gt=0)
 
-        return buffer
+    def stream_players(self, players, file_format: str) -> StreamingHttpResponse:
+        """Transmite o arquivo de exportação a partir de um cursor do banco de dados."""
+        header = PLAYER_EXPORT_COLUMNS.values()
+        rows = player_export_rows(players)
+        if file_format == 'csv':
+            content = stream_csv(header, rows)
+        else:
+            content = stream_xlsx(header, rows, PLAYERS_SHEET_NAME)
+        http_response = StreamingHttpResponse(
+            content, content_type=EXPORT_CONTENT_TYPES[file_format])
+        http_response['Content-Disposition'] = f'attachment; filename=jogadores_classificados.{file_format}'
+        return http_response
@@ -0,0 +1,49 @@
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status, request, response
+from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+
+from ..models import Results
+from ..scoreboard import SCOREBOARD_MAX_AGE, SCOREBOARD_STALE_WHILE_REVALIDATE
+from ..swagger import Errors, scoreboard_response_schema
+from ..utils import handle_400_error
+
+SCOREBOARD_NOT_FOUND_ERROR_MESSAGE = 'Placar não encontrado!'
+RESULTS_NOT_PUBLISHED_ERROR_MESSAGE = 'Resultados ainda não publicados.'
+
+
+class ScoreboardView(APIView):
+    """Placar público e somente leitura de um evento, acessado pelo seu identificador público.
+    Não exige autenticação: o placar é lido de um snapshot pré-calculado com uma única consulta."""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    @swagger_auto_schema(
+        tags=['results'],
+        operation_summary='Retorna o placar público de um evento.',
+        operation_description="""Retorna o placar público do evento associado ao identificador fornecido, sem autenticação.
+        Apenas os resultados já publicados são retornados: imortais, top4, paladino, embaixador e a classificação
+        (os campos não publicados são retornados como null).
+        O placar é gerado novamente quando os resultados são publicados ou as pontuações mudam, e a resposta
+        possui os cabeçalhos **Cache-Control** (com stale-while-revalidate) e **ETag**, podendo ser servida por uma CDN ou proxy reverso.
+        """,
+        responses={200: openapi.Response('OK', scoreboard_response_schema), **Errors([400]).retrieve_erros()})
+    def get(self, request: request.Request, slug: str, *args, **kwargs) -> response.Response:
+        row = Results.objects.filter(event__scoreboard_slug=slug).values_list(
+            'scoreboard', 'scoreboard_updated_at').first()
+        if row is None:
+            return handle_400_error(SCOREBOARD_NOT_FOUND_ERROR_MESSAGE)
+        scoreboard, updated_at = row
+        if scoreboard is None:
+            return handle_400_error(RESULTS_NOT_PUBLISHED_ERROR_MESSAGE)
+        etag = quote_etag(f'scoreboard-{updated_at.timestamp()}')
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            scoreboard_response = response.Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        else:
+            scoreboard_response = response.Response(status=status.HTTP_200_OK, data=scoreboard, headers={'ETag': etag})
+        patch_cache_control(scoreboard_response, public=True, max_age=SCOREBOARD_MAX_AGE,
+                            stale_while_revalidate=SCOREBOARD_STALE_WHILE_REVALIDATE)
+        return scoreboard_response
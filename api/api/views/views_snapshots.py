@@ -0,0 +1,68 @@
+from io import BytesIO
+from django.core.files.uploadedfile import UploadedFile
+from django.forms import ValidationError
+from django.http import HttpResponse
+from rest_framework import status, request, response
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+
+from .base_views import BaseView
+from ..serializers import EventSerializer, UploadSnapshotSerializer
+from ..snapshots import SNAPSHOT_CONTENT_TYPE, read_snapshot, restore_event, write_snapshot
+from ..swagger import Errors, manual_parameter_event_id
+from ..utils import handle_400_error
+
+
+class EventSnapshotView(BaseView):
+    """Exporta e restaura snapshots completos de eventos. Apenas administradores da aplicação podem acessar."""
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    @swagger_auto_schema(
+        tags=['event'],
+        operation_summary='Exporta um snapshot completo do evento.',
+        operation_description="""Exporta o evento, seus monitores, jogadores, sumulas (com as rodadas), pontuações e resultados
+        em um único arquivo JSON compactado com gzip, que pode ser restaurado como um novo evento.
+        Os vínculos com usuários e as permissões não fazem parte do snapshot.
+        Apenas administradores da aplicação podem acessar esta rota.
+        """,
+        security=[{'Bearer': []}],
+        manual_parameters=manual_parameter_event_id,
+        responses={200: openapi.Response(
+            description='Snapshot gerado com sucesso',
+            content={SNAPSHOT_CONTENT_TYPE: {}}), **Errors([400, 403]).retrieve_erros()})
+    def get(self, request: request.Request, *args, **kwargs) -> response.Response | HttpResponse:
+        try:
+            event = self.get_event()
+        except ValidationError as e:
+            return handle_400_error(str(e))
+        output = BytesIO()
+        write_snapshot(event, output)
+        http_response = HttpResponse(
+            output.getvalue(), content_type=SNAPSHOT_CONTENT_TYPE)
+        http_response['Content-Disposition'] = f'attachment; filename=evento_{event.id}.json.gz'
+        return http_response
+
+    @swagger_auto_schema(
+        tags=['event'],
+        operation_summary='Restaura um snapshot de evento como um novo evento.',
+        operation_description="""Cria um novo evento a partir de um snapshot exportado pela rota GET.
+        O evento restaurado recebe um novo token e um novo código de acesso, e o usuário que o restaurou
+        recebe as permissões de administrador do evento. O nome do evento pode ser alterado pelo campo **name**.
+        Apenas administradores da aplicação podem acessar esta rota.
+        """,
+        security=[{'Bearer': []}],
+        request_body=UploadSnapshotSerializer,
+        responses={201: openapi.Response('Created', EventSerializer), **Errors([400, 403]).retrieve_erros()})
+    def post(self, request: request.Request, *args, **kwargs) -> response.Response:
+        file = request.data.get('file')
+        if not isinstance(file, UploadedFile):
+            return handle_400_error('Arquivo inválido!')
+        name = (request.data.get('name') or '').strip() or None
+        try:
+            event = restore_event(read_snapshot(file), name=name, admin=request.user)
+        except ValidationError as e:
+            return handle_400_error('; '.join(e.messages))
+        return response.Response(status=status.HTTP_201_CREATED, data=EventSerializer(event).data)
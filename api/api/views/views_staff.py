@@ -1,7 +1,4 @@
-from io import StringIO
 import os
-import pandas as pd
-from typing import Optional
 from django.forms import ValidationError
 from django.contrib.auth.models import Group
 from django.core.exceptions import ValidationError
@@ -12,14 +9,15 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.permissions import BasePermission
 from rest_framework.parsers import MultiPartParser
 
-from ..views.base_views import BaseView
-from api.models import Token, Event, Staff
+from ..views.base_views import BaseView, SHEET_EXTENSIONS
+from api.models import Token, Event, Job, Staff
 from users.models import User
 from ..serializers import EventSerializer, StaffSerializer, UploadFileSerializer, StaffLoginSerializer
 from .views_event import TOKEN_NOT_PROVIDED_ERROR_MESSAGE, TOKEN_NOT_FOUND_ERROR_MESSAGE, EVENT_NOT_FOUND_ERROR_MESSAGE
 from ..utils import handle_400_error
-from ..swagger import Errors, manual_parameter_event_id
-from ..permissions import assign_permissions
+from ..swagger import Errors, manual_parameter_event_id, job_accepted_response_schema
+from ..permissions import assign_permissions, has_event_permission
+from ..jobs import enqueue_job
 
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
@@ -30,11 +28,11 @@ class StaffPermissions(BasePermission):
     def has_object_permission(self, request, view, obj):
 
         if request.method == 'GET':
-            return request.user.has_perm('api.add_sumula_event', obj)
+            return has_event_permission(request, 'api.add_sumula_event', obj)
         if request.method == 'PUT':
-            return request.user.has_perm('api.change_event', obj)
+            return has_event_permission(request, 'api.change_event', obj)
         if request.method == 'DELETE':
-            return request.user.has_perm('api.delete_event', obj)
+            return has_event_permission(request, 'api.delete_event', obj)
         return False
 
 
@@ -108,9 +106,8 @@ class StaffView(BaseView):
         except Exception as e:
             return handle_400_error(str(e))
         self.check_object_permissions(request, event)
-        staffs = event.staff.all()
-        data = StaffSerializer(staffs, many=True).data
-        return response.Response(status=status.HTTP_200_OK, data=data)
+        return self.conditional_event_response(
+            event, 'staff', lambda: StaffSerializer(event.staff.all(), many=True).data)
 
     @swagger_auto_schema(
         tags=['staff'],
@@ -215,7 +212,7 @@ class StaffView(BaseView):
 class AddStaffManagerPermissions(BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method == 'POST':
-            return request.user.has_perm('api.change_event', obj)
+            return has_event_permission(request, 'api.change_event', obj)
         return False
 
 
@@ -266,7 +263,7 @@ class AddStaffManager(BaseView):
 class AddStaffPermissions(BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method == 'POST':
-            return request.user.has_perm('api.change_event', obj)
+            return has_event_permission(request, 'api.change_event', obj)
         return False
 
 
@@ -276,12 +273,13 @@ class AddStaffMembers(BaseView):
 
     @ swagger_auto_schema(
         tags=['staff'],
-        operation_description='Adiciona monitores ao evento através do excel fornecido pelo administrador.',
+        operation_description='''Adiciona monitores ao evento através do excel fornecido pelo administrador.
+        A importação é executada em segundo plano: a rota retorna o id da tarefa, cujo progresso e resultado são consultados em **jobs/<id>/**.''',
         operation_summary='Adiciona multiplos monitores ao evento.',
         manual_parameters=manual_parameter_event_id,
         request_body=UploadFileSerializer,
-        responses={201: openapi.Response(
-            201), **Errors([400]).retrieve_erros()})
+        responses={202: openapi.Response(
+            'Accepted', job_accepted_response_schema), **Errors([400]).retrieve_erros()})
     def post(self, request: request.Request, *args, **kwargs):
         try:
             event = self.get_event()
@@ -295,63 +293,13 @@ class AddStaffMembers(BaseView):
         except ValidationError as e:
             return handle_400_error(str(e))
         extension = os.path.splitext(excel_file.name)[-1].lower().strip('.')
-        df = self.createData(extension=extension, file=excel_file)
-        if df is None:
+        if extension not in SHEET_EXTENSIONS:
             return handle_400_error('Arquivo inválido!')
-
-        try:
-            errors_count, staff_count = self.create_staff(df, event)
-        except Exception as e:
-            return handle_400_error(str(e))
-        if errors_count > 0 and errors_count < staff_count:
-            return response.Response(status=status.HTTP_201_CREATED, data={
-                'message': 'Monitores adicionados com sucesso!',
-                'errors': f'{errors_count} monitores não foram adicionados devido a e-mail inválido. Verfique os e-mails dos monitores e tente novamente.'
-            })
-        elif errors_count == staff_count:
-            return handle_400_error('Nenhum monitor foi adicionado! Verifique os dados de e-mail dos monitores e tente novamente')
-
-        return response.Response(status=status.HTTP_201_CREATED, data='Monitores adicionados com sucesso!')
-
-    def create_staff(self, df: pd.DataFrame, event: Event) -> tuple:
-        process_data = ['nome completo', 'e-mail']
-        df.columns = df.columns.str.strip().str.lower()
-        # Verificar se as colunas necessárias estão presentes
-        missing_columns = [
-            col for col in process_data if col not in df.columns]
-        if missing_columns:
-            raise ValueError(
-                f"ERRO - Colunas ausentes no arquivo: {', '.join(missing_columns)}")
-
-        df_needed = df[process_data]
-        errors_count = 0
-        staff_count = 0
-        for i, line in df_needed.iterrows():
-            name = line['nome completo']
-            email = line['e-mail']
-            name, email = self.treat_name_and_email_excel(name, email)
-            staff_count += 1
-            try:
-                validate_email(email)
-            except:
-                errors_count += 1
-                continue
-            staff, created = Staff.objects.get_or_create(
-                registration_email=email, event=event)
-            staff.full_name = name
-            staff.save()
-        return errors_count, staff_count
-
-    def createData(self, extension, file) -> Optional[pd.DataFrame]:
-        data = None
-        if extension == 'csv':
-            csv_data, encoding = self.treat_csv(file)
-            delimiter = self.get_delimiter(csv_data)
-            data = pd.read_csv(csv_data, header=0,
-                               encoding=encoding, delimiter=delimiter)
-        elif extension == 'xlsx' or extension == 'xls':
-            data = pd.read_excel(file)
-        return data
+        # A importação é executada em segundo plano
+        job = enqueue_job(Job.IMPORT_STAFF, event=event, user=request.user,
+                          payload={'extension': extension, 'file_name': excel_file.name},
+                          input_file=excel_file)
+        return self.job_accepted_response(job)
 
     def get_excel_file(self):
         excel_file = self.request.data['file']
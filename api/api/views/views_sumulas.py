@@ -2,16 +2,20 @@ from django.db import transaction
 from rest_framework import status, request, response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.permissions import BasePermission
-from .base_views import BaseSumulaView, SUMULA_NOT_FOUND_ERROR_MESSAGE, SUMULA_ID_NOT_PROVIDED_ERROR_MESSAGE
-from api.models import Staff, SumulaClassificatoria, SumulaImortal, PlayerScore, Player
-from ..serializers import PlayerScoreSerializer, SumulaSerializer, SumulaForPlayerSerializer, SumulaImortalSerializer, SumulaClassificatoriaSerializer, SumulaClassificatoriaForPlayerSerializer, SumulaImortalForPlayerSerializer
+from .base_views import BaseSumulaView, SumulaVersionConflict, SUMULA_NOT_FOUND_ERROR_MESSAGE, SUMULA_ID_NOT_PROVIDED_ERROR_MESSAGE
+from api.models import Job, Staff, SumulaClassificatoria, SumulaImortal, PlayerScore, Player
+from ..serializers import PlayerForRoundRobinSerializer, PlayerScoreSerializer, SumulaSerializer, SumulaForPlayerSerializer, SumulaImortalSerializer, SumulaClassificatoriaSerializer, SumulaClassificatoriaForPlayerSerializer, SumulaImortalForPlayerSerializer
 from rest_framework.permissions import BasePermission
-from ..utils import handle_400_error
-from ..swagger import Errors, sumula_imortal_api_put_schema, sumula_classicatoria_api_put_schema, sumulas_response_schema, manual_parameter_event_id, sumulas_response_for_player_schema, array_of_sumulas_response_schema
+from ..permissions import has_event_permission
+from ..utils import handle_400_error, handle_409_error
+from ..cache import cached_event_data, invalidate_event_cache
+from ..brackets import plan_brackets, partition_sizes
+from ..jobs import enqueue_job, recover_stale_jobs
+from ..tasks import SUMULAS_ALREADY_GENERATED_ERROR_MESSAGE
+from ..swagger import Errors, sumula_imortal_api_put_schema, sumula_classicatoria_api_put_schema, sumulas_response_schema, manual_parameter_event_id, manual_parameter_dry_run, sumulas_response_for_player_schema, array_of_sumulas_response_schema, generate_sumulas_dry_run_response_schema, job_accepted_response_schema
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 import random
-import string
 import logging
 from django.core.exceptions import ValidationError
 SUMULA_IS_CLOSED_ERROR_MESSAGE = "Súmula já encerrada só pode ser editada por um gerente ou adminstrador!"
@@ -21,13 +25,13 @@ class HasSumulaPermission(BasePermission):
     def has_object_permission(self, request, view, obj) -> bool:
 
         if request.method == 'POST':
-            return request.user.has_perm('api.add_sumula_event', obj)
+            return has_event_permission(request, 'api.add_sumula_event', obj)
         elif request.method == 'GET':
-            return request.user.has_perm('api.view_sumula_event', obj)
+            return has_event_permission(request, 'api.view_sumula_event', obj)
         elif request.method == 'PUT':
-            return request.user.has_perm('api.change_sumula_event', obj)
+            return has_event_permission(request, 'api.change_sumula_event', obj)
         elif request.method == 'DELETE':
-            return request.user.has_perm('api.delete_sumula_event', obj)
+            return has_event_permission(request, 'api.delete_sumula_event', obj)
         return True
 
 
@@ -49,11 +53,8 @@ class SumulasView(BaseSumulaView):
         except Exception as e:
             return handle_400_error(str(e))
         self.check_object_permissions(self.request, event)
-        sumulas_imortal, sumulas_classificatoria = self.get_sumulas(
-            event=event)
-        data = SumulaSerializer(
-            {'sumulas_classificatoria': sumulas_classificatoria, 'sumulas_imortal': sumulas_imortal}).data
-        return response.Response(status=status.HTTP_200_OK, data=data)
+        return self.conditional_event_response(event, 'sumula', lambda: cached_event_data(
+            event.id, 'sumula', request.query_params, lambda: self.serialize_sumulas(event=event)))
 
     @swagger_auto_schema(
         tags=['sumula'],
@@ -159,7 +160,8 @@ class SumulaClassificatoriaView(BaseSumulaView):
         except Exception as e:
             return handle_400_error(str(e))
         sumula.save()
-        data = SumulaClassificatoriaSerializer(sumula).data
+        data = SumulaClassificatoriaSerializer(
+            self.get_sumulas_queryset(SumulaClassificatoria, event=event).get(id=sumula.id)).data
         return response.Response(status=status.HTTP_201_CREATED, data=data)
 
     @ swagger_auto_schema(
@@ -182,7 +184,7 @@ class SumulaClassificatoriaView(BaseSumulaView):
         security=[{'Bearer': []}],
         manual_parameters=manual_parameter_event_id,
         request_body=sumula_classicatoria_api_put_schema,
-        responses={200: openapi.Response('OK'), **Errors([400]).retrieve_erros()})
+        responses={200: openapi.Response('OK'), **Errors([400, 409]).retrieve_erros()})
     def put(self, request: request.Request, *args, **kwargs):
         """Atualiza uma sumula de Classificatoria
         Obtém o id da sumula a ser atualizada e atualiza os dados associados a ela.
@@ -225,6 +227,8 @@ class SumulaClassificatoriaView(BaseSumulaView):
 
         try:
             self.update_sumula(sumula=sumula, event=event)
+        except SumulaVersionConflict as e:
+            return handle_409_error(str(e))
         except Exception as e:
             return handle_400_error(str(e))
         return response.Response(status=status.HTTP_200_OK)
@@ -305,7 +309,8 @@ class SumulaImortalView(BaseSumulaView):
         except Exception as e:
             return handle_400_error(str(e))
         sumula.save()
-        data = SumulaImortalSerializer(sumula).data
+        data = SumulaImortalSerializer(
+            self.get_sumulas_queryset(SumulaImortal, event=event).get(id=sumula.id)).data
         return response.Response(status=status.HTTP_201_CREATED, data=data)
 
     @ swagger_auto_schema(
@@ -326,7 +331,7 @@ class SumulaImortalView(BaseSumulaView):
         security=[{'Bearer': []}],
         manual_parameters=manual_parameter_event_id,
         request_body=sumula_imortal_api_put_schema,
-        responses={200: openapi.Response('OK'), **Errors([400]).retrieve_erros()})
+        responses={200: openapi.Response('OK'), **Errors([400, 409]).retrieve_erros()})
     def put(self, request: request.Request, *args, **kwargs) -> response.Response:
         """Atualiza uma sumula Imortal
         Obtém o id da sumula a ser atualizada e atualiza os dados associados a ela.
@@ -359,6 +364,8 @@ class SumulaImortalView(BaseSumulaView):
 
         try:
             self.update_sumula(sumula=sumula, event=event)
+        except SumulaVersionConflict as e:
+            return handle_409_error(str(e))
         except Exception as e:
             return handle_400_error(str(e))
         return response.Response(status=status.HTTP_200_OK)
@@ -382,11 +389,8 @@ class ActiveSumulaView(BaseSumulaView):
         except Exception as e:
             return handle_400_error(str(e))
         self.check_object_permissions(self.request, event)
-        sumula_imortal, sumula_classificatoria = self.get_sumulas(
-            event=event, active=True)
-        data = SumulaSerializer(
-            {'sumulas_classificatoria': sumula_classificatoria, 'sumulas_imortal': sumula_imortal}).data
-        return response.Response(status=status.HTTP_200_OK, data=data)
+        return self.conditional_event_response(event, 'sumula-ativas', lambda: cached_event_data(
+            event.id, 'sumula-ativas', request.query_params, lambda: self.serialize_sumulas(event=event, active=True)))
 
 
 class FinishedSumulaView(BaseSumulaView):
@@ -407,17 +411,14 @@ class FinishedSumulaView(BaseSumulaView):
         except Exception as e:
             return handle_400_error(str(e))
         self.check_object_permissions(self.request, event)
-        sumula_imortal, sumula_classificatoria = self.get_sumulas(
-            event=event, active=False)
-        data = SumulaSerializer(
-            {'sumulas_classificatoria': sumula_classificatoria, 'sumulas_imortal': sumula_imortal}).data
-        return response.Response(status=status.HTTP_200_OK, data=data)
+        return self.conditional_event_response(
+            event, 'sumula-encerradas', lambda: self.serialize_sumulas(event=event, active=False))
 
 
 class GetSumulaForPlayerPermission(BasePermission):
     def has_object_permission(self, request, view, obj) -> bool:
         if request.method == 'GET':
-            return request.user.has_perm('api.view_event', obj)
+            return has_event_permission(request, 'api.view_event', obj)
         return False
 
 
@@ -446,23 +447,15 @@ class GetSumulaForPlayer(BaseSumulaView):
             return handle_400_error("Jogador não encontrado!")
 
         if player.is_imortal:
-            player_scores = PlayerScore.objects.filter(
-                player=player, sumula_imortal__active=True)
-            if not player_scores:
-                return handle_400_error("Jogador não possui nenhuma sumula associada!")
-            sumulas = [
-                player_score.sumula_imortal for player_score in player_scores]
-            data = SumulaImortalForPlayerSerializer(
-                sumulas, many=True).data
+            model, serializer, field = SumulaImortal, SumulaImortalForPlayerSerializer, 'sumula_imortal'
         else:
-            player_scores = PlayerScore.objects.filter(
-                player=player, sumula_classificatoria__active=True)
-            if not player_scores:
-                return handle_400_error("Jogador não possui nenhuma sumula associada!")
-            sumulas = [
-                player_score.sumula_classificatoria for player_score in player_scores]
-            data = SumulaClassificatoriaForPlayerSerializer(
-                sumulas, many=True).data
+            model, serializer, field = SumulaClassificatoria, SumulaClassificatoriaForPlayerSerializer, 'sumula_classificatoria'
+        # As pontuações, os jogadores e os árbitros são pré-carregados: o número de consultas não depende do número de sumulas
+        sumulas = self.get_sumulas_queryset(model, event=event, active=True).filter(
+            id__in=PlayerScore.objects.filter(player=player).values(field))
+        if not sumulas:
+            return handle_400_error("Jogador não possui nenhuma sumula associada!")
+        data = serializer(sumulas, many=True).data
 
         return response.Response(status=status.HTTP_200_OK, data=data)
 
@@ -537,105 +530,111 @@ class GenerateSumulas(BaseSumulaView):
         Apenas um gerente ou administrador do evento pode gerar sumulas.
 
         **Essa ação só pode ser realizada uma vez durante o evento.**
+
+        A geração é executada em segundo plano: a rota retorna o id da tarefa, cujo progresso e resultado são consultados em **jobs/<id>/**.
+
+        Com o parâmetro **dry_run=1**, retorna apenas a prévia das chaves (nomes, tamanhos e números dos jogadores) sem gravar nada no banco de dados.
         """,
         security=[{'Bearer': []}],
-        manual_parameters=manual_parameter_event_id,
-        responses={201: openapi.Response(
-            'Created', array_of_sumulas_response_schema), **Errors([400]).retrieve_erros()})
+        manual_parameters=manual_parameter_event_id + manual_parameter_dry_run,
+        responses={202: openapi.Response(
+            'Accepted', job_accepted_response_schema), 200: openapi.Response(
+            'OK', generate_sumulas_dry_run_response_schema), **Errors([400]).retrieve_erros()})
     def post(self, request: request.Request, *args, **kwargs) -> response.Response:
         try:
             event = self.get_event()
         except Exception as e:
             return handle_400_error(str(e))
         self.check_object_permissions(self.request, event)
+        if self.is_dry_run():
+            try:
+                plan = self.plan_sumulas(event=event)
+            except Exception as e:
+                return handle_400_error(str(e))
+            return response.Response(status=status.HTTP_200_OK, data=self.serialize_plan(plan))
         if event.is_sumulas_generated:
-            return handle_400_error(
-                "As sumulas iniciais já foram geradas para este evento!")
+            return handle_400_error(SUMULAS_ALREADY_GENERATED_ERROR_MESSAGE)
         try:
-            sumulas = self.generate_sumulas(
-                event=event)
+            # Valida o número de jogadores antes de enfileirar a geração
+            partition_sizes(self.get_present_players(event).count())
         except Exception as e:
             return handle_400_error(str(e))
-        event.is_sumulas_generated = True
-        event.save()
-        return response.Response(status=status.HTTP_201_CREATED, data="Sumulas geradas com sucesso!")
+        # Uma geração já enfileirada para o evento é reaproveitada, desde que não tenha sido abandonada
+        recover_stale_jobs(event=event, kind=Job.GENERATE_SUMULAS)
+        job = Job.objects.filter(event=event, kind=Job.GENERATE_SUMULAS, status__in=[
+            Job.PENDING, Job.RUNNING]).first()
+        if job is None:
+            job = enqueue_job(Job.GENERATE_SUMULAS,
+                              event=event, user=request.user)
+        return self.job_accepted_response(job)
+
+    def is_dry_run(self) -> bool:
+        """Verifica se a requisição pede apenas a prévia das chaves."""
+        return self.request.query_params.get('dry_run', '').lower() in ['1', 'true']
+
+    def get_present_players(self, event):
+        """Retorna os jogadores presentes e não imortais de um evento."""
+        return Player.objects.filter(event=event, is_present=True, is_imortal=False)
+
+    def plan_sumulas(self, event) -> list[dict]:
+        """Monta o plano das chaves classificatorias sem gravar nada no banco de dados."""
+        players = list(self.get_present_players(event).only(
+            'id', 'full_name', 'social_name'))
+        random.shuffle(players)
+        return plan_brackets(players)
+
+    def serialize_plan(self, plan: list[dict]) -> list[dict]:
+        """Serializa o plano das chaves com os números dos jogadores em cada chave."""
+        return [{
+            'name': bracket['name'],
+            'size': len(bracket['players']),
+            'players': [{'rounds_number': seat, 'player': PlayerForRoundRobinSerializer(player).data}
+                        for seat, player in enumerate(bracket['players'], start=1)],
+        } for bracket in plan]
 
     def generate_sumulas(self, event) -> list[SumulaClassificatoria] | Exception:
-        logger = logging.getLogger(__name__)
         """Gera sumulas classificatorias para iniciar um evento.
         Uma sumula possui no maximo 8 e no mínimo 6 jogadores.
-        """
-        MIN_PLAYERS = 6  # A DECIDIR
-        MAX_PLAYERS = 8
-        letters = string.ascii_uppercase  # Alfabeto para nomear as chaves
-        letters_count = 0
 
+        O plano das chaves (tamanhos, nomes e números dos jogadores) é montado em memória
+        e gravado com um número fixo de consultas, independente do número de jogadores.
+        """
+        logger = logging.getLogger(__name__)
+        # Valida o número de jogadores antes de bloquear as linhas
+        partition_sizes(self.get_present_players(event).count())
         try:
             with transaction.atomic():
-                players = Player.objects.filter(
-                    event=event, is_present=True, is_imortal=False).select_for_update()
-                if players.count() < MIN_PLAYERS:
-                    logger.error(f"O evento precisa de pelo menos {MIN_PLAYERS} jogadores presentes para iniciar.")
-                    raise ValidationError(f"O evento precisa de pelo menos {MIN_PLAYERS} jogadores presentes para iniciar.")
-
-                players = list(players)
+                players = list(
+                    self.get_present_players(event).select_for_update())
                 random.shuffle(players)
-                N = len(players)
-                resto = N % MAX_PLAYERS
-                n_sumulas = N // MAX_PLAYERS
-                sumulas: list[SumulaClassificatoria] = []
-
-                if resto > 0:
-                    n_sumulas += 1
-
-                for i in range(n_sumulas):
-                    if letters_count % 26 == 0:
-                        letters_count = 0
-                    if i < 26:
-                        sumula = SumulaClassificatoria.objects.create(
-                            event=event, name=f"Chave {letters[letters_count]}")
-                    else:
-                        name = f"{letters[letters_count]}" * (i // 26 + 1)
-                        sumula = SumulaClassificatoria.objects.create(
-                            event=event, name=f"Chave {name}")
-                    letters_count += 1
-                    sumulas.append(sumula)
-                    players_to_add = players[i *
-                                             MAX_PLAYERS:(i + 1) * MAX_PLAYERS]
-                    for j in range(len(players_to_add)):
-                        player = players_to_add[j]
-                        PlayerScore.objects.create(
-                            event=event, player=player, sumula_classificatoria=sumulas[i])
-
-                if resto > 0 and resto < MIN_PLAYERS:
-                    index_of_complete_sumulas = n_sumulas - 2
-                    last_sumula = sumulas[n_sumulas - 1]
-                    while last_sumula.scores.count() < MIN_PLAYERS:
-                        scores = sumulas[index_of_complete_sumulas].scores.all()
-                        for i in range(2):
-                            player = scores[i].player
-                            scores[i].delete()
-                            PlayerScore.objects.create(
-                                event=event, player=player, sumula_classificatoria=last_sumula)
-                            last_sumula.refresh_from_db(fields=['scores'])
-                            if last_sumula.scores.count() == MIN_PLAYERS:
-                                break
-                        index_of_complete_sumulas -= 1
-
-                for sumula in sumulas:
-                    players_list = [player for player in sumula.scores.all()]
+                plan = plan_brackets(players)
+
+                sumulas = SumulaClassificatoria.objects.bulk_create(
+                    [SumulaClassificatoria(event=event, name=bracket['name']) for bracket in plan])
+                sumulas_scores: list[list[PlayerScore]] = []
+                for sumula, bracket in zip(sumulas, plan):
+                    sumulas_scores.append([
+                        PlayerScore(event=event, player=player,
+                                    sumula_classificatoria=sumula, rounds_number=seat)
+                        for seat, player in enumerate(bracket['players'], start=1)])
+                PlayerScore.objects.bulk_create(
+                    [score for scores in sumulas_scores for score in scores])
+
+                for sumula, scores in zip(sumulas, sumulas_scores):
                     sumula.rounds = self.round_robin_tournament(
-                        n=len(players_list), players_score=players_list)
-                    sumula.save()
+                        n=len(scores), players_score=list(scores))
+                SumulaClassificatoria.objects.bulk_update(sumulas, ['rounds'])
+                invalidate_event_cache(event.id)
 
             logger.info(
                 f"{len(sumulas)} sumulas classificatorias geradas para o evento {event.id}")
         except ValidationError as e:
             logger.error(f"Erro de validação ao gerar sumulas: {e}")
-            return handle_400_error(f"Erro de validação ao gerar sumulas: {e}")
+            raise ValidationError(
+                f"Erro de validação ao gerar sumulas: {e.messages[0]}")
         except Exception as e:
             logger.error(f"Erro ao gerar sumulas: {e}")
-            return handle_400_error(f"Erro ao gerar sumulas: {e}")
+            raise Exception(f"Erro ao gerar sumulas: {e}")
 
         return sumulas
 
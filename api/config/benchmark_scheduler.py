@@ -0,0 +1,24 @@
+""" Micro-benchmark do gerador de rodadas todos contra todos (api/scheduler.py).
+Mede o tempo de geração de cada tabela de rodadas sem cache e com o cache por número de jogadores.
+
+Uso: python config/benchmark_scheduler.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.scheduler import round_robin_schedule  # noqa: E402
+
+REPETITIONS = 1000
+
+print(f"{'jogadores':>10} {'rodadas':>8} {'sem cache (µs)':>15} {'com cache (µs)':>15}")
+for n in [4, 6, 8, 10, 12, 16, 24, 32, 48, 64]:
+    cold = timeit.timeit(lambda: round_robin_schedule.__wrapped__(n),
+                         number=REPETITIONS) / REPETITIONS * 1e6
+    round_robin_schedule(n)
+    warm = timeit.timeit(lambda: round_robin_schedule(n),
+                         number=REPETITIONS) / REPETITIONS * 1e6
+    rounds = len(round_robin_schedule(n))
+    print(f"{n:>10} {rounds:>8} {cold:>15.2f} {warm:>15.2f}")
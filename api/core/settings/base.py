@@ -180,3 +180,33 @@ AUTHENTICATION_BACKENDS = (
 FILE_UPLOAD_HANDLERS = ["django.core.files.uploadhandler.MemoryFileUploadHandler",
                         "django.core.files.uploadhandler.TemporaryFileUploadHandler",
                         ]
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# O cache de respostas dos eventos (api.cache) só é utilizado com Redis ou Memcached em CACHE_BACKEND, compartilhados
+# entre os processos. Com outro backend (ex: LocMemCache), ele só é utilizado se EVENT_RESPONSE_CACHE_ALLOW_LOCAL
+# estiver habilitado; caso contrário, os ETags são derivados do conteúdo das respostas.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='rei-da-derivada'),
+    }
+}
+
+EVENT_RESPONSE_CACHE_TIMEOUT = config(
+    'EVENT_RESPONSE_CACHE_TIMEOUT', default=60 * 60, cast=int)
+EVENT_RESPONSE_CACHE_ALLOW_LOCAL = config(
+    'EVENT_RESPONSE_CACHE_ALLOW_LOCAL', default=False, cast=bool)
+
+# Tarefas em segundo plano (api.jobs)
+# - thread: executa as tarefas em um pool de threads do próprio processo, após o commit da requisição
+# - worker: apenas enfileira as tarefas no banco de dados; elas são executadas pelo comando `python manage.py run_jobs`
+# - eager: executa as tarefas dentro da própria requisição (utilizado nos testes)
+
+JOBS_MODE = config('JOBS_MODE', default='thread')
+JOBS_MAX_WORKERS = config('JOBS_MAX_WORKERS', default=2, cast=int)
+# Tarefas sem sinal de vida (início ou progresso) há mais de JOBS_STALE_TIMEOUT segundos são consideradas
+# abandonadas: voltam a ficar pendentes até JOBS_MAX_ATTEMPTS execuções e, depois disso, são marcadas com erro
+JOBS_STALE_TIMEOUT = config('JOBS_STALE_TIMEOUT', default=30 * 60, cast=int)
+JOBS_MAX_ATTEMPTS = config('JOBS_MAX_ATTEMPTS', default=2, cast=int)
@@ -16,6 +16,13 @@ CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
 
 
+# Cache
+# O servidor de desenvolvimento executa em um único processo: o LocMemCache pode ser utilizado pelo cache de respostas
+
+EVENT_RESPONSE_CACHE_ALLOW_LOCAL = config(
+    'EVENT_RESPONSE_CACHE_ALLOW_LOCAL', default=True, cast=bool)
+
+
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
@@ -46,6 +46,11 @@ DATABASES = {
 }
 
 STORAGES = {
+    # Arquivos enviados para as tarefas em segundo plano (api.jobs). Com JOBS_MODE="worker" em outra máquina,
+    # MEDIA_ROOT deve ser um volume compartilhado com o worker
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
     # Enable WhiteNoise's GZip and Brotli compression of static assets:
     # https://whitenoise.readthedocs.io/en/latest/django.html#add-compression-and-caching-support
     "staticfiles": {
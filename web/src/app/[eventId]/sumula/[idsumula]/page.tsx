@@ -162,6 +162,7 @@ export default function SumulaId() {
         const removed = ids.filter((item: any) => !imortalPlayers.some((player: any) => player.id === item.id));
         const body = {
             "id": currentSumula.id,
+            "version": currentSumula.version,
             "name": currentSumula.name,
             "description": currentSumula.description,
             "referee": currentSumula.referee,
@@ -174,9 +175,14 @@ export default function SumulaId() {
                 toast.success("Súmula finalizada com sucesso");
                 router.push(`/${currentId}/sumula`);
             }
-        } catch (error) {
+        } catch (error: any) {
             console.log(error);
-            toast.error("Erro ao finalizar a súmula");
+            // 409: a súmula foi alterada por outra pessoa desde que foi aberta
+            if (error?.response?.status === 409) {
+                toast.error("A súmula foi alterada por outro usuário. Abra a súmula novamente.");
+            } else {
+                toast.error("Erro ao finalizar a súmula");
+            }
         }
         setIsDialogOpen(false)
     }
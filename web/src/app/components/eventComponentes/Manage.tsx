@@ -11,6 +11,7 @@ import {
 } from "@/app/components/ui/dialog";
 import { Button } from "@/app/components/ui/button";
 import request from "@/app/utils/request";
+import waitForJob from "@/app/utils/api/waitForJob";
 import { settingsWithAuth } from "@/app/utils/settingsWithAuth";
 import { CheckCircle, ArrowDownToLine, Check } from "lucide-react";
 import { Checkbox } from "@nextui-org/checkbox";
@@ -31,17 +32,30 @@ export default function Manage(props: ManageProps) {
     const [confirmDelete, setConfirmDelete] = useState<boolean>(false);
     const eventId = usePathname().split("/")[1];
 
+    const generateSumulas = async () => {
+        const response = await request.post(`/api/sumula/generate/?event_id=${eventId}`, {}, settingsWithAuth(user.access));
+        // A geração é executada em segundo plano: aguarda a conclusão da tarefa
+        if (response.status === 202) {
+            const job = await waitForJob(response.data.url, user.access);
+            if (job.status === "failed") {
+                throw new Error(job.error);
+            }
+        }
+    }
+
     const handleStartEvent = async () => {
         try {
             await toast.promise(
-                request.post(`/api/sumula/generate/?event_id=${eventId}`, {}, settingsWithAuth(user.access)),
+                generateSumulas(),
                 {
                     loading: "Criando súmulas...",
                     success: "Súmulas criadas com sucesso.",
-                    error: ({ response }) => {
+                    error: (error) => {
                         let errorMessage = "Erro ao criar súmulas.";
-                        if (response?.data?.errors) {
-                            errorMessage = response.data.errors;
+                        if (isAxiosError(error) && error.response?.data?.errors) {
+                            errorMessage = error.response.data.errors;
+                        } else if (!isAxiosError(error) && error?.message) {
+                            errorMessage = error.message;
                         }
                         return errorMessage;
                     }
@@ -58,10 +72,22 @@ export default function Manage(props: ManageProps) {
 
     const handleDownload = async () => {
         try {
-            const response = await request.get(`/api/players/export/?event_id=${eventId}`, {
+            let response = await request.get(`/api/players/export/?event_id=${eventId}`, {
                 ...settingsWithAuth(user.access),
                 responseType: "blob"
             });
+            // O arquivo é gerado em segundo plano: aguarda a tarefa e baixa o arquivo gerado
+            if (response.status === 202) {
+                const { url } = JSON.parse(await response.data.text());
+                const job = await waitForJob(url, user.access);
+                if (job.status === "failed" || !job.download_url) {
+                    throw new Error(job.error || "Erro ao gerar o arquivo.");
+                }
+                response = await request.get(job.download_url, {
+                    ...settingsWithAuth(user.access),
+                    responseType: "blob"
+                });
+            }
             const blob = new Blob([response.data], { type: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" });
             const downloadUrl = URL.createObjectURL(blob);
 
@@ -76,8 +102,14 @@ export default function Manage(props: ManageProps) {
             toast.success("Arquivo baixado com sucesso!");
         } catch (error: unknown) {
             if (isAxiosError(error)) {
-                const errorMessage = error.response?.data.errors || "Erro desconhecido";
+                // Com responseType "blob", o corpo do erro também é recebido como Blob
+                const data = error.response?.data instanceof Blob
+                    ? JSON.parse(await error.response.data.text())
+                    : error.response?.data;
+                const errorMessage = data?.errors || "Erro desconhecido";
                 toast.error(errorMessage);
+            } else if (error instanceof Error) {
+                toast.error(error.message);
             }
             console.error("Erro ao fazer a requisição:", error);
 
@@ -4,6 +4,7 @@ import { usePathname } from "next/navigation";
 import request from "@/app/utils/request";
 import toast from "react-hot-toast";
 import { formDataSettings } from "@/app/utils/formDataSettings";
+import waitForJob from "@/app/utils/api/waitForJob";
 import { isAxiosError } from "axios";
 import AddPlayerComponent from "./AddPlayerComponent";
 
@@ -28,19 +29,31 @@ export default function SubmitFileComponent(props: SubmitFileComponentProps) {
         }
     }
 
+    // A importação é executada em segundo plano: aguarda a tarefa e exibe o seu resultado
+    const showImportResult = async (jobUrl: string) => {
+        const job = await toast.promise(waitForJob(jobUrl, user.access), {
+            loading: "Importando arquivo...",
+            success: "Arquivo processado.",
+            error: (error) => !isAxiosError(error) && error?.message ? error.message : "Erro ao consultar a importação.",
+        });
+        if (job.status === "failed") {
+            toast.error(job.error);
+            return;
+        }
+        toast.success(job.result.message, { duration: 6000 });
+        if (job.result.errors) {
+            toast(job.result.errors, { duration: 6000, icon: '⚠️' });
+        }
+    }
+
     const handlePlayerSubmit = async () => {
         if (playerFile) {
             const formData = new FormData();
             formData.append("file", playerFile);
             try {
                 const response = await request.post(`/api/upload-player/?event_id=${currentId}`, formData, formDataSettings(user.access));
-                if (response.status === 201) {
-                    if (typeof response.data === 'object' && response.data !== null && 'message' in response.data && 'errors' in response.data) {
-                        toast.success(response.data.message, { duration: 6000 });
-                        toast(response.data.errors, { duration: 6000, icon: '⚠️' });
-                    } else {
-                        toast.success(response.data);
-                    }
+                if (response.status === 202) {
+                    await showImportResult(response.data.url);
                 }
             } catch (error: unknown) {
                 if (isAxiosError(error)) {
@@ -61,8 +74,8 @@ export default function SubmitFileComponent(props: SubmitFileComponentProps) {
             formData.append("file", staffFile);
             try {
                 const response = await request.post(`/api/upload-staff/?event_id=${currentId}`, formData, formDataSettings(user.access));
-                if (response.status === 201) {
-                    toast.success(response.data);
+                if (response.status === 202) {
+                    await showImportResult(response.data.url);
                 }
             } catch (error: unknown) {
                 if (isAxiosError(error)) {
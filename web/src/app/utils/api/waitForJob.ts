@@ -0,0 +1,30 @@
+import request from "../request";
+import { settingsWithAuth } from "../settingsWithAuth";
+
+export interface Job {
+    id: string;
+    kind: string;
+    status: "pending" | "running" | "succeeded" | "failed";
+    progress: number;
+    result: any;
+    error: string;
+    download_url: string | null;
+}
+
+const POLL_INTERVAL = 1000;
+// Tempo máximo de espera pela conclusão da tarefa (10 minutos)
+const MAX_WAIT = 10 * 60 * 1000;
+const MAX_ATTEMPTS = MAX_WAIT / POLL_INTERVAL;
+
+// Consulta a tarefa em segundo plano retornada com status 202 até que ela seja concluída ou falhe.
+// Caso a tarefa não seja concluída em MAX_WAIT, a consulta é interrompida com um erro.
+export default async function waitForJob(jobUrl: string, access_token?: string): Promise<Job> {
+    for (let attempt = 0; attempt < MAX_ATTEMPTS; attempt++) {
+        const { data } = await request.get<Job>(jobUrl, settingsWithAuth(access_token));
+        if (data.status === "succeeded" || data.status === "failed") {
+            return data;
+        }
+        await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL));
+    }
+    throw new Error("A tarefa não foi concluída em 10 minutos. Atualize a página mais tarde para conferir o resultado.");
+}